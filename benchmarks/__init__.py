@@ -0,0 +1,6 @@
+"""
+Benchmark suite for MCP Local
+
+Generates reproducible synthetic trees and times the search, read, edit and
+backup paths against a stored baseline. Run with ``python -m benchmarks``.
+"""
@@ -0,0 +1,9 @@
+"""
+Run the benchmark suite: python -m benchmarks
+"""
+
+import sys
+
+from .suite import main
+
+sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Latency and throughput benchmarks for the search, read, edit and backup paths
+
+Each benchmark runs a few warm-up iterations and then ``repeat`` timed ones on a
+synthetic tree. Results are compared with a stored baseline after scaling it by
+a CPU calibration run, so a baseline recorded on one machine stays usable on a
+faster or slower one. A benchmark regresses when its median is more than
+``threshold`` slower than the scaled baseline.
+
+    python -m benchmarks                       # run and compare with baseline.json
+    python -m benchmarks --save                # record a new baseline
+    python -m benchmarks --profile quick       # small tree, for smoke tests
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import mcp_local  # noqa: F401
+except ImportError:  # Running from a checkout without installing
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from mcp_local.core.search_cache import search_cache
+from mcp_local.core.store import SharedStore
+from mcp_local.services import BackupService, HistoryService, file_service
+from mcp_local.tools import file_editing
+from mcp_local.tools.file_editing import DeleteLinesTool, EditFileLinesTool, InsertLinesTool
+from mcp_local.tools.search_tools import _search_adv_impl
+
+from .synthetic import NEEDLE, PROFILES, TreeProfile, generate_tree
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Result:
+    """Timing of one benchmark"""
+    name: str
+    unit: str  # what throughput counts: "MB", "files" or "ops"
+    work: float  # units processed per iteration
+    median: float  # seconds
+    p95: float
+    best: float
+    iterations: int
+
+    @property
+    def throughput(self) -> float:
+        """Units processed per second at the median latency"""
+        return self.work / self.median if self.median else 0.0
+
+
+@dataclass
+class Regression:
+    """A benchmark slower than its scaled baseline"""
+    name: str
+    median: float
+    expected: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.median / self.expected - 1
+
+
+def calibrate() -> float:
+    """Seconds a fixed mix of interpreter and hashing work takes on this machine"""
+    data = bytes(range(256)) * 16384
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        total = 0
+        for i in range(200_000):
+            total += i % 7
+        hashlib.sha256(data).digest()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _measure(name: str, unit: str, work: float, func: Callable[[], object],
+             repeat: int, warmup: int, setup: Optional[Callable[[], None]] = None) -> Result:
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+    return Result(name, unit, work, statistics.median(timings), p95, timings[0], len(timings))
+
+
+def run_suite(workdir: Path, profile: TreeProfile, repeat: int = 5, warmup: int = 1) -> List[Result]:
+    """Generate a tree under workdir and time every benchmark on it"""
+    paths = generate_tree(workdir / "tree", profile)
+    root, target = str(paths["root"]), str(paths["edit_target"])
+    tree_mb = sum(p.stat().st_size for p in paths["root"].rglob("*") if p.is_file()) / 1e6
+    target_mb = paths["edit_target"].stat().st_size / 1e6
+    middle = file_service.read_file(target).count("\n") // 2
+
+    edit_tool, insert_tool, delete_tool = EditFileLinesTool(), InsertLinesTool(), DeleteLinesTool()
+
+    def search(term: str, use_regex: bool = False) -> Callable[[], object]:
+        def run() -> object:
+            result = _search_adv_impl(term, root, use_regex=use_regex, max_results=1_000_000,
+                                      context_lines=0, output_format="json")
+            if '"error"' in result[:20]:
+                raise RuntimeError(result)
+            return result
+        return run
+
+    def edit() -> None:
+        edit_tool.execute(target, middle, "    value = edited(line, 0)\n")
+
+    def insert_and_delete() -> None:
+        insert_tool.execute(target, middle, "    inserted = True\n")
+        delete_tool.execute(target, middle)
+
+    # Private services, so the edits back up into workdir and log to memory while the
+    # shared services keep their directory, history and state
+    backups = BackupService()
+    backups.backup_dir = workdir / "backups"
+    shared = file_editing.backup_service, file_editing.history_service
+    file_editing.backup_service, file_editing.history_service = backups, HistoryService(SharedStore(""))
+    try:
+        return [
+            _measure("search_literal", "MB", tree_mb, search(NEEDLE), repeat, warmup, search_cache.clear),
+            _measure("search_regex", "MB", tree_mb, search(r"def \w+_\w+_\d+\(", True),
+                     repeat, warmup, search_cache.clear),
+            _measure("search_cached", "ops", 1, search(NEEDLE), repeat, warmup),
+            _measure("read_file", "MB", target_mb, lambda: file_service.read_file(target), repeat, warmup),
+            _measure("edit_file_lines", "ops", 1, edit, repeat, warmup),
+            _measure("insert_delete_lines", "ops", 2, insert_and_delete, repeat, warmup),
+            _measure("create_backup", "MB", target_mb, lambda: backups.create_backup(target), repeat, warmup),
+        ]
+    finally:
+        file_editing.backup_service, file_editing.history_service = shared
+
+
+def compare(results: List[Result], calibration: float, baseline: Dict,
+            threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Benchmarks slower than the baseline, scaled to this machine, by more than threshold"""
+    scale = calibration / baseline["calibration"] if baseline.get("calibration") else 1.0
+    expected = {entry["name"]: entry["median"] * scale for entry in baseline.get("results", [])}
+    return [Regression(result.name, result.median, expected[result.name])
+            for result in results
+            if result.name in expected and result.median > expected[result.name] * (1 + threshold)]
+
+
+def report(results: List[Result], regressions: List[Regression]) -> str:
+    """Human-readable table of the results"""
+    slow = {regression.name: regression for regression in regressions}
+    lines = [f"{'benchmark':<22}{'median':>12}{'p95':>12}{'throughput':>18}"]
+    for result in results:
+        line = (f"{result.name:<22}{result.median * 1000:>10.2f}ms{result.p95 * 1000:>10.2f}ms"
+                f"{result.throughput:>12.1f} {result.unit}/s")
+        if result.name in slow:
+            line += f"  REGRESSION +{slow[result.name].slowdown:.0%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns 1 when a benchmark regressed"""
+    parser = argparse.ArgumentParser(description="MCP Local benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="full", help="Synthetic tree size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per benchmark")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON to compare with")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    workdir = Path(tempfile.mkdtemp(prefix="mcp-bench-"))
+    try:
+        results = run_suite(workdir, PROFILES[args.profile], repeat=args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    data = {"profile": args.profile, "calibration": calibration,
+            "results": [dict(asdict(result), throughput=result.throughput) for result in results]}
+    regressions: List[Regression] = []
+    if args.save:
+        args.baseline.write_text(json.dumps(data, indent=2) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("profile") == args.profile:
+            regressions = compare(results, calibration, baseline, args.threshold)
+        else:
+            print(f"Baseline is for the '{baseline.get('profile')}' profile; not comparing", file=sys.stderr)
+    if args.output:
+        args.output.write_text(json.dumps(data, indent=2) + "\n")
+
+    print(report(results, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Reproducible synthetic source trees for benchmarks
+
+Every tree is generated from a seed, so the same profile always produces the same
+bytes. Timestamps are set far in the past so that time-based caches behave as
+they would on a tree that is not being edited.
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+_WORDS = ("alpha", "beta", "gamma", "delta", "config", "handler", "request", "value",
+          "result", "index", "buffer", "render", "update", "client", "server", "parse")
+
+# Marker placed at known positions so searches have a fixed number of hits
+NEEDLE = "needle_marker"
+
+
+@dataclass(frozen=True)
+class TreeProfile:
+    """Shape of a synthetic tree"""
+    small_files: int  # ~2KB source files spread over a few hundred directories
+    huge_files: int  # multi-megabyte text files
+    huge_file_size: int
+    depth: int  # length of one deeply nested directory chain
+    binary_files: int  # random bytes, some with text-like extensions
+    edit_target_size: int  # file used by read/edit/backup, kept under MAX_FILE_SIZE
+
+
+PROFILES: Dict[str, TreeProfile] = {
+    "quick": TreeProfile(small_files=60, huge_files=1, huge_file_size=256 * 1024, depth=8,
+                         binary_files=5, edit_target_size=64 * 1024),
+    "full": TreeProfile(small_files=3000, huge_files=4, huge_file_size=8 * 1024 * 1024, depth=40,
+                        binary_files=200, edit_target_size=900 * 1024),
+}
+
+
+def _source_line(rng: random.Random, number: int) -> str:
+    words = rng.sample(_WORDS, 3)
+    if number % 97 == 0:
+        return f"    # {NEEDLE} {number}\n"
+    if number % 7 == 0:
+        return f"def {words[0]}_{words[1]}_{number}({words[2]}):\n"
+    return f"    {words[0]} = {words[1]}({words[2]}, {number})\n"
+
+
+def _source_text(rng: random.Random, size: int) -> str:
+    lines = []
+    total = 0
+    number = 0
+    while total < size:
+        line = _source_line(rng, number)
+        lines.append(line)
+        total += len(line)
+        number += 1
+    return "".join(lines)
+
+
+def generate_tree(root: Path, profile: TreeProfile, seed: int = 1234) -> Dict[str, Path]:
+    """Write a tree below root; returns the paths benchmarks refer to"""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+
+    for i in range(profile.small_files):
+        directory = root / "src" / f"pkg{i % 20}" / f"mod{i % 200}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file{i}.py").write_text(_source_text(rng, 2048))
+
+    for i in range(profile.huge_files):
+        (root / "data").mkdir(exist_ok=True)
+        (root / "data" / f"huge{i}.log.txt").write_text(_source_text(rng, profile.huge_file_size))
+
+    nested = root.joinpath(*(f"level{i}" for i in range(profile.depth)))
+    nested.mkdir(parents=True, exist_ok=True)
+    for directory in [nested, *nested.parents]:
+        if directory == root:
+            break
+        (directory / "node.py").write_text(_source_text(rng, 512))
+
+    (root / "assets").mkdir(exist_ok=True)
+    for i in range(profile.binary_files):
+        suffix = (".bin", ".dat", ".txt")[i % 3]  # Some binary noise hides behind text extensions
+        (root / "assets" / f"blob{i}{suffix}").write_bytes(rng.getrandbits(4096 * 8).to_bytes(4096, "little"))
+
+    edit_target = root / "edit_target.py"
+    edit_target.write_text(_source_text(rng, profile.edit_target_size))
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in filenames + dirnames:
+            os.utime(os.path.join(dirpath, name), ns=(0, 0))
+    os.utime(root, ns=(0, 0))
+    return {"root": root, "edit_target": edit_target, "deep": nested}
@@ -24,8 +24,29 @@ from .exceptions import (
     SearchError,
     BackupError,
     CommandError,
-    ValidationError
+    ValidationError,
+    ConflictError,
+    ServerDrainingError
 )
+from .encoding import (
+    detect_encoding,
+    read_text,
+    clear_encoding_cache
+)
+from .events import ChangeNotifier, change_notifier
+from .executor import ToolExecutor, tool_executor
+from .fuzzy import FuzzyMatch, FuzzyPathSet, rank, score_path
+from .symbols import extract_symbols, language_for
+from .lines import LineIndex
+from .locks import PathLockManager, ReadWriteLock, path_locks
+from .matching import LineMatch, LineMatcher
+from .metrics import MetricsRegistry, metrics
+from .patterns import CompiledPattern, PatternCache, pattern_cache
+from .regex_plan import RegexPlan, plan_regex
+from .search_cache import SearchResultCache, search_cache
+from .store import SharedStore, shared_store
+from .gitignore import GitRepository, find_repository
+from .walk import GitAwareWalker, TreeWalker, create_walker
 from .utils import (
     should_exclude_file,
     is_text_file,
@@ -60,6 +81,61 @@ __all__ = [
     "BackupError",
     "CommandError",
     "ValidationError",
+    "ConflictError",
+    "ServerDrainingError",
+    
+    # Encoding
+    "detect_encoding",
+    "read_text",
+    "clear_encoding_cache",
+    
+    # Tool execution
+    "ToolExecutor",
+    "tool_executor",
+    "MetricsRegistry",
+    "metrics",
+    "SharedStore",
+    "shared_store",
+    
+    # Locking
+    "PathLockManager",
+    "ReadWriteLock",
+    "path_locks",
+    
+    # Regex planning
+    "RegexPlan",
+    "plan_regex",
+    "LineMatch",
+    "LineMatcher",
+    "CompiledPattern",
+    "PatternCache",
+    "pattern_cache",
+    "SearchResultCache",
+    "search_cache",
+    
+    # Line indexing
+    "LineIndex",
+    
+    # Directory walking
+    "TreeWalker",
+    "GitAwareWalker",
+    "create_walker",
+    "GitRepository",
+    "find_repository",
+    
+    # Change notification
+    "ChangeNotifier",
+    "change_notifier",
+    
+    # Fuzzy path matching
+    "FuzzyMatch",
+    "FuzzyPathSet",
+    "rank",
+    "score_path",
+    
+    # Symbol extraction
+    "extract_symbols",
+    "language_for",
     
     # Utilities
     "should_exclude_file",
@@ -22,6 +22,15 @@ class ToolBase(ABC):
     def validate_params(self, **kwargs) -> bool:
         """Validate tool parameters"""
         return True
+    
+    def validate_output_format(self, output_format: str) -> None:
+        """Validate a requested output format"""
+        from .config import OUTPUT_FORMATS
+        from .exceptions import ValidationError
+        
+        if output_format not in OUTPUT_FORMATS:
+            raise ValidationError(f"Unknown output format '{output_format}'. "
+                                  f"Use one of: {', '.join(OUTPUT_FORMATS)}")
 
 
 class FileOperationBase(ToolBase):
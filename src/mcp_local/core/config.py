@@ -2,6 +2,7 @@
 Configuration settings and constants for MCP Local
 """
 
+import os
 from pathlib import Path
 from typing import Dict, List
 
@@ -24,12 +25,51 @@ FILE_TYPE_GROUPS = {
 }
 
 # Backup configuration
-BACKUP_DIR = Path.home() / ".mcp_local_backups"
-BACKUP_DIR.mkdir(exist_ok=True)
+BACKUP_DIR = Path.home() / ".mcp_local_backups"  # created by the backup service on first use
+
+# Recursive deletes are staged here (when on the same filesystem) and purged after the undo window
+TRASH_DIR = Path.home() / ".mcp_local_trash"
+TRASH_UNDO_SECONDS = float(os.getenv("MCP_TRASH_UNDO_SECONDS", 600))
 
 # File size limits
 MAX_FILE_SIZE = 1024 * 1024  # 1MB
 
+# Tool output formats: Markdown-ish text for people, compact JSON for clients
+OUTPUT_FORMATS = ("text", "json")
+
+# Encoding detection
+ENCODING_SAMPLE_SIZE = 64 * 1024  # bytes inspected when sniffing an encoding
+ENCODING_CACHE_SIZE = 4096  # files whose detected encoding is remembered
+
+# Compiled search/replace patterns kept by the shared pattern cache
+PATTERN_CACHE_SIZE = 512
+
+# Search results kept for repeated queries; 0 disables the cache
+SEARCH_CACHE_SIZE = int(os.getenv("MCP_SEARCH_CACHE_SIZE", 32))
+
+# In-memory path index behind find_files
+PATH_INDEX_MAX_ROOTS = 8  # indexed roots kept before the least recently used is dropped
+PATH_INDEX_POLL_INTERVAL = 2.0  # seconds between directory mtime sweeps for outside changes
+
+# Symbol index behind find_symbol
+SYMBOL_INDEX_WORKERS = int(os.getenv("MCP_SYMBOL_WORKERS", min(4, os.cpu_count() or 1)))  # 0 extracts on a thread
+SYMBOL_INDEX_BATCH_SIZE = 32  # files per extraction task
+SYMBOL_INDEX_WAIT = 5.0  # seconds find_symbol waits for indexing before answering from a partial index
+
+# Per-tool metrics; MCP_METRICS=0 turns recording off, MCP_METRICS_FILE receives a Prometheus text dump
+METRICS_ENABLED = os.getenv("MCP_METRICS", "1").lower() in ("1", "true", "yes")
+METRICS_FILE = os.getenv("MCP_METRICS_FILE", "")
+METRICS_DUMP_INTERVAL = 10.0  # seconds between dumps to METRICS_FILE
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # latency bounds
+
+# Opt-in profiling: MCP_PROFILE names tools to profile ("*" for all), MCP_PROFILE_SAMPLE the fraction of their calls
+PROFILE_TOOLS = frozenset(name.strip() for name in os.getenv("MCP_PROFILE", "").split(",") if name.strip())
+PROFILE_SAMPLE_RATE = float(os.getenv("MCP_PROFILE_SAMPLE", 1.0))
+PROFILE_MODE = os.getenv("MCP_PROFILE_MODE", "cprofile")  # or "sample" for a wall-clock stack sampler
+PROFILE_DIR = Path(os.getenv("MCP_PROFILE_DIR", Path.home() / ".mcp_local_profiles"))
+PROFILE_TOP = 15  # functions listed in a profiled tool's response
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+
 # History configuration
 MAX_EDIT_HISTORY_ENTRIES = 100
 
@@ -38,3 +78,52 @@ DANGEROUS_COMMANDS = ['rm', 'del', 'format', 'sudo', 'su', 'passwd']
 
 # Timeout settings
 COMMAND_TIMEOUT = 30  # seconds
+
+# Concurrency control
+ADVISORY_FILE_LOCKS = os.getenv("MCP_ADVISORY_LOCKS", "0").lower() in ("1", "true", "yes")
+
+# Tool execution
+TOOL_WORKER_THREADS = int(os.getenv("MCP_WORKER_THREADS", min(32, (os.cpu_count() or 1) + 4)))
+TOOL_PROCESS_WORKERS = int(os.getenv("MCP_PROCESS_WORKERS", 0))  # 0 keeps CPU-bound work on threads
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv("MCP_TOOL_CONCURRENCY", 8))
+TOOL_FANOUT_THREADS = int(os.getenv("MCP_FANOUT_THREADS", 8))  # Threads for the parts of batched calls
+CLIENT_CONCURRENCY = int(os.getenv("MCP_CLIENT_CONCURRENCY", 0))  # Concurrent calls per client; 0 is unlimited
+
+# Seconds between progress notifications of long-running tools
+PROGRESS_INTERVAL = 0.25
+
+# Batched reads
+READ_FILES_MAX_BYTES = int(os.getenv("MCP_READ_FILES_MAX_BYTES", 512 * 1024))  # Content returned per call
+READ_FILES_MAX_FILES = 200
+FILES_INFO_MAX_PATHS = 10000  # Paths one get_files_info call may stat
+FILES_INFO_CHUNK = 64  # Paths stat'ed by one fanout task
+
+# HTTP transports
+HTTP_HOST = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.getenv("MCP_HTTP_PORT", 8000))
+HTTP_CLIENT_CONCURRENCY = 4  # Per-client limit over HTTP when MCP_CLIENT_CONCURRENCY is unset
+DRAIN_TIMEOUT = float(os.getenv("MCP_DRAIN_TIMEOUT", 30))  # Seconds shutdown waits for running calls
+HTTP_WORKERS = int(os.getenv("MCP_WORKERS", 1))  # Pre-forked server processes sharing one socket
+
+# State shared between server processes; unset keeps it in memory unless workers are used
+STATE_DB = os.getenv("MCP_STATE_DB", "")
+DEFAULT_STATE_DB = Path.home() / ".mcp_local_state.db"
+SHARED_CHANGES_KEPT = 10000  # Change feed rows kept for workers that fall behind
+
+
+def _parse_tool_limits(spec: str) -> Dict[str, int]:
+    """Parse "tool=limit,tool=limit" overrides"""
+    limits = {}
+    for item in spec.split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+# Per-tool concurrency limits; overridable with MCP_TOOL_LIMITS="search_adv=2,..."
+TOOL_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "search_adv": 4,
+    "search_in_files": 4,
+    **_parse_tool_limits(os.getenv("MCP_TOOL_LIMITS", "")),
+}
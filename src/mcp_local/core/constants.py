@@ -37,7 +37,6 @@ MAX_FILE_SIZE_BYTES = 1024 * 1024  # 1MB
 
 # Backup configuration
 BACKUP_DIR = Path.home() / ".mcp_backups"
-BACKUP_DIR.mkdir(exist_ok=True)
 
 # History configuration
 MAX_EDIT_HISTORY = 100
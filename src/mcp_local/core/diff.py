@@ -0,0 +1,281 @@
+"""
+Line diffing for get_file_diff
+
+difflib.SequenceMatcher looks for the longest matching block at every step,
+which is quadratic on large files with many changes. This module diffs lines
+the way git does instead:
+
+* every distinct line is interned to an int, so comparisons are int compares;
+* common prefixes and suffixes are stripped from each region first;
+* the remaining region is split at anchors: lines that occur rarely on both
+  sides (unique lines, as in patience diff, or failing those the least frequent
+  ones, as in histogram diff), keeping the longest run of them that is in the
+  same order on both sides;
+* regions without such lines go to Myers' O(ND) bisection, which gives up
+  and splits at its furthest point when the edit distance grows too large;
+  after a few such give-ups the regions left are reported as replaced.
+
+unified_diff() then yields the same format as difflib.unified_diff, one line at
+a time, so a large diff is never held as a list.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Hashable, Iterator, List, Sequence, Tuple
+
+# Lines occurring more often than this in a region are never used as anchors
+_MAX_OCCURRENCES = 64
+
+# Edit distance after which Myers bisection stops looking for the middle snake
+_MAX_COST = 512
+
+# Bisections per diff allowed to reach _MAX_COST; each costs about _MAX_COST ** 2
+# steps yet splits off only about _MAX_COST lines
+_MAX_GIVE_UPS = 8
+
+Block = Tuple[int, int, int]  # (a_start, b_start, length), as in difflib
+Opcode = Tuple[str, int, int, int, int]
+
+
+def _intern(a: Sequence[Hashable], b: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    ids: Dict[Hashable, int] = {}
+    return ([ids.setdefault(line, len(ids)) for line in a],
+            [ids.setdefault(line, len(ids)) for line in b])
+
+
+def _anchors(a: List[int], a0: int, a1: int, b: List[int], b0: int, b1: int) -> List[Tuple[int, int]]:
+    """Rare lines matched in order on both sides, or [] if every line is common"""
+    count_a = Counter(a[a0:a1])
+    count_b = Counter(b[b0:b1])
+    rarest = min((max(n, count_b[line]) for line, n in count_a.items() if line in count_b),
+                 default=None)
+    if rarest is None or rarest > _MAX_OCCURRENCES:
+        return []
+
+    # Pair the i-th occurrence on one side with the i-th on the other
+    seen: Dict[int, List[int]] = {}
+    for j in range(b0, b1):
+        line = b[j]
+        if line in count_a and max(count_a[line], count_b[line]) == rarest:
+            seen.setdefault(line, []).append(j)
+    taken: Dict[int, int] = {}
+    pairs = []
+    for i in range(a0, a1):
+        positions = seen.get(a[i])
+        if positions is not None:
+            k = taken.get(a[i], 0)
+            if k < len(positions):
+                pairs.append((i, positions[k]))
+                taken[a[i]] = k + 1
+
+    # Longest run of pairs in the same order on both sides (patience sorting)
+    tails: List[int] = []  # b position ending the best run of each length
+    tail_pair: List[int] = []
+    back: List[int] = []
+    for index, (_, j) in enumerate(pairs):
+        length = bisect_left(tails, j)
+        if length == len(tails):
+            tails.append(j)
+            tail_pair.append(index)
+        else:
+            tails[length] = j
+            tail_pair[length] = index
+        back.append(tail_pair[length - 1] if length else -1)
+    run = []
+    index = tail_pair[-1] if tail_pair else -1
+    while index != -1:
+        run.append(pairs[index])
+        index = back[index]
+    run.reverse()
+    return run
+
+
+def _bisect(a: List[int], a0: int, a1: int, b: List[int], b0: int, b1: int) -> Tuple[int, int, bool]:
+    """Point on a shortest (or, past _MAX_COST, a reasonable) edit path to split at, and whether it is exact"""
+    n = a1 - a0
+    m = b1 - b0
+    max_d = min((n + m + 1) // 2, _MAX_COST)
+    # Only diagonals within max_d of the start are reached, so the arrays need not span n + m
+    offset = max_d + 1
+    length = 2 * offset + 1
+    forward = [-1] * length
+    backward = [-1] * length
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    odd = delta & 1
+    k1_start = k1_end = k2_start = k2_end = 0
+    best = (0, 0)
+    for d in range(max_d):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a0 + x1] == b[b0 + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            else:
+                if x1 + y1 > best[0] + best[1]:
+                    best = (x1, y1)
+                if odd:
+                    k2_offset = offset + delta - k1
+                    if 0 <= k2_offset < length and backward[k2_offset] != -1:
+                        if x1 >= n - backward[k2_offset]:
+                            return a0 + x1, b0 + y1, True
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a1 - x2 - 1] == b[b1 - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not odd:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < length and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    y1 = x1 - (k1_offset - offset)
+                    if x1 >= n - x2:
+                        return a0 + x1, b0 + y1, True
+    # Too expensive to finish: split where the forward search got furthest
+    if best == (0, 0) or best == (n, m):
+        return a0 + n // 2, b0 + m // 2, False
+    return a0 + best[0], b0 + best[1], False
+
+
+def matching_blocks(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[Block]:
+    """Matching runs of a and b, sorted and ending with (len(a), len(b), 0)"""
+    a_ids, b_ids = _intern(a, b)
+    found: List[Block] = []
+    regions = [(0, len(a_ids), 0, len(b_ids))]
+    give_ups = _MAX_GIVE_UPS
+    while regions:
+        a0, a1, b0, b1 = regions.pop()
+        start = 0
+        while a0 + start < a1 and b0 + start < b1 and a_ids[a0 + start] == b_ids[b0 + start]:
+            start += 1
+        if start:
+            found.append((a0, b0, start))
+            a0 += start
+            b0 += start
+        end = 0
+        while a0 < a1 - end and b0 < b1 - end and a_ids[a1 - end - 1] == b_ids[b1 - end - 1]:
+            end += 1
+        if end:
+            a1 -= end
+            b1 -= end
+            found.append((a1, b1, end))
+        if a0 == a1 or b0 == b1:
+            continue
+
+        anchors = _anchors(a_ids, a0, a1, b_ids, b0, b1)
+        if anchors:
+            for i, j in anchors:
+                found.append((i, j, 1))
+                regions.append((a0, i, b0, j))
+                a0, b0 = i + 1, j + 1
+            regions.append((a0, a1, b0, b1))
+        elif give_ups and not set(a_ids[a0:a1]).isdisjoint(b_ids[b0:b1]):
+            x, y, exact = _bisect(a_ids, a0, a1, b_ids, b0, b1)
+            if not exact:
+                give_ups -= 1
+            regions.append((a0, x, b0, y))
+            regions.append((x, a1, y, b1))
+
+    found.sort()
+    blocks: List[Block] = []
+    for i, j, size in found:
+        if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+            blocks[-1] = (blocks[-1][0], blocks[-1][1], blocks[-1][2] + size)
+        else:
+            blocks.append((i, j, size))
+    blocks.append((len(a_ids), len(b_ids), 0))
+    return blocks
+
+
+def opcodes(blocks: List[Block]) -> Iterator[Opcode]:
+    """difflib-style (tag, i1, i2, j1, j2) operations turning a into b"""
+    i = j = 0
+    for ai, bj, size in blocks:
+        if i < ai and j < bj:
+            yield ("replace", i, ai, j, bj)
+        elif i < ai:
+            yield ("delete", i, ai, j, bj)
+        elif j < bj:
+            yield ("insert", i, ai, j, bj)
+        i, j = ai + size, bj + size
+        if size:
+            yield ("equal", ai, i, bj, j)
+
+
+def grouped_opcodes(blocks: List[Block], n: int = 3) -> Iterator[List[Opcode]]:
+    """Changes grouped into hunks with up to n lines of context, as in difflib"""
+    codes = list(opcodes(blocks))
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = (tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2)
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = (tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n))
+
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "", tofile: str = "",
+                 n: int = 3, lineterm: str = "\n") -> Iterator[str]:
+    """Lines of a unified diff from a to b, in difflib.unified_diff's format"""
+    started = False
+    for group in grouped_opcodes(matching_blocks(a, b), n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}{lineterm}"
+            yield f"+++ {tofile}{lineterm}"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@{lineterm}"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
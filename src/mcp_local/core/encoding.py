@@ -0,0 +1,205 @@
+"""
+Encoding detection and decoding helpers
+
+Text is decoded exactly once: the encoding is sniffed from a byte-order mark or a
+bounded sample of the raw bytes, remembered per file (keyed by mtime and size) and
+then applied to the whole buffer.
+"""
+
+import codecs
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from .config import ENCODING_CACHE_SIZE, ENCODING_SAMPLE_SIZE
+from .metrics import metrics
+
+try:  # Optional, only consulted for non-UTF-8 samples
+    import chardet
+except ImportError:  # pragma: no cover - depends on environment
+    chardet = None
+
+
+# Ordered so that UTF-32 LE wins over the UTF-16 LE BOM it starts with
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Bytes that are undefined in cp1252; their presence means latin-1 is the safer guess
+_CP1252_UNDEFINED = (b"\x81", b"\x8d", b"\x8f", b"\x90", b"\x9d")
+
+# Codecs that can represent any str, so a failed encode is a real error
+_UNICODE_CODECS = frozenset({"utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-16-be", "utf-32"})
+
+_cache: "OrderedDict[str, Tuple[int, int, Optional[str]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def sniff_encoding(sample: bytes) -> Optional[str]:
+    """Guess the encoding of a byte sample, returning None for binary data"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if b"\0" in sample:
+        return _sniff_utf16(sample)
+
+    # An incremental decoder tolerates a multi-byte character cut at the sample edge
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    if chardet is not None:
+        guess = chardet.detect(sample)
+        if guess.get("encoding") and guess.get("confidence", 0) >= 0.5:
+            try:
+                return codecs.lookup(guess["encoding"]).name
+            except LookupError:
+                pass
+
+    return _legacy_encoding(sample)
+
+
+def _legacy_encoding(data: bytes) -> str:
+    """Choose between cp1252 and latin-1 for data that is not valid UTF-8"""
+    if any(byte in data for byte in _CP1252_UNDEFINED):
+        return "latin-1"
+    return "cp1252"
+
+
+def _sniff_utf16(sample: bytes) -> Optional[str]:
+    """Detect BOM-less UTF-16 from the NUL byte layout, otherwise treat as binary"""
+    even = sample[0::2]
+    odd = sample[1::2]
+    if not even or not odd:
+        return None
+    # Mostly-ASCII UTF-16 text has NUL in every other byte
+    if odd.count(0) > len(odd) * 0.9 and even.count(0) < len(even) * 0.1:
+        return "utf-16-le"
+    if even.count(0) > len(even) * 0.9 and odd.count(0) < len(odd) * 0.1:
+        return "utf-16-be"
+    return None
+
+
+def _cache_key(path: Path) -> str:
+    return os.fspath(path)
+
+
+def get_cached_encoding(path: Union[str, Path]) -> Optional[str]:
+    """Return the last encoding detected for a path, ignoring staleness"""
+    with _cache_lock:
+        entry = _cache.get(_cache_key(Path(path)))
+    return entry[2] if entry else None
+
+
+def remember_encoding(path: Union[str, Path], encoding: Optional[str],
+                      stat_result: Optional[os.stat_result] = None) -> None:
+    """Record the encoding of a file for its current mtime and size"""
+    try:
+        st = stat_result or os.stat(path)
+    except OSError:
+        return
+    key = _cache_key(Path(path))
+    with _cache_lock:
+        _cache[key] = (st.st_mtime_ns, st.st_size, encoding)
+        _cache.move_to_end(key)
+        while len(_cache) > ENCODING_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_encoding_cache() -> None:
+    """Forget all cached encodings"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def detect_encoding(path: Union[str, Path], sample: Optional[bytes] = None,
+                    stat_result: Optional[os.stat_result] = None) -> Optional[str]:
+    """Detect the encoding of a file, using the cache when the file is unchanged"""
+    path = Path(path)
+    st = stat_result or path.stat()
+    key = _cache_key(path)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _cache.move_to_end(key)
+            return entry[2]
+
+    if sample is None:
+        with open(path, "rb") as f:
+            sample = f.read(ENCODING_SAMPLE_SIZE)
+    encoding = sniff_encoding(sample[:ENCODING_SAMPLE_SIZE])
+    remember_encoding(path, encoding, st)
+    return encoding
+
+
+def decode_bytes(data: bytes, encoding: str) -> str:
+    """Decode bytes with universal newline translation, like text-mode open()"""
+    text = data.decode(encoding)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_text(path: Union[str, Path]) -> Optional[Tuple[str, str]]:
+    """
+    Read and decode a text file in a single pass.
+
+    Returns a ``(text, encoding)`` tuple, or None when the file looks binary.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    metrics.add("bytes_read", len(data))
+    return decode_file_bytes(path, data, st)
+
+
+def decode_file_bytes(path: Union[str, Path], data: bytes,
+                      stat_result: os.stat_result) -> Optional[Tuple[str, str]]:
+    """Decode bytes already read from path, returning None when they look binary"""
+    encoding = detect_encoding(path, sample=data, stat_result=stat_result)
+    if encoding is None:
+        return None
+
+    try:
+        return decode_bytes(data, encoding), encoding
+    except UnicodeDecodeError:
+        # The sample looked clean but the tail did not; latin-1 always decodes
+        encoding = _legacy_encoding(data) if encoding == "utf-8" else "latin-1"
+        try:
+            text = decode_bytes(data, encoding)
+        except UnicodeDecodeError:
+            encoding = "latin-1"
+            text = decode_bytes(data, encoding)
+        remember_encoding(path, encoding, stat_result)
+        return text, encoding
+
+
+def encode_for_write(path: Union[str, Path], content: str,
+                     encoding: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Encode text for writing, preserving the encoding the file was read with.
+
+    Newlines are translated to ``os.linesep`` like text-mode open(). Returns the
+    encoded bytes and the encoding used, falling back to UTF-8 when the
+    preferred legacy codec cannot represent the content.
+    """
+    encoding = encoding or get_cached_encoding(path) or "utf-8"
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    try:
+        return content.encode(encoding), encoding
+    except UnicodeEncodeError:
+        if codecs.lookup(encoding).name in _UNICODE_CODECS:
+            raise
+        return content.encode("utf-8"), "utf-8"
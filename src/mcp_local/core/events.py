@@ -0,0 +1,67 @@
+"""
+In-process notifications about filesystem changes made by this server
+
+Services that keep derived state about the tree (such as the path index) subscribe
+here, and everything that writes, creates, moves or deletes files reports the
+affected paths. Changes made by other processes are not seen; subscribers that
+care poll modification times for those. The exception is other workers of the
+same server: with a shared store configured, each change is also published there
+and sync() replays the changes of the other workers.
+"""
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union
+
+if TYPE_CHECKING:
+    from .store import SharedStore
+
+ChangeListener = Callable[[Path], None]
+
+
+class ChangeNotifier:
+    """Fan-out of changed paths to registered listeners"""
+
+    def __init__(self):
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.Lock()
+        self.relay: Optional["SharedStore"] = None  # Publishes changes to the other workers
+
+    def subscribe(self, listener: ChangeListener) -> Callable[[], None]:
+        """Register a listener; returns a function that unregisters it"""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def notify(self, *paths: Union[str, Path]) -> None:
+        """Report paths that were created, modified or removed"""
+        self._deliver(paths)
+        if self.relay is not None and self.relay.enabled:
+            self.relay.publish_changes(paths)
+
+    def sync(self) -> None:
+        """Deliver the changes other workers published since the last sync"""
+        if self.relay is not None and self.relay.enabled:
+            self._deliver(self.relay.pending_changes())
+
+    def _deliver(self, paths: Iterable[Union[str, Path]]) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for path in paths:
+            path = Path(path)
+            for listener in listeners:
+                try:
+                    listener(path)
+                except Exception:
+                    # A broken subscriber must not fail the write that triggered it
+                    continue
+
+
+# Global change notifier instance
+change_notifier = ChangeNotifier()
@@ -46,3 +46,13 @@ class CommandError(MCPFileManagerError):
 class ValidationError(MCPFileManagerError):
     """Raised when validation fails"""
     pass
+
+
+class ConflictError(MCPFileManagerError):
+    """Raised when a file changed since the version an edit was based on"""
+    pass
+
+
+class ServerDrainingError(MCPFileManagerError):
+    """Raised when a tool is called while the server is shutting down"""
+    pass
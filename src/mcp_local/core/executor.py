@@ -0,0 +1,246 @@
+"""
+Worker pool for running tool work off the event loop
+
+FastMCP awaits tool functions on a single event loop, so blocking file I/O or a
+long search in one tool would stall every other request. Tool wrappers hand
+their work to a ToolExecutor instead, which runs it on a shared thread pool (or
+a process pool for CPU-bound work, when configured) behind per-tool limits.
+
+When several clients share the server over HTTP, each client's session can also
+be held to a number of concurrent calls, so one busy client cannot take every
+worker. On shutdown the executor drains: new calls are refused while the ones
+already running finish.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from .config import (
+    CLIENT_CONCURRENCY,
+    DEFAULT_TOOL_CONCURRENCY,
+    TOOL_CONCURRENCY_LIMITS,
+    TOOL_FANOUT_THREADS,
+    TOOL_PROCESS_WORKERS,
+    TOOL_WORKER_THREADS,
+)
+from .events import change_notifier
+from .exceptions import ServerDrainingError
+from .metrics import metrics
+from .profiling import attach_report, tool_profiler
+
+if TYPE_CHECKING:  # multiprocessing is slow to import and rarely needed
+    from concurrent.futures import ProcessPoolExecutor
+
+
+def current_client() -> Any:
+    """Session of the MCP client whose request is being handled, or None outside a request"""
+    from mcp.server.lowlevel.server import request_ctx
+
+    context = request_ctx.get(None)
+    return context.session if context is not None else None
+
+
+def _synced(call: Callable[[], Any]) -> Any:
+    """Replay the changes other workers published, then make the call"""
+    change_notifier.sync()
+    return call()
+
+
+class ToolExecutor:
+    """Runs blocking tool calls on worker pools with per-tool concurrency limits"""
+
+    def __init__(self, max_workers: int = TOOL_WORKER_THREADS,
+                 process_workers: int = TOOL_PROCESS_WORKERS,
+                 concurrency_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = DEFAULT_TOOL_CONCURRENCY,
+                 client_limit: int = CLIENT_CONCURRENCY,
+                 client_key: Callable[[], Any] = current_client,
+                 fanout_workers: int = TOOL_FANOUT_THREADS):
+        self.max_workers = max(1, max_workers)
+        self.fanout_workers = max(1, fanout_workers)
+        self.process_workers = max(0, process_workers)
+        self.concurrency_limits = dict(TOOL_CONCURRENCY_LIMITS if concurrency_limits is None
+                                       else concurrency_limits)
+        self.default_limit = max(1, default_limit)
+        self.client_limit = max(0, client_limit)
+        self.client_key = client_key
+        self.in_flight = 0
+        self.draining = False
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._fanout_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional["ProcessPoolExecutor"] = None
+        self._pool_lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Keyed by session, so a disconnected client's semaphore goes with it
+        self._client_semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """Shared thread pool, created on first use"""
+        if self._thread_pool is None:
+            with self._pool_lock:
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                           thread_name_prefix="mcp-tool")
+        return self._thread_pool
+
+    @property
+    def fanout_pool(self) -> ThreadPoolExecutor:
+        """Threads for the parts a running tool call splits its work into
+
+        Separate from thread_pool, so a call waiting on its parts can never starve
+        the pool it runs on.
+        """
+        if self._fanout_pool is None:
+            with self._pool_lock:
+                if self._fanout_pool is None:
+                    self._fanout_pool = ThreadPoolExecutor(max_workers=self.fanout_workers,
+                                                           thread_name_prefix="mcp-fanout")
+        return self._fanout_pool
+
+    def fanout(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Submit part of the running call's work to the fanout pool, in the caller's context"""
+        return self.fanout_pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+    @property
+    def process_pool(self) -> Optional["ProcessPoolExecutor"]:
+        """Process pool for CPU-bound work, or None when disabled"""
+        if self.process_workers <= 0:
+            return None
+        if self._process_pool is None:
+            with self._pool_lock:
+                if self._process_pool is None:
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    def limit_for(self, tool_name: str) -> int:
+        """Maximum number of concurrent calls allowed for a tool"""
+        return max(1, self.concurrency_limits.get(tool_name, self.default_limit))
+
+    def set_limit(self, tool_name: str, limit: int) -> None:
+        """Change the concurrency limit of a tool for calls started afterwards"""
+        self.concurrency_limits[tool_name] = limit
+        self._semaphores.pop(tool_name, None)
+
+    def set_client_limit(self, limit: int) -> None:
+        """Change the per-client concurrency limit (0 for none) for calls started afterwards"""
+        self.client_limit = max(0, limit)
+        self._client_semaphores = weakref.WeakKeyDictionary()
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop they were first awaited on
+            self._loop = loop
+            self._semaphores = {}
+            self._client_semaphores = weakref.WeakKeyDictionary()
+
+    def _client_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if not self.client_limit:
+            return None
+        client = self.client_key()
+        if client is None:
+            return None
+        semaphore = self._client_semaphores.get(client)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.client_limit)
+            self._client_semaphores[client] = semaphore
+        return semaphore
+
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(tool_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit_for(tool_name))
+            self._semaphores[tool_name] = semaphore
+        return semaphore
+
+    async def run(self, tool_name: str, func: Callable[..., Any], *args: Any,
+                  cpu_bound: bool = False, profile: bool = False, **kwargs: Any) -> Any:
+        """Run func(*args, **kwargs) on a worker and await its result
+
+        With profile=True (or when MCP_PROFILE selects the tool) the call runs under
+        a profiler and the report is attached to the result. Raises ServerDrainingError
+        once drain() has begun.
+        """
+        if self.draining:
+            raise ServerDrainingError(f"Server is shutting down; {tool_name} was not run")
+        self._check_loop()
+        self.in_flight += 1
+        client_semaphore = self._client_semaphore()
+        try:
+            if client_semaphore is None:
+                return await self._run_limited(tool_name, func, args, kwargs, cpu_bound, profile)
+            async with client_semaphore:
+                return await self._run_limited(tool_name, func, args, kwargs, cpu_bound, profile)
+        finally:
+            self.in_flight -= 1
+
+    async def _run_limited(self, tool_name: str, func: Callable[..., Any], args: tuple, kwargs: dict,
+                           cpu_bound: bool, profile: bool) -> Any:
+        async with self._semaphore(tool_name):
+            started = metrics.begin(tool_name)
+            failed = True
+            profiled = tool_profiler.should_profile(tool_name, profile)
+            if profiled:
+                func, leading = tool_profiler.wrap(tool_name, func)
+                args = leading + args
+            try:
+                loop = asyncio.get_running_loop()
+                # Other workers' writes invalidate this process's indexes before the call looks at
+                # them; the replay reads SQLite, so it runs on a worker rather than the event loop
+                relay = change_notifier.relay
+                sync = relay is not None and relay.enabled
+                executor: Executor = self.thread_pool
+                if cpu_bound and self.process_pool is not None:
+                    executor = self.process_pool
+                    call = functools.partial(func, *args, **kwargs)
+                    if sync:
+                        await loop.run_in_executor(self.thread_pool, change_notifier.sync)
+                else:
+                    # Threads inherit the caller's context variables
+                    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+                    if sync:
+                        call = functools.partial(_synced, call)
+                result = await loop.run_in_executor(executor, call)
+                failed = False
+                return attach_report(*result) if profiled else result
+            finally:
+                metrics.end(tool_name, started, error=failed)
+
+    def begin_drain(self) -> None:
+        """Refuse new calls from now on; calls already started keep running"""
+        self.draining = True
+
+    async def drain(self, timeout: float) -> bool:
+        """Refuse new calls and wait up to timeout seconds for running ones; True if all finished"""
+        self.begin_drain()
+        deadline = time.monotonic() + timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return not self.in_flight
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pools"""
+        with self._pool_lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=wait)
+                self._thread_pool = None
+            if self._fanout_pool is not None:
+                self._fanout_pool.shutdown(wait=wait)
+                self._fanout_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
+
+
+# Global tool executor instance
+tool_executor = ToolExecutor()
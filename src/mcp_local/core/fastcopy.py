@@ -0,0 +1,178 @@
+"""
+Fast file copies for bulk copy and move
+
+copy_file() moves a file's bytes with the cheapest mechanism the filesystems
+involved support, trying in turn:
+
+* ``clone``: a FICLONE reflink, which shares the source's blocks and completes
+  in constant time on Btrfs, XFS and other copy-on-write filesystems;
+* ``copy_file_range``: an in-kernel copy that never passes through user space
+  and that some filesystems (NFS, SMB, XFS) offload to the server or device;
+* ``sendfile``: an in-kernel copy for kernels and filesystem pairs where
+  copy_file_range is refused;
+* ``read``: a plain read/write loop with a large buffer.
+
+A mechanism refused for one pair of devices is not tried again for that pair.
+plan_tree() lists what copying a directory tree involves, so the files can be
+spread over worker threads.
+"""
+
+import errno
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# ioctl number of FICLONE on Linux (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+# Bytes handed to one copy_file_range/sendfile call, and the read buffer size
+_CHUNK = 64 * 1024 * 1024
+_BUFFER = 1024 * 1024
+
+# Errors meaning "this mechanism does not work here", as opposed to a failed copy
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY,
+                errno.EBADF, errno.ENOTSOCK, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+_refused: Dict[Tuple[int, int], Set[str]] = {}
+_refused_lock = threading.Lock()
+
+ProgressCallback = Callable[[int], None]  # Called with the number of bytes just copied
+
+
+class TreePlan(NamedTuple):
+    """What copying one file or directory tree involves"""
+    dirs: List[Tuple[Path, Path]]  # (source, target), parents before children
+    files: List[Tuple[Path, Path, int]]  # (source, target, size)
+    links: List[Tuple[Path, Path]]  # (source, target) of symbolic links, recreated as links
+    total_bytes: int
+
+
+def _refuse(devices: Tuple[int, int], method: str) -> None:
+    with _refused_lock:
+        _refused.setdefault(devices, set()).add(method)
+
+
+def _clone(src_fd: int, dst_fd: int) -> None:
+    import fcntl
+
+    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+
+
+def _kernel_copy(copy: Callable[[int, int, int], int], src_fd: int, dst_fd: int, size: int,
+                 on_bytes: Optional[ProgressCallback]) -> None:
+    copied = 0
+    while True:
+        sent = copy(src_fd, dst_fd, _CHUNK)
+        if not sent:
+            break
+        copied += sent
+        if on_bytes:
+            on_bytes(sent)
+    if copied < size:
+        raise OSError(errno.EIO, f"Copy stopped after {copied} of {size} bytes")
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count)
+
+
+def _sendfile(src_fd: int, dst_fd: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, None, count)
+
+
+def _read_write(src_fd: int, dst_fd: int, on_bytes: Optional[ProgressCallback]) -> None:
+    buffer = bytearray(_BUFFER)
+    view = memoryview(buffer)
+    with open(src_fd, "rb", buffering=0, closefd=False) as fsrc, \
+            open(dst_fd, "wb", buffering=0, closefd=False) as fdst:
+        while True:
+            read = fsrc.readinto(buffer)
+            if not read:
+                break
+            fdst.write(view[:read])
+            if on_bytes:
+                on_bytes(read)
+
+
+def copy_bytes(src_fd: int, dst_fd: int, size: int, devices: Tuple[int, int],
+               on_bytes: Optional[ProgressCallback] = None) -> str:
+    """Copy an open file's content into an empty one; returns the mechanism used"""
+    with _refused_lock:
+        refused = set(_refused.get(devices, ()))
+    attempts = []
+    if sys.platform.startswith("linux"):
+        attempts.append(("clone", None))
+    if hasattr(os, "copy_file_range"):
+        attempts.append(("copy_file_range", _copy_file_range))
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        attempts.append(("sendfile", _sendfile))
+
+    for method, copy in attempts:
+        if method in refused:
+            continue
+        try:
+            if copy is None:
+                _clone(src_fd, dst_fd)
+                if on_bytes:
+                    on_bytes(size)
+            else:
+                _kernel_copy(copy, src_fd, dst_fd, size, on_bytes)
+            return method
+        except OSError as e:
+            # Only a mechanism that failed before writing anything can be replaced by the next
+            if e.errno not in _UNSUPPORTED or os.lseek(dst_fd, 0, os.SEEK_CUR):
+                raise
+            _refuse(devices, method)
+            os.lseek(src_fd, 0, os.SEEK_SET)
+    _read_write(src_fd, dst_fd, on_bytes)
+    return "read"
+
+
+def copy_file(src: Path, dst: Path, on_bytes: Optional[ProgressCallback] = None) -> Tuple[int, str]:
+    """Copy a regular file's content, mode and timestamps; returns (bytes, mechanism)"""
+    import shutil
+
+    with open(src, "rb") as fsrc:
+        stat = os.fstat(fsrc.fileno())
+        with open(dst, "wb") as fdst:
+            if stat.st_size:
+                devices = (stat.st_dev, os.fstat(fdst.fileno()).st_dev)
+                method = copy_bytes(fsrc.fileno(), fdst.fileno(), stat.st_size, devices, on_bytes)
+            else:
+                method = "empty"
+    shutil.copystat(src, dst)
+    return stat.st_size, method
+
+
+def plan_tree(src: Path, dst: Path) -> TreePlan:
+    """Directories, files and links to create when copying src (a file or a tree) to dst"""
+    if src.is_symlink():
+        return TreePlan([], [], [(src, dst)], 0)
+    if not src.is_dir():
+        return TreePlan([], [(src, dst, src.stat().st_size)], [], src.stat().st_size)
+
+    dirs = [(src, dst)]
+    files: List[Tuple[Path, Path, int]] = []
+    links: List[Tuple[Path, Path]] = []
+    total = 0
+    pending = [(src, dst)]
+    while pending:
+        source_dir, target_dir = pending.pop()
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                source = source_dir / entry.name
+                target = target_dir / entry.name
+                if entry.is_symlink():
+                    links.append((source, target))
+                elif entry.is_dir(follow_symlinks=False):
+                    dirs.append((source, target))
+                    pending.append((source, target))
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    files.append((source, target, size))
+                    total += size
+    # Largest files first, so one big file does not start last and finish alone
+    files.sort(key=lambda item: item[2], reverse=True)
+    return TreePlan(dirs, files, links, total)
@@ -0,0 +1,265 @@
+"""
+Fuzzy path matching for "go to file" style lookups
+
+A query matches a path when its characters appear in it in order, ignoring case:
+``srvcfg`` matches ``server/config.py``. A FuzzyPathSet answers such queries over
+hundreds of thousands of paths without a Python-level loop per path:
+
+* Paths are split into their directory (shared by many files) and basename.
+  Matching greedily is optimal for subsequences, so a directory is matched once
+  for all of its files: it consumes some prefix of the query and each file only
+  has to match the rest within its short basename.
+* Both steps advance all candidates one query character at a time with NumPy,
+  looking up "next occurrence of this byte after position p" by binary search in
+  per-byte occurrence tables built once per set.
+* Only the most promising ``SCORE_LIMIT`` matches get the editor-like score.
+
+Without NumPy the same results come from one regex over all paths.
+"""
+
+import heapq
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from .utils import optional_import
+
+# Optional acceleration for the candidate search; NumPy is slow to import, so
+# this happens when the first set is built rather than at server startup
+np = None
+_numpy_tried = False
+_numpy_lock = threading.Lock()
+
+# Matches that get a full score; the rest are pre-ranked cheaply
+SCORE_LIMIT = 300
+
+_SEPARATORS = "/_-. "
+
+
+def _byte_bits():
+    """Bit assigned to each byte value; newlines get none"""
+    if np is None:
+        return None
+    table = np.array([1 << (b % 64) for b in range(256)], dtype=np.uint64)
+    table[10] = 0
+    return table
+
+
+_BYTE_BITS = None
+
+
+def _have_numpy() -> bool:
+    """Import NumPy on first use; False when it is not installed"""
+    global np, _BYTE_BITS, _numpy_tried
+    if not _numpy_tried:
+        with _numpy_lock:
+            if not _numpy_tried:
+                np = optional_import("numpy")
+                _BYTE_BITS = _byte_bits()
+                _numpy_tried = True  # Last, so threads that skip the lock see np and _BYTE_BITS set
+    return np is not None
+
+
+class FuzzyMatch(NamedTuple):
+    """A ranked path with the positions of the matched query characters"""
+    path: str
+    score: float
+    positions: List[int]
+
+
+def _alignment(query: str, text: str, start: int) -> Optional[List[int]]:
+    """Greedy left-to-right positions of query characters in text from start"""
+    positions = []
+    find = text.find
+    pos = start
+    for char in query:
+        pos = find(char, pos)
+        if pos == -1:
+            return None
+        positions.append(pos)
+        pos += 1
+    return positions
+
+
+def _score_positions(path: str, positions: List[int], base: int) -> float:
+    score = 0.0
+    previous = -2
+    for pos in positions:
+        if pos == 0 or path[pos - 1] in _SEPARATORS:
+            score += 16  # Start of a segment or word
+        elif path[pos - 1].islower() and path[pos].isupper():
+            score += 12  # camelCase hump
+        if pos == previous + 1:
+            score += 15  # Consecutive characters
+        elif previous >= 0:
+            score -= min(pos - previous - 1, 6)
+        if pos >= base:
+            score += 8  # Inside the file name
+        previous = pos
+    return score
+
+
+def score_path(query: str, path: str) -> Optional[FuzzyMatch]:
+    """Score one path against a lower-case query, or None if it does not match"""
+    lowered = path.lower()
+    if len(lowered) != len(path):
+        lowered = path  # Case mapping changed the length; fall back to exact case
+    base = path.rfind("/") + 1
+    name = lowered[base:]
+
+    candidates = []
+    substring = name.find(query)
+    if substring != -1:
+        candidates.append(list(range(base + substring, base + substring + len(query))))
+    else:
+        whole = lowered.rfind(query)
+        if whole != -1:
+            candidates.append(list(range(whole, whole + len(query))))
+    for start in (base, 0):
+        positions = _alignment(query, lowered, start)
+        if positions is not None:
+            candidates.append(positions)
+    if not candidates:
+        return None
+
+    score, positions = max(((_score_positions(path, p, base), p) for p in candidates),
+                           key=lambda item: item[0])
+    if substring != -1:
+        score += 30
+        if substring == 0:
+            score += 20
+        if name == query or name.rsplit(".", 1)[0] == query:
+            score += 40
+    score -= len(path) * 0.2
+    return FuzzyMatch(path, score, positions)
+
+
+class _ByteTable:
+    """Newline-separated strings as bytes, with sorted positions of every byte value"""
+
+    def __init__(self, strings: Sequence[str]):
+        blob = "\n".join(strings).lower().encode("utf-8", "surrogateescape")
+        self.data = np.frombuffer(blob, dtype=np.uint8)
+        newlines = np.flatnonzero(self.data == 10)
+        self.starts = np.concatenate(([0], newlines + 1)).astype(np.int64)
+        self.ends = np.concatenate((newlines, [len(self.data)])).astype(np.int64)
+        # A stable sort groups positions by byte value while keeping them ascending
+        order = np.argsort(self.data, kind="stable").astype(np.int64)
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(self.data, minlength=256))))
+        self.occurrences = [order[bounds[b]:bounds[b + 1]] for b in range(256)]
+        # Which characters each row contains, as a 64-bit set, for cheap rejection
+        bits = np.append(_BYTE_BITS[self.data], np.uint64(0))
+        self.masks = np.bitwise_or.reduceat(bits, self.starts)
+        self.masks[self.starts == self.ends] = 0
+
+    def advance(self, rows: "np.ndarray", pos: "np.ndarray", byte: int):
+        """Next position of byte at or after pos within each row, and which rows have one"""
+        occ = self.occurrences[byte]
+        if not len(occ):
+            return np.zeros(len(rows), dtype=bool), pos
+        idx = np.searchsorted(occ, pos)
+        found = idx < len(occ)
+        nxt = occ[np.minimum(idx, len(occ) - 1)]
+        found &= nxt < self.ends[rows]
+        return found, nxt
+
+
+class FuzzyPathSet:
+    """Immutable set of relative paths searchable by fuzzy subsequence"""
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths: List[str] = list(paths)
+        self._vectorized = bool(self.paths) and _have_numpy()
+        if self._vectorized:
+            self._build_tables()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _build_tables(self) -> None:
+        dir_ids: Dict[str, int] = {}
+        file_dirs = []
+        names = []
+        for path in self.paths:
+            cut = path.rfind("/") + 1
+            # Directories keep their trailing slash so queries can match it
+            file_dirs.append(dir_ids.setdefault(path[:cut], len(dir_ids)))
+            names.append(path[cut:])
+        self._dirs = _ByteTable(list(dir_ids))
+        self._names = _ByteTable(names)
+        self._file_dirs = np.array(file_dirs, dtype=np.int64)
+        self._lengths = np.fromiter((len(p) for p in self.paths), dtype=np.int64, count=len(self.paths))
+
+    def _dir_progress(self, query: bytes) -> "np.ndarray":
+        """How many leading query bytes each directory consumes, matching greedily"""
+        table = self._dirs
+        consumed = np.zeros(len(table.starts), dtype=np.int64)
+        rows = np.arange(len(table.starts))
+        pos = table.starts.copy()
+        for step, byte in enumerate(query):
+            found, nxt = table.advance(rows, pos, byte)
+            rows, pos = rows[found], nxt[found] + 1
+            consumed[rows] = step + 1
+            if not len(rows):
+                break
+        return consumed
+
+    def _match_ids(self, query: bytes):
+        """Ids of the paths containing the query, and per path how much its directory consumed"""
+        consumed = self._dir_progress(query)[self._file_dirs]
+        table = self._names
+        # Characters each file name must contain given what its directory consumed
+        need = np.zeros(len(query) + 1, dtype=np.uint64)
+        for done in range(len(query) - 1, -1, -1):
+            need[done] = need[done + 1] | _BYTE_BITS[query[done]]
+        required = need[consumed]
+        viable = np.flatnonzero((table.masks & required) == required)
+        consumed_viable = consumed[viable]
+        matched = [viable[consumed_viable == len(query)]]
+        for done in range(len(query)):
+            rows = viable[consumed_viable == done]
+            pos = table.starts[rows]
+            for byte in query[done:]:
+                if not len(rows):
+                    break
+                found, nxt = table.advance(rows, pos, byte)
+                rows, pos = rows[found], nxt[found] + 1
+            matched.append(rows)
+        return np.concatenate(matched), consumed
+
+    def candidates(self, query: str, limit: int = SCORE_LIMIT) -> List[str]:
+        """Up to ``limit`` paths containing the query as a case-insensitive subsequence"""
+        query = query.lower()
+        if not query or not self.paths:
+            return []
+        if self._vectorized:
+            ids, consumed = self._match_ids(query.encode("utf-8", "surrogateescape"))
+            # Pre-rank: more of the query inside the file name first, then shorter paths
+            keys = (consumed[ids] << 32) | self._lengths[ids]
+            if len(ids) > limit:
+                best = np.argpartition(keys, limit)[:limit]
+                ids, keys = ids[best], keys[best]
+            paths = self.paths
+            return [paths[i] for i in ids[np.argsort(keys, kind="stable")].tolist()]
+        found = _subsequence_regex(query).findall("\n".join(self.paths))
+        if len(found) > limit:
+            found = heapq.nsmallest(limit, found, key=len)
+        return found
+
+
+def _subsequence_regex(query: str) -> "re.Pattern[str]":
+    """Line-anchored regex matching lines that contain the query as a subsequence"""
+    parts = ["^"]
+    for char in query:
+        escaped = re.escape(char)
+        parts.append(f"[^\\n{escaped}]*{escaped}")
+    parts.append("[^\\n]*$")
+    return re.compile("".join(parts), re.MULTILINE | re.IGNORECASE)
+
+
+def rank(query: str, paths: Iterable[str], limit: int) -> List[FuzzyMatch]:
+    """Score candidate paths and return the best ``limit`` of them"""
+    query = query.lower()
+    scored = (score_path(query, path) for path in paths)
+    return heapq.nlargest(limit, (m for m in scored if m is not None),
+                          key=lambda m: (m.score, -len(m.path)))
@@ -0,0 +1,347 @@
+"""
+Git-aware file filtering without spawning git
+
+A GitRepository answers "would git consider this path?" from the working tree
+alone: ``.gitignore`` files from the repository root down to the path, plus
+``$GIT_DIR/info/exclude``, and the set of tracked paths read straight from the
+binary index (``.git/index``, versions 2-4). A path is a candidate when it is
+tracked or not ignored, which mirrors ``git ls-files --cached --others
+--exclude-standard``.
+"""
+
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Pattern, Set, Tuple
+
+_INDEX_HEADER = struct.Struct(">4sLL")
+_ENTRY_FIXED_SIZE = 62  # stat data, object id and flags of an index entry
+_FLAG_EXTENDED = 0x4000
+_NAME_MASK = 0x0FFF
+
+
+class IgnoreRule:
+    """One compiled line of a gitignore file"""
+
+    __slots__ = ("pattern", "negated", "dir_only", "regex")
+
+    def __init__(self, pattern: str, negated: bool, dir_only: bool, regex: str):
+        self.pattern = pattern
+        self.negated = negated
+        self.dir_only = dir_only
+        self.regex = regex
+
+    def __repr__(self) -> str:
+        return f"IgnoreRule({self.pattern!r})"
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) into a regex fragment"""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                after = i + 2
+                if at_start and after < n and pattern[after] == "/":
+                    out.append("(?:.*/)?")  # leading or middle "**/"
+                    i = after + 1
+                    continue
+                if at_start and after == n:
+                    out.append(".*")  # trailing "/**"
+                    i = after
+                    continue
+            out.append("[^/]*")
+            i += 1
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^", "]") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """Compile the lines of a gitignore file located in repository directory ``base``"""
+    prefix = re.escape(f"{base}/") if base else ""
+    rules: List[IgnoreRule] = []
+    for raw in text.splitlines():
+        line = raw.rstrip("\r")
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith(("\\#", "\\!")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        glob = _translate_glob(line.lstrip("/"))
+        if anchored:
+            regex = f"{prefix}{glob}"
+        else:
+            regex = f"{prefix}(?:.*/)?{glob}"
+        rules.append(IgnoreRule(raw.strip(), negated, dir_only, regex))
+    return rules
+
+
+class IgnoreRuleSet:
+    """Ordered gitignore rules for one directory; the last matching rule wins"""
+
+    __slots__ = ("rules", "_compiled", "_any_file", "_any_dir")
+
+    def __init__(self, rules: List[IgnoreRule]):
+        self.rules = rules
+        self._compiled: List[Tuple[IgnoreRule, Pattern[str]]] = [
+            (rule, re.compile(rule.regex, re.DOTALL)) for rule in rules
+        ]
+        # One combined scan rejects the common case of a path no rule mentions
+        self._any_file = self._combine([r for r in rules if not r.dir_only])
+        self._any_dir = self._combine(rules)
+
+    @staticmethod
+    def _combine(rules: List[IgnoreRule]) -> Optional[Pattern[str]]:
+        if not rules:
+            return None
+        return re.compile("|".join(f"(?:{rule.regex})" for rule in rules), re.DOTALL)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether a repository-relative path is ignored by these rules"""
+        quick = self._any_dir if is_dir else self._any_file
+        if quick is None or quick.fullmatch(rel_path) is None:
+            return False
+        for rule, regex in reversed(self._compiled):
+            if rule.dir_only and not is_dir:
+                continue
+            if regex.fullmatch(rel_path):
+                return not rule.negated
+        return False
+
+
+def read_git_index(index_path: Path) -> Set[str]:
+    """Read the paths recorded in a git index file (format versions 2, 3 and 4)"""
+    data = index_path.read_bytes()
+    signature, version, count = _INDEX_HEADER.unpack_from(data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise ValueError(f"Unsupported git index format in {index_path}")
+
+    paths: Set[str] = set()
+    pos = _INDEX_HEADER.size
+    previous = b""
+    for _ in range(count):
+        entry_start = pos
+        flags = struct.unpack_from(">H", data, pos + _ENTRY_FIXED_SIZE - 2)[0]
+        pos += _ENTRY_FIXED_SIZE
+        if version >= 3 and flags & _FLAG_EXTENDED:
+            pos += 2
+        if version == 4:
+            # Path is stored as "strip N bytes from the previous path" plus a suffix
+            byte = data[pos]
+            pos += 1
+            strip = byte & 0x7F
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                strip = ((strip + 1) << 7) | (byte & 0x7F)
+            end = data.index(b"\0", pos)
+            name = previous[:len(previous) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            length = flags & _NAME_MASK
+            if length == _NAME_MASK:
+                end = data.index(b"\0", pos)
+            else:
+                end = pos + length
+            name = data[pos:end]
+            # Entries are NUL-padded to a multiple of eight bytes
+            pos = entry_start + ((end - entry_start) // 8 + 1) * 8
+        previous = name
+        paths.add(name.decode("utf-8", "surrogateescape").rstrip("/"))
+    return paths
+
+
+def find_git_dir(worktree: Path) -> Optional[Path]:
+    """The git directory of a working tree root, following ``gitdir:`` files"""
+    dot_git = worktree / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        try:
+            content = dot_git.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if content.startswith("gitdir:"):
+            git_dir = Path(content[len("gitdir:"):].strip())
+            return git_dir if git_dir.is_absolute() else (worktree / git_dir).resolve()
+    return None
+
+
+class GitRepository:
+    """Ignore rules and tracked paths of one git working tree"""
+
+    def __init__(self, root: Path, git_dir: Path):
+        self.root = root
+        self.git_dir = git_dir
+        self._lock = threading.Lock()
+        self._index_key: Optional[Tuple[int, int]] = None
+        self._tracked: FrozenSet[str] = frozenset()
+        self._tracked_dirs: FrozenSet[str] = frozenset()
+        self._ignore_files: Dict[str, Tuple[Optional[Tuple[int, int]], List[IgnoreRule]]] = {}
+        self._rule_sets: Dict[str, Tuple[tuple, IgnoreRuleSet]] = {}
+
+    @staticmethod
+    def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh_index(self) -> None:
+        index_path = self.git_dir / "index"
+        key = self._stat_key(index_path)
+        if key == self._index_key:
+            return
+        try:
+            tracked = read_git_index(index_path) if key is not None else set()
+        except (OSError, ValueError, struct.error, IndexError):
+            tracked = set()
+        dirs: Set[str] = set()
+        for path in tracked:
+            slash = path.rfind("/")
+            while slash != -1:
+                parent = path[:slash]
+                if parent in dirs:
+                    break
+                dirs.add(parent)
+                slash = parent.rfind("/")
+        self._tracked = frozenset(tracked)
+        self._tracked_dirs = frozenset(dirs)
+        self._index_key = key
+
+    @property
+    def tracked(self) -> FrozenSet[str]:
+        """Repository-relative paths recorded in the index"""
+        with self._lock:
+            self._refresh_index()
+            return self._tracked
+
+    @property
+    def tracked_dirs(self) -> FrozenSet[str]:
+        """Directories that contain at least one tracked path"""
+        with self._lock:
+            self._refresh_index()
+            return self._tracked_dirs
+
+    def _ignore_file_rules(self, path: Path, base: str) -> Tuple[Optional[Tuple[int, int]], List[IgnoreRule]]:
+        key = self._stat_key(path)
+        cached = self._ignore_files.get(str(path))
+        if cached is not None and cached[0] == key:
+            return cached
+        rules: List[IgnoreRule] = []
+        if key is not None:
+            try:
+                rules = parse_gitignore(path.read_text(encoding="utf-8", errors="replace"), base)
+            except OSError:
+                pass
+        entry = (key, rules)
+        self._ignore_files[str(path)] = entry
+        return entry
+
+    def rules_for(self, rel_dir: str) -> IgnoreRuleSet:
+        """Combined rules that apply to entries of a repository-relative directory"""
+        sources = [(self.git_dir / "info" / "exclude", "")]
+        parts = rel_dir.split("/") if rel_dir else []
+        for depth in range(len(parts) + 1):
+            base = "/".join(parts[:depth])
+            sources.append((self.root.joinpath(*parts[:depth]) / ".gitignore", base))
+
+        with self._lock:
+            keys, rules = [], []
+            for path, base in sources:
+                key, file_rules = self._ignore_file_rules(path, base)
+                keys.append(key)
+                rules.extend(file_rules)
+            signature = tuple(keys)
+            cached = self._rule_sets.get(rel_dir)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            rule_set = IgnoreRuleSet(rules)
+            self._rule_sets[rel_dir] = (signature, rule_set)
+            return rule_set
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether git ignores a repository-relative path (its parents are not checked)"""
+        parent = rel_path.rpartition("/")[0]
+        return self.rules_for(parent).is_ignored(rel_path, is_dir)
+
+    def is_candidate(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether a path is tracked, or untracked but not ignored"""
+        if is_dir:
+            if rel_path in self.tracked_dirs:
+                return True
+        elif rel_path in self.tracked:
+            return True
+        return not self.is_ignored(rel_path, is_dir)
+
+    def relative(self, path: Path) -> str:
+        """Repository-relative form of a path inside the working tree"""
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return "" if rel == "." else rel
+
+
+_repositories: Dict[str, GitRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def repository_at(worktree: Path) -> Optional[GitRepository]:
+    """The repository whose working tree root is exactly ``worktree``, if any"""
+    git_dir = find_git_dir(worktree)
+    if git_dir is None:
+        return None
+    key = str(worktree)
+    with _repositories_lock:
+        repo = _repositories.get(key)
+        if repo is None or repo.git_dir != git_dir:
+            repo = GitRepository(worktree, git_dir)
+            _repositories[key] = repo
+        return repo
+
+
+def find_repository(path: Path) -> Optional[GitRepository]:
+    """The innermost repository containing a path, found by walking up from it"""
+    path = path.resolve()
+    start = path if path.is_dir() else path.parent
+    for candidate in (start, *start.parents):
+        repo = repository_at(candidate)
+        if repo is not None:
+            return repo
+    return None
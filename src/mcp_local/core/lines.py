@@ -0,0 +1,112 @@
+"""
+Line indexing over text buffers
+
+Tools that address files by line number use a table of line start offsets rather
+than splitting the whole buffer into one string per line. Newlines are located
+with a vectorized NumPy scan when it is installed and the text is ASCII, or with
+C-level ``str.find`` calls otherwise.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple
+
+from .utils import optional_import
+
+# Below this size the plain find loop beats the NumPy setup cost
+_NUMPY_MIN_SIZE = 64 * 1024
+
+
+def find_line_starts(text: str) -> array:
+    """Return the offset of the first character of every line in text"""
+    starts = array("q")
+    if not text:
+        return starts
+
+    # Optional acceleration for large ASCII buffers, imported on first need
+    np = optional_import("numpy") if len(text) >= _NUMPY_MIN_SIZE and text.isascii() else None
+    if np is not None:
+        buf = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        newlines = np.flatnonzero(buf == 10) + 1
+        starts.append(0)
+        starts.frombytes(newlines.astype(np.int64).tobytes())
+    else:
+        starts.append(0)
+        find = text.find
+        pos = find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+
+    # A trailing newline terminates the last line rather than starting a new one
+    if starts[-1] == len(text):
+        starts.pop()
+    return starts
+
+
+class LineIndex:
+    """Newline offset table for slicing lines out of a text buffer by number"""
+
+    __slots__ = ("text", "starts")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = find_line_starts(text)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line_start(self, index: int) -> int:
+        """Offset of the first character of a 0-based line"""
+        return self.starts[index]
+
+    def line_end(self, index: int, keepends: bool = False) -> int:
+        """Offset just past a 0-based line, optionally including its newline"""
+        if index + 1 < len(self.starts):
+            end = self.starts[index + 1]
+            return end if keepends else end - 1
+        end = len(self.text)
+        if not keepends and self.text.endswith("\n"):
+            end -= 1
+        return end
+
+    def line(self, index: int, keepends: bool = False) -> str:
+        """Return a single 0-based line"""
+        return self.text[self.starts[index]:self.line_end(index, keepends)]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Character span covering 0-based lines [start, end), newlines included"""
+        total = len(self.starts)
+        start = max(0, min(start, total))
+        end = max(start, min(end, total))
+        if start == end:
+            offset = self.starts[start] if start < total else len(self.text)
+            return offset, offset
+        return self.starts[start], self.line_end(end - 1, keepends=True)
+
+    def slice(self, start: int, end: int) -> str:
+        """Text of 0-based lines [start, end), newlines included"""
+        begin, finish = self.span(start, end)
+        return self.text[begin:finish]
+
+    def lines(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Lines [start, end) without their newlines, allocating only that range"""
+        if end is None:
+            end = len(self.starts)
+        chunk = self.slice(start, end)
+        if not chunk:
+            return []
+        if chunk.endswith("\n"):
+            chunk = chunk[:-1]
+        return chunk.split("\n")
+
+    def iter_lines(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (0-based number, line) pairs for a range of lines"""
+        if end is None:
+            end = len(self.starts)
+        for number in range(max(0, start), min(end, len(self.starts))):
+            yield number, self.line(number)
+
+    def line_of(self, offset: int) -> int:
+        """0-based line containing a character offset"""
+        return max(0, bisect_right(self.starts, offset) - 1)
@@ -0,0 +1,221 @@
+"""
+Per-path reader/writer locks
+
+Read-modify-write sequences on the same file are serialized in arrival order,
+while operations on different files proceed in parallel. When advisory locking
+is enabled, the outermost holder of a lock also takes an ``fcntl.flock`` on the
+file so that other processes using the same convention are excluded too.
+"""
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .config import ADVISORY_FILE_LOCKS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class ReadWriteLock:
+    """First-come-first-served reader/writer lock, reentrant for the writing thread"""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._queue: deque = deque()
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+
+    def acquire_read(self) -> bool:
+        """Acquire shared access; returns True for the thread's outermost hold"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return False
+            if me in self._readers:
+                self._readers[me] += 1
+                return False
+            ticket = object()
+            self._queue.append(ticket)
+            while self._queue[0] is not ticket or self._writer is not None:
+                self._cond.wait()
+            self._queue.popleft()
+            self._readers[me] = 1
+            # Let a run of queued readers behind us in
+            self._cond.notify_all()
+            return True
+
+    def acquire_write(self) -> bool:
+        """Acquire exclusive access; returns True for the thread's outermost hold"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return False
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            ticket = object()
+            self._queue.append(ticket)
+            while self._queue[0] is not ticket or self._writer is not None or self._readers:
+                self._cond.wait()
+            self._queue.popleft()
+            self._writer = me
+            self._writer_depth = 1
+            return True
+
+    def release_read(self) -> None:
+        """Release a shared hold"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth -= 1
+                return
+            count = self._readers[me] - 1
+            if count:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                self._cond.notify_all()
+
+    def release_write(self) -> None:
+        """Release an exclusive hold"""
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @property
+    def idle(self) -> bool:
+        """Whether nobody holds or waits for the lock"""
+        with self._cond:
+            return self._writer is None and not self._readers and not self._queue
+
+
+class PathLockManager:
+    """Hands out reader/writer locks keyed by resolved file path"""
+
+    def __init__(self, advisory: bool = ADVISORY_FILE_LOCKS):
+        self.advisory = advisory and fcntl is not None
+        self._locks: Dict[str, Tuple[ReadWriteLock, int]] = {}
+        self._guard = threading.Lock()
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return os.path.normcase(os.path.abspath(os.path.expanduser(os.fspath(path))))
+
+    def _checkout(self, key: str) -> ReadWriteLock:
+        with self._guard:
+            lock, users = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = ReadWriteLock()
+            self._locks[key] = (lock, users + 1)
+            return lock
+
+    def _checkin(self, key: str) -> None:
+        with self._guard:
+            lock, users = self._locks[key]
+            if users <= 1:
+                # Drop idle locks so the table does not grow with every path touched
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    @contextmanager
+    def _advisory_lock(self, key: str, exclusive: bool) -> Iterator[None]:
+        fd = None
+        if self.advisory:
+            try:
+                fd = os.open(key, os.O_RDONLY)
+            except OSError:
+                fd = None  # Nothing on disk to lock yet
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    @contextmanager
+    def _advisory_locks(self, keys: List[Tuple[str, bool]]) -> Iterator[None]:
+        """Take advisory locks on several (key, exclusive) pairs in order"""
+        if not keys:
+            yield
+            return
+        with self._advisory_lock(keys[0][0], exclusive=keys[0][1]):
+            with self._advisory_locks(keys[1:]):
+                yield
+    
+    @contextmanager
+    def read_lock(self, path: Union[str, Path]) -> Iterator[None]:
+        """Hold shared access to a path"""
+        key = self._key(path)
+        lock = self._checkout(key)
+        try:
+            outermost = lock.acquire_read()
+            try:
+                if outermost:
+                    with self._advisory_lock(key, exclusive=False):
+                        yield
+                else:
+                    yield
+            finally:
+                lock.release_read()
+        finally:
+            self._checkin(key)
+
+    @contextmanager
+    def write_lock(self, *paths: Union[str, Path]) -> Iterator[None]:
+        """Hold exclusive access to one or more paths, acquired in a stable order"""
+        with self.lock_paths(write=paths):
+            yield
+
+    @contextmanager
+    def lock_paths(self, read: Iterable[Union[str, Path]] = (),
+                   write: Iterable[Union[str, Path]] = ()) -> Iterator[None]:
+        """Hold shared access to the read paths and exclusive access to the write paths
+
+        Every lock is taken in one sorted order, so callers locking the same paths in
+        opposite roles (copying a to b while another copies b to a) cannot deadlock.
+        A path in both sets is locked for writing.
+        """
+        exclusive = {self._key(path) for path in write}
+        keys = sorted(exclusive | {self._key(path) for path in read})
+        held: List[Tuple[str, ReadWriteLock, bool, bool]] = []
+        try:
+            for key in keys:
+                lock = self._checkout(key)
+                writing = key in exclusive
+                try:
+                    outermost = lock.acquire_write() if writing else lock.acquire_read()
+                except BaseException:
+                    self._checkin(key)
+                    raise
+                held.append((key, lock, writing, outermost))
+            with self._advisory_locks([(key, writing) for key, _, writing, outermost in held if outermost]):
+                yield
+        finally:
+            for key, lock, writing, _ in reversed(held):
+                if writing:
+                    lock.release_write()
+                else:
+                    lock.release_read()
+                self._checkin(key)
+
+    def active_paths(self) -> List[str]:
+        """Paths that currently have a lock checked out"""
+        with self._guard:
+            return list(self._locks)
+
+
+# Global path lock manager instance
+path_locks = PathLockManager()
@@ -0,0 +1,152 @@
+"""
+Whole-buffer pattern matching with line mapping
+
+Rather than calling ``finditer`` once per line, a LineMatcher runs the compiled
+pattern over the entire buffer in one C-level scan and maps each hit back to its
+line by bisecting the newline offset table. Files without a match never get a
+line index at all.
+
+Results keep per-line semantics: a match that would run across a newline (for
+example ``\\s+`` swallowing the line break) is redone on that single line, and
+patterns anchored to the whole string fall back to the per-line loop.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+from .lines import LineIndex
+from .regex_plan import RegexPlan, plan_regex
+
+# String anchors mean something different for a buffer than for a single line
+_STRING_ANCHORS = re.compile(r"(?<!\\)(?:\\\\)*\\[AZ]")
+
+
+class LineMatch(NamedTuple):
+    """One match: its line, absolute character span and the buffer's line index"""
+    index: LineIndex
+    line: int
+    start: int
+    end: int
+
+    @property
+    def column(self) -> int:
+        """0-based column of the match start within its line"""
+        return self.start - self.index.line_start(self.line)
+
+    @property
+    def text(self) -> str:
+        """Matched text"""
+        return self.index.text[self.start:self.end]
+
+
+class LineMatcher:
+    """Finds the matches a per-line search would find, scanning the buffer once"""
+
+    __slots__ = ("pattern", "buffer_pattern", "plan")
+
+    def __init__(self, pattern: "re.Pattern[str]", plan: Optional[RegexPlan] = None):
+        self.pattern = pattern
+        self.plan = plan if plan is not None else plan_regex(pattern)
+        if _STRING_ANCHORS.search(pattern.pattern):
+            self.buffer_pattern = None
+        else:
+            self.buffer_pattern = re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+
+    def finditer(self, text: str, pos: int = 0,
+                 index: Optional[LineIndex] = None) -> Iterator[LineMatch]:
+        """Yield matches at or after offset ``pos``, in order"""
+        if self.buffer_pattern is None:
+            if self.plan.may_match(text):
+                yield from self._per_line(text, pos, index or LineIndex(text))
+            return
+
+        # With required literals, str.find picks the next line worth trying and the
+        # regex only runs inside that line; otherwise it scans the rest of the buffer
+        haystack = self.plan.haystack(text)
+        if haystack is not None and self.plan.exact:
+            yield from self._literal(text, haystack, pos, index)
+            return
+        upcoming = [-1] * len(self.plan.literals)
+        search = self.buffer_pattern.search
+        length = len(text)
+        window_end = window_line_end = length
+        while pos <= length:
+            if haystack is not None:
+                hit = self._next_literal(haystack, pos, upcoming)
+                if hit < 0:
+                    return
+                pos = max(pos, text.rfind("\n", 0, hit) + 1)
+                newline = text.find("\n", hit)
+                window_line_end = length if newline == -1 else newline
+                window_end = length if newline == -1 else newline + 1
+
+            found = search(text, pos, window_end)
+            if found is None or found.start() > window_line_end:
+                if haystack is None:
+                    return
+                pos = window_end if window_end > pos else pos + 1
+                continue
+
+            if index is None:
+                index = LineIndex(text)
+                if not len(index):
+                    return  # An empty buffer has no lines to match on
+            start, end = found.span()
+            line = index.line_of(start)
+            line_start = index.line_start(line)
+            line_end = index.line_end(line)
+
+            if start > line_end:
+                # Starts past the final newline: nothing a per-line search would report
+                return
+
+            if end <= line_end:
+                yield LineMatch(index, line, start, end)
+                pos = end if end > start else end + 1
+                continue
+
+            # The match ran across a newline: redo this line on its own
+            line_text = text[line_start:line_end]
+            for sub in self.pattern.finditer(line_text, max(pos, line_start) - line_start):
+                yield LineMatch(index, line, line_start + sub.start(), line_start + sub.end())
+            pos = index.line_end(line, keepends=True)
+            if pos <= start:
+                pos = start + 1
+
+    def _next_literal(self, haystack: str, pos: int, upcoming: List[int]) -> int:
+        """Offset of the next required literal at or after pos, or -1"""
+        best = -1
+        for i, literal in enumerate(self.plan.literals):
+            cached = upcoming[i]
+            if cached == -2:
+                continue  # Known to be absent from here on
+            if cached < pos:
+                cached = haystack.find(literal, pos)
+                upcoming[i] = cached if cached != -1 else -2
+                if cached == -1:
+                    continue
+            if best == -1 or cached < best:
+                best = cached
+        return best
+
+    def _literal(self, text: str, haystack: str, pos: int,
+                 index: Optional[LineIndex]) -> Iterator[LineMatch]:
+        """Matches of a pattern that is a plain literal, found with str.find alone"""
+        literal = self.plan.literals[0]
+        if "\n" in literal:
+            return  # Cannot occur within a single line
+        find = haystack.find
+        size = len(literal)
+        hit = find(literal, pos)
+        while hit != -1:
+            if index is None:
+                index = LineIndex(text)
+            yield LineMatch(index, index.line_of(hit), hit, hit + size)
+            hit = find(literal, hit + size)
+
+    def _per_line(self, text: str, pos: int, index: LineIndex) -> Iterator[LineMatch]:
+        finditer = self.pattern.finditer
+        for line, line_text in index.iter_lines(index.line_of(pos) if pos else 0):
+            line_start = index.line_start(line)
+            for sub in finditer(line_text, max(0, pos - line_start)):
+                yield LineMatch(index, line, line_start + sub.start(), line_start + sub.end())
@@ -0,0 +1,194 @@
+"""
+Per-tool metrics: call latency histograms and work counters
+
+The tool executor times every call and marks the running tool in a context
+variable, which worker threads inherit. Code doing measurable work (reading or
+writing bytes, scanning files, consulting a cache) calls ``metrics.add`` and the
+amount is attributed to whichever tool is running. Work done inside worker
+processes is not counted, since their registries are separate.
+
+Recording is on by default; with MCP_METRICS=0 every entry point returns after
+one attribute check. The registry can be read through the get_server_metrics
+tool or rendered in the Prometheus text format, and is written to MCP_METRICS_FILE
+periodically and at shutdown when that is set.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import METRICS_BUCKETS, METRICS_DUMP_INTERVAL, METRICS_ENABLED, METRICS_FILE
+
+# Counters recorded outside any tool call are attributed to this name
+_NO_TOOL = ""
+
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("mcp_current_tool", default=_NO_TOOL)
+
+
+class _ToolStats:
+    """Latency histogram and counters of one tool"""
+
+    __slots__ = ("calls", "errors", "in_flight", "total", "max", "buckets", "counters")
+
+    def __init__(self, bucket_count: int):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (bucket_count + 1)  # The last one counts calls above every bound
+        self.counters: Dict[str, int] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-tool latencies and counters"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, buckets: Tuple[float, ...] = METRICS_BUCKETS,
+                 dump_path: str = METRICS_FILE, dump_interval: float = METRICS_DUMP_INTERVAL):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.started = time.time()
+        self._tools: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    def _stats(self, tool_name: str) -> _ToolStats:
+        stats = self._tools.get(tool_name)
+        if stats is None:
+            stats = self._tools[tool_name] = _ToolStats(len(self.buckets))
+        return stats
+
+    def begin(self, tool_name: str) -> Optional[Tuple[contextvars.Token, float]]:
+        """Mark a tool call as started in the current context; pass the result to end()"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._stats(tool_name).in_flight += 1
+        return _current_tool.set(tool_name), time.perf_counter()
+
+    def end(self, tool_name: str, started: Optional[Tuple[contextvars.Token, float]],
+            error: bool = False) -> None:
+        """Record the latency and outcome of a call begun with begin()"""
+        if started is None:
+            return
+        token, start = started
+        elapsed = time.perf_counter() - start
+        _current_tool.reset(token)
+        with self._lock:
+            stats = self._stats(tool_name)
+            stats.in_flight -= 1
+            stats.calls += 1
+            stats.errors += error
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.buckets[bisect_left(self.buckets, elapsed)] += 1
+        if self.dump_path and time.monotonic() - self._last_dump >= self.dump_interval:
+            self.dump()
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        """Add to a counter of the running tool"""
+        if not self.enabled:
+            return
+        tool_name = _current_tool.get()
+        with self._lock:
+            counters = self._stats(tool_name).counters
+            counters[counter] = counters.get(counter, 0) + amount
+
+    def _quantile(self, stats: _ToolStats, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile"""
+        rank = q * stats.calls
+        seen = 0
+        for bound, count in zip(self.buckets, stats.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return stats.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data view of everything recorded so far"""
+        with self._lock:
+            tools = {}
+            for name, stats in sorted(self._tools.items()):
+                entry: Dict[str, Any] = {"calls": stats.calls, "errors": stats.errors,
+                                         "in_flight": stats.in_flight}
+                if stats.calls:
+                    entry["latency_ms"] = {
+                        "mean": round(stats.total / stats.calls * 1000, 3),
+                        "p50": round(self._quantile(stats, 0.5) * 1000, 3),
+                        "p95": round(self._quantile(stats, 0.95) * 1000, 3),
+                        "p99": round(self._quantile(stats, 0.99) * 1000, 3),
+                        "max": round(stats.max * 1000, 3),
+                    }
+                entry["counters"] = dict(sorted(stats.counters.items()))
+                tools[name or "(none)"] = entry
+            return {"enabled": self.enabled, "uptime_seconds": round(time.time() - self.started, 3),
+                    "tools": tools}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = [
+            "# HELP mcp_tool_calls_total Completed tool calls.",
+            "# TYPE mcp_tool_calls_total counter",
+        ]
+        counter_lines: Dict[str, List[str]] = {}
+        histogram_lines: List[str] = [
+            "# HELP mcp_tool_duration_seconds Tool call latency.",
+            "# TYPE mcp_tool_duration_seconds histogram",
+        ]
+        error_lines = ["# HELP mcp_tool_errors_total Tool calls that raised.",
+                       "# TYPE mcp_tool_errors_total counter"]
+        with self._lock:
+            for name, stats in sorted(self._tools.items()):
+                label = f'tool="{_escape(name)}"'
+                for counter, value in sorted(stats.counters.items()):
+                    counter_lines.setdefault(counter, []).append(f"mcp_{counter}_total{{{label}}} {value}")
+                if not stats.calls:
+                    continue
+                lines.append(f"mcp_tool_calls_total{{{label}}} {stats.calls}")
+                error_lines.append(f"mcp_tool_errors_total{{{label}}} {stats.errors}")
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats.buckets):
+                    cumulative += count
+                    histogram_lines.append(f'mcp_tool_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                histogram_lines.append(f'mcp_tool_duration_seconds_bucket{{{label},le="+Inf"}} {stats.calls}')
+                histogram_lines.append(f"mcp_tool_duration_seconds_sum{{{label}}} {stats.total}")
+                histogram_lines.append(f"mcp_tool_duration_seconds_count{{{label}}} {stats.calls}")
+        lines += error_lines + histogram_lines
+        for counter, values in sorted(counter_lines.items()):
+            lines.append(f"# TYPE mcp_{counter}_total counter")
+            lines.extend(values)
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the Prometheus text to a file atomically; returns the path written"""
+        path = path or self.dump_path
+        if not path:
+            return None
+        self._last_dump = time.monotonic()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        return path
+
+    def reset(self) -> None:
+        """Forget everything recorded"""
+        with self._lock:
+            self._tools.clear()
+            self.started = time.time()
+
+
+# Global metrics registry instance
+metrics = MetricsRegistry()
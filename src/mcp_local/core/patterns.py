@@ -0,0 +1,114 @@
+"""
+Shared cache of compiled search patterns
+
+Search and replace tools look up their patterns here instead of compiling on
+every call or leaning on the small internal ``re`` cache. An entry carries the
+compiled regex along with everything derived from it once: the literal prefilter
+plan, the whole-buffer matcher, and the plain and case-folded literal forms used
+by substring fast paths.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import PATTERN_CACHE_SIZE
+from .matching import LineMatcher
+from .metrics import metrics
+from .regex_plan import RegexPlan, plan_regex
+
+
+class CompiledPattern:
+    """A compiled search pattern and its precomputed fast-path variants"""
+
+    __slots__ = ("source", "flags", "whole_word", "is_regex", "regex", "plan", "matcher",
+                 "literal", "folded_literal")
+
+    def __init__(self, source: str, flags: int = 0, whole_word: bool = False,
+                 is_regex: bool = True):
+        self.source = source
+        self.flags = flags
+        self.whole_word = whole_word
+        self.is_regex = is_regex
+        body = source if is_regex else re.escape(source)
+        if whole_word:
+            body = rf"\b{body}\b"
+        self.regex: "re.Pattern[str]" = re.compile(body, flags)
+        self.plan: RegexPlan = plan_regex(self.regex)
+        self.matcher = LineMatcher(self.regex, self.plan)
+        # For plain literals: the text every match equals, and its case-folded form
+        # as searched for in lowered ASCII buffers when matching ignores case
+        self.literal: Optional[str] = self.plan.exact_text
+        self.folded_literal: Optional[str] = self.plan.literals[0] if self.plan.exact else None
+
+    @property
+    def ignore_case(self) -> bool:
+        """Whether matching is case-insensitive"""
+        return bool(self.flags & re.IGNORECASE)
+
+
+class PatternCache:
+    """Size-bounded LRU of CompiledPattern keyed by (pattern, flags, whole_word)"""
+
+    def __init__(self, maxsize: int = PATTERN_CACHE_SIZE):
+        self.maxsize = max(1, maxsize)
+        self._entries: "OrderedDict[Tuple[str, int, bool, bool], CompiledPattern]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, pattern: str, flags: int = 0, whole_word: bool = False,
+            is_regex: bool = True) -> CompiledPattern:
+        """Return the cached compilation of a pattern, compiling it on a miss.
+
+        Raises re.error for invalid regular expressions.
+        """
+        key = (pattern, flags, whole_word, is_regex)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.add("pattern_cache_hits")
+                return entry
+            self.misses += 1
+        metrics.add("pattern_cache_misses")
+
+        # Compile outside the lock; a concurrent miss on the same key is harmless
+        entry = CompiledPattern(pattern, flags, whole_word, is_regex)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def compile(self, pattern: str, flags: int = 0) -> "re.Pattern[str]":
+        """Drop-in for re.compile backed by the cache"""
+        return self.get(pattern, flags).regex
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Forget all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Global pattern cache instance
+pattern_cache = PatternCache()
@@ -0,0 +1,213 @@
+"""
+Opt-in profiling of individual tool calls
+
+A call is profiled when the caller passes ``profile=True`` to a tool that
+accepts it, or when MCP_PROFILE names the tool ("*" for every tool), in which
+case MCP_PROFILE_SAMPLE sets the fraction of its calls that are profiled.
+
+Two modes are available (MCP_PROFILE_MODE):
+
+* ``cprofile`` records every Python call deterministically and saves a
+  ``.pstats`` file, readable with ``python -m pstats`` or snakeviz;
+* ``sample`` walks the calling thread's stack every few milliseconds and saves
+  collapsed stacks (``.folded``), the input of flamegraph.pl and speedscope.
+  Its overhead does not depend on how many calls the code makes.
+
+Artifacts go to MCP_PROFILE_DIR and the slowest functions are appended to the
+tool's response; an artifact that cannot be written is reported there instead
+of failing the call. Only one cProfile session can run at a time, so a call that
+overlaps another profiled call falls back to sampling.
+"""
+
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from .config import (
+    PROFILE_DIR,
+    PROFILE_INTERVAL,
+    PROFILE_MODE,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOOLS,
+    PROFILE_TOP,
+)
+
+PROFILE_MODES = ("cprofile", "sample")
+
+_cprofile_lock = threading.Lock()
+
+# Numbers the artifacts of this process, so calls within the same second get distinct names
+_artifact_ids = itertools.count(1)
+
+
+def _artifact_path(directory: str, tool_name: str, suffix: str) -> Path:
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return path / f"{tool_name}-{stamp}-{os.getpid()}-{next(_artifact_ids)}{suffix}"
+
+
+def _save_artifact(directory: str, tool_name: str, suffix: str,
+                   write: Callable[[Path], None]) -> Dict[str, Optional[str]]:
+    """Write an artifact with write(path); the report keys saying where it went or why it did not"""
+    try:
+        path = _artifact_path(directory, tool_name, suffix)
+        write(path)
+    except OSError as e:
+        return {"artifact": None, "artifact_error": f"Could not save the profile: {e}"}
+    return {"artifact": str(path)}
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _run_cprofile(func: Callable[..., Any], args: tuple, kwargs: dict,
+                  tool_name: str, directory: str, top: int) -> Tuple[Any, Dict[str, Any]]:
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+    finally:
+        saved = _save_artifact(directory, tool_name, ".pstats", lambda path: profiler.dump_stats(str(path)))
+    stats = pstats.Stats(profiler).stats  # {(file, line, name): (cc, nc, tt, ct, callers)}
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    functions = [{
+        "function": f"{name} ({os.path.basename(file)}:{line})",
+        "calls": calls,
+        "self_ms": round(self_time * 1000, 3),
+        "cumulative_ms": round(total * 1000, 3),
+    } for (file, line, name), (_, calls, self_time, total, _) in ranked]
+    return result, {"mode": "cprofile", **saved, "top": functions}
+
+
+def _run_sampled(func: Callable[..., Any], args: tuple, kwargs: dict,
+                 tool_name: str, directory: str, top: int, interval: float) -> Tuple[Any, Dict[str, Any]]:
+    target = threading.get_ident()
+    stacks: Counter = Counter()
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            frame = sys._current_frames().get(target)
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                stacks[";".join(reversed(labels))] += 1
+
+    sampler = threading.Thread(target=sample, name="mcp-profile-sampler", daemon=True)
+    sampler.start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        done.set()
+        sampler.join()
+        folded = "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        saved = _save_artifact(directory, tool_name, ".folded",
+                               lambda path: path.write_text(folded, encoding="utf-8"))
+
+    total = sum(stacks.values())
+    own: Counter = Counter()
+    inclusive: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for label in set(frames):
+            inclusive[label] += count
+    functions = [{
+        "function": label,
+        "self_samples": count,
+        "self_percent": round(100 * count / total, 1),
+        "total_percent": round(100 * inclusive[label] / total, 1),
+    } for label, count in own.most_common(top)]
+    return result, {"mode": "sample", **saved, "samples": total,
+                    "interval_ms": interval * 1000, "top": functions}
+
+
+def run_profiled(tool_name: str, mode: str, directory: str, top: int, interval: float,
+                 func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Run func under a profiler; returns its result and a report of the hottest functions
+
+    Module-level so that calls sent to worker processes can be profiled there.
+    """
+    started = time.perf_counter()
+    if mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+        try:
+            result, report = _run_cprofile(func, args, kwargs, tool_name, directory, top)
+        finally:
+            _cprofile_lock.release()
+    else:
+        result, report = _run_sampled(func, args, kwargs, tool_name, directory, top, interval)
+    report["tool"] = tool_name
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result, report
+
+
+def _format_report(report: Dict[str, Any]) -> str:
+    saved = f"saved to {report['artifact']}" if report["artifact"] else report["artifact_error"]
+    lines = [f"⏱️ Profile of {report['tool']} ({report['mode']}): {report['elapsed_ms']:.1f}ms, {saved}"]
+    for i, entry in enumerate(report["top"], 1):
+        if report["mode"] == "cprofile":
+            lines.append(f"  {i}. {entry['self_ms']:.1f}ms self, {entry['cumulative_ms']:.1f}ms total, "
+                         f"{entry['calls']} calls - {entry['function']}")
+        else:
+            lines.append(f"  {i}. {entry['self_percent']}% self, {entry['total_percent']}% total - "
+                         f"{entry['function']}")
+    return "\n".join(lines)
+
+
+def attach_report(result: Any, report: Dict[str, Any]) -> Any:
+    """Add a profile report to a tool response: a "profile" key for JSON, a footer for text"""
+    if not isinstance(result, str):
+        return result
+    if result.startswith("{"):
+        try:
+            data = json.loads(result)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            from .utils import to_json
+            data["profile"] = report
+            return to_json(data)
+    return f"{result}\n\n{_format_report(report)}"
+
+
+class ToolProfiler:
+    """Decides which tool calls are profiled and with what settings"""
+
+    def __init__(self, tools: FrozenSet[str] = PROFILE_TOOLS, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 mode: str = PROFILE_MODE, directory: Path = PROFILE_DIR, top: int = PROFILE_TOP,
+                 interval: float = PROFILE_INTERVAL):
+        self.tools = tools
+        self.sample_rate = sample_rate
+        self.mode = mode if mode in PROFILE_MODES else "cprofile"
+        self.directory = directory
+        self.top = top
+        self.interval = interval
+
+    def should_profile(self, tool_name: str, requested: bool = False) -> bool:
+        """Whether this call of a tool is profiled"""
+        if requested:
+            return True
+        if not self.tools or (tool_name not in self.tools and "*" not in self.tools):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def wrap(self, tool_name: str, func: Callable[..., Any]) -> Tuple[Callable[..., Any], tuple]:
+        """run_profiled and the leading arguments that make it profile func"""
+        return run_profiled, (tool_name, self.mode, str(self.directory), self.top, self.interval, func)
+
+
+# Global tool profiler instance
+tool_profiler = ToolProfiler()
@@ -0,0 +1,173 @@
+"""
+Literal prefilters for regular expression searches
+
+Most regexes people search with contain a fixed substring that every match must
+include: ``def \\w+_handler`` cannot match a file without ``_handler`` in it. The
+planner walks the parsed pattern, extracts such required literals, and lets
+search code reject files and lines with C-level substring scans before the regex
+engine runs at all.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants
+    import sre_parse
+
+from .lines import LineIndex
+
+_LITERAL = sre_constants.LITERAL
+_SUBPATTERN = sre_constants.SUBPATTERN
+_BRANCH = sre_constants.BRANCH
+_REPEATS = tuple(
+    getattr(sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+
+# A requirement is a set of alternatives: at least one of them occurs in every match
+Requirement = Tuple[str, ...]
+
+
+class RegexPlan:
+    """Required literals of a compiled pattern and the checks built on them"""
+
+    __slots__ = ("literals", "ignore_case", "exact_text")
+
+    def __init__(self, literals: Sequence[str] = (), ignore_case: bool = False,
+                 exact_text: Optional[str] = None):
+        self.literals: Requirement = tuple(lit.lower() for lit in literals) if ignore_case else tuple(literals)
+        self.ignore_case = ignore_case
+        # Set when the pattern is nothing but this literal, so a substring search
+        # alone finds exactly the regex matches
+        self.exact_text = exact_text
+
+    @property
+    def exact(self) -> bool:
+        """Whether the pattern is a plain literal"""
+        return self.exact_text is not None
+
+    @property
+    def useful(self) -> bool:
+        """Whether the plan can reject anything"""
+        return bool(self.literals)
+
+    def haystack(self, text: str) -> Optional[str]:
+        """Text to scan for literals, or None when a substring check would be unsound"""
+        if not self.literals:
+            return None
+        if not self.ignore_case:
+            return text
+        # Unicode case folding maps some non-ASCII characters onto ASCII letters
+        # (e.g. KELVIN SIGN matches "k"), which str.lower() does not reproduce.
+        # Lowering ASCII text keeps every offset in place.
+        return text.lower() if text.isascii() else None
+
+    def may_match(self, text: str) -> bool:
+        """False only when the pattern certainly has no match in text"""
+        haystack = self.haystack(text)
+        if haystack is None:
+            return True
+        return any(literal in haystack for literal in self.literals)
+
+    def candidate_lines(self, text: str,
+                        index: Optional[LineIndex] = None) -> Tuple[Optional[List[int]], Optional[LineIndex]]:
+        """
+        Sorted 0-based lines containing a required literal, with the line index used.
+
+        Returns ``(None, index)`` when every line must be tried and ``([], index)``
+        when no line can match; a LineIndex is only built once a literal is found.
+        """
+        haystack = self.haystack(text)
+        if haystack is None:
+            return None, index
+        lines = set()
+        find = haystack.find
+        for literal in self.literals:
+            pos = find(literal)
+            while pos != -1:
+                if index is None:
+                    index = LineIndex(text)
+                line = index.line_of(pos)
+                lines.add(line)
+                # One hit is enough for a line: continue from the next one
+                pos = find(literal, index.line_end(line, keepends=True))
+        return sorted(lines), index
+
+
+def _best(requirements: List[Requirement]) -> Optional[Requirement]:
+    """Pick the most selective requirement: long literals, few alternatives"""
+    if not requirements:
+        return None
+    return max(requirements, key=lambda req: (min(len(lit) for lit in req), -len(req)))
+
+
+def _analyze(items, ignore_case: bool) -> List[Requirement]:
+    """Collect requirements that all hold for any match of a parsed sequence"""
+    requirements: List[Requirement] = []
+    run: List[str] = []
+
+    def flush() -> None:
+        if run:
+            requirements.append(("".join(run),))
+            run.clear()
+
+    for op, arg in items:
+        if op is _LITERAL:
+            char = chr(arg)
+            if ignore_case and not char.isascii():
+                flush()
+            else:
+                run.append(char)
+            continue
+
+        flush()
+        if op is _SUBPATTERN:
+            group_flags = arg[1:3] if len(arg) == 4 else (0, 0)
+            if any(flags & (re.IGNORECASE | re.LOCALE) for flags in group_flags):
+                continue  # Inline flag changes: stay conservative
+            best = _best(_analyze(arg[-1], ignore_case))
+            if best:
+                requirements.append(best)
+        elif op in _REPEATS:
+            min_count, _, body = arg
+            if min_count >= 1:
+                best = _best(_analyze(body, ignore_case))
+                if best:
+                    requirements.append(best)
+        elif op is _BRANCH:
+            alternatives: List[str] = []
+            for branch in arg[1]:
+                best = _best(_analyze(branch, ignore_case))
+                if not best:
+                    alternatives = []
+                    break
+                alternatives.extend(best)
+            if alternatives:
+                requirements.append(tuple(dict.fromkeys(alternatives)))
+        # Anything else (classes, anchors, lookarounds, backreferences) only
+        # separates literal runs
+    flush()
+    return requirements
+
+
+def plan_regex(pattern: "re.Pattern[str]") -> RegexPlan:
+    """Build the literal prefilter for a compiled str pattern"""
+    if not isinstance(pattern.pattern, str) or pattern.flags & re.LOCALE:
+        return RegexPlan()
+    ignore_case = bool(pattern.flags & re.IGNORECASE)
+    try:
+        parsed = list(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return RegexPlan()
+    requirements = _analyze(parsed, ignore_case)
+    best = _best(requirements)
+    exact_text = None
+    if len(requirements) == 1 and all(op is _LITERAL for op, _ in parsed):
+        # Exact only if no character was dropped from the literal run
+        if len(requirements[0][0]) == len(parsed):
+            exact_text = requirements[0][0]
+    return RegexPlan(best or (), ignore_case, exact_text)
@@ -0,0 +1,157 @@
+"""
+Cache of search results keyed by query and tree generation
+
+Repeating a search returns the stored page instead of walking the tree again.
+An entry stays valid while:
+
+* the generation of its root is unchanged. Every path this server writes bumps a
+  counter for the path and each of its ancestors, so an edit invalidates the
+  searches rooted above it and leaves searches elsewhere alone;
+* every directory the walk listed still has the modification time it had when
+  listed, which catches files created, removed or renamed by other processes;
+* every file that produced a match is unchanged.
+
+Results whose directories or files were modified within a second of the walk
+are not cached at all, since a coarse timestamp could hide a later change.
+
+Edits by other processes that add a first match to a previously non-matching
+file are not detected until the entry is evicted or the tree changes otherwise.
+The cache is process-local and stays off inside worker processes, which never
+see this server's change notifications.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from .config import SEARCH_CACHE_SIZE
+from .events import change_notifier
+from .metrics import metrics
+
+# Timestamps this close to the walk may still change without their value moving
+# (filesystem timestamps are coarse), so such results are not cached
+_RACY_WINDOW_NS = 1_000_000_000
+
+
+class _Entry(NamedTuple):
+    root: str
+    generation: int
+    dir_mtimes: Dict[str, int]
+    file_mtimes: Dict[str, int]
+    value: Any
+
+
+def _unchanged(mtimes: Dict[str, int]) -> bool:
+    for path, mtime_ns in mtimes.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class SearchResultCache:
+    """Size-bounded LRU of search results, validated against the tree on every hit"""
+
+    def __init__(self, maxsize: int = SEARCH_CACHE_SIZE):
+        self.maxsize = max(0, maxsize)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        change_notifier.subscribe(self.path_changed)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached in this process"""
+        # Worker processes always have multiprocessing loaded; avoid importing it here
+        multiprocessing = sys.modules.get("multiprocessing")
+        return self.maxsize > 0 and (multiprocessing is None or multiprocessing.parent_process() is None)
+
+    def generation(self, root: Path) -> int:
+        """Current generation of a search root; take it before walking"""
+        with self._lock:
+            return self._generations.get(str(root), 0)
+
+    def snapshot(self, root: Path) -> Tuple[int, int]:
+        """Generation of a root and the wall-clock time, both taken before walking"""
+        return self.generation(root), time.time_ns()
+
+    def path_changed(self, path: Path) -> None:
+        """Bump the generation of a changed path and all of its ancestors"""
+        with self._lock:
+            for node in (path, *path.parents):
+                key = str(node)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key if it is still valid for the current tree"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                metrics.add("search_cache_misses")
+                return None
+            fresh = self._generations.get(entry.root, 0) == entry.generation
+        # Stat outside the lock; other lookups need not wait for the disk
+        if fresh and _unchanged(entry.dir_mtimes) and _unchanged(entry.file_mtimes):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            metrics.add("search_cache_hits")
+            return entry.value
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self.invalidations += 1
+            self.misses += 1
+        metrics.add("search_cache_misses")
+        return None
+
+    def put(self, key: Hashable, root: Path, snapshot: Tuple[int, int], value: Any,
+            dir_mtimes: Dict[str, int], file_mtimes: Dict[str, int]) -> None:
+        """Store a value computed from the tree as of ``snapshot``"""
+        if not self.enabled:
+            return
+        generation, started_ns = snapshot
+        newest = max(max(dir_mtimes.values(), default=0), max(file_mtimes.values(), default=0))
+        if newest >= started_ns - _RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(str(root), generation, dir_mtimes, file_mtimes, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Forget all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+
+# Global search result cache instance
+search_cache = SearchResultCache()
@@ -0,0 +1,214 @@
+"""
+SQLite store for state shared between server processes
+
+Each worker of a multi-process server would otherwise keep its own edit history,
+its own symbol index and its own idea of what changed on disk. When a database
+path is configured (MCP_STATE_DB, or automatically with --workers), that state
+lives in one SQLite file instead:
+
+* ``history``: the edit log, trimmed to the configured number of entries;
+* ``symbols``: extracted definitions keyed by file, mtime and size, so a file
+  parsed by one worker is reused by the others;
+* ``changes``: a feed of the paths each process wrote, which the other processes
+  replay into their change notifier so their indexes and caches drop stale
+  entries.
+
+SQLite's file locks serialize writers across processes and WAL mode keeps
+readers from waiting on them. Connections are opened per thread and per process,
+so they stay valid across fork(). sqlite3 itself is only imported once a
+database is configured.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .config import SHARED_CHANGES_KEPT, STATE_DB
+from .events import change_notifier
+
+if TYPE_CHECKING:  # Imported on first use, so servers without a database never load it
+    import sqlite3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    file TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_file ON history (file);
+CREATE TABLE IF NOT EXISTS symbols (
+    root TEXT NOT NULL,
+    rel_path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    symbols TEXT NOT NULL,
+    PRIMARY KEY (root, rel_path)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid INTEGER NOT NULL,
+    path TEXT NOT NULL
+);
+"""
+
+# Bound parameters per query; SQLite's default limit is 999
+_BATCH = 500
+
+SymbolRecord = Tuple[int, int, str]  # (mtime_ns, size, encoded symbols)
+
+
+class SharedStore:
+    """State shared by the server processes through one SQLite database"""
+
+    def __init__(self, path: Union[str, Path] = STATE_DB, busy_timeout: float = 10.0):
+        self.path = str(path) if path else ""
+        self.busy_timeout = busy_timeout
+        self.changes_kept = SHARED_CHANGES_KEPT
+        self._local = threading.local()
+        self._change_seq: Optional[int] = None
+        self._change_pid = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a database is configured"""
+        return bool(self.path)
+
+    def configure(self, path: Union[str, Path]) -> None:
+        """Use the database at path (created if missing), or none for an empty path"""
+        self.path = str(path) if path else ""
+        self._local = threading.local()
+        self._change_seq = None
+        if self.enabled:
+            self._connection()
+
+    def _connection(self) -> "sqlite3.Connection":
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid() or local.path != self.path:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            local.conn, local.pid, local.path = conn, os.getpid(), self.path
+        return local.conn
+
+    @contextmanager
+    def transaction(self) -> Iterator["sqlite3.Connection"]:
+        """Connection inside a write transaction; writers in other processes wait for it"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # Edit history
+
+    def append_history(self, entry: Dict, max_entries: int) -> None:
+        """Add an edit log entry, dropping the oldest beyond max_entries"""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO history (timestamp, action, file, details) VALUES (?, ?, ?, ?)",
+                (entry["timestamp"], entry["action"], entry["file"], json.dumps(entry["details"])))
+            conn.execute("DELETE FROM history WHERE id <= ?", (cursor.lastrowid - max_entries,))
+
+    def history(self, limit: Optional[int] = None, file_path: Optional[str] = None) -> List[Dict]:
+        """Edit log entries, oldest first; the last limit of them when given"""
+        sql = "SELECT timestamp, action, file, details FROM history"
+        params: Tuple = ()
+        if file_path:
+            sql += " WHERE file = ?"
+            params = (file_path,)
+        sql += " ORDER BY id DESC LIMIT ?"
+        rows = self._connection().execute(sql, params + (limit or -1,)).fetchall()
+        return [{"timestamp": timestamp, "action": action, "file": file, "details": json.loads(details)}
+                for timestamp, action, file, details in reversed(rows)]
+
+    def clear_history(self) -> None:
+        """Delete every edit log entry"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM history")
+
+    # Symbol cache
+
+    def load_symbols(self, root: str, rel_paths: List[str]) -> Dict[str, SymbolRecord]:
+        """Stored definitions of the given files, by relative path; a cache, so errors give {}"""
+        import sqlite3
+
+        found: Dict[str, SymbolRecord] = {}
+        try:
+            conn = self._connection()
+            for i in range(0, len(rel_paths), _BATCH):
+                batch = rel_paths[i:i + _BATCH]
+                rows = conn.execute(
+                    f"SELECT rel_path, mtime_ns, size, symbols FROM symbols "
+                    f"WHERE root = ? AND rel_path IN ({','.join('?' * len(batch))})", [root, *batch])
+                for rel_path, mtime_ns, size, symbols in rows:
+                    found[rel_path] = (mtime_ns, size, symbols)
+        except sqlite3.Error:
+            return {}
+        return found
+
+    def save_symbols(self, root: str, records: Iterable[Tuple[str, int, int, str]]) -> None:
+        """Store (rel_path, mtime_ns, size, encoded symbols) records; failures are ignored"""
+        import sqlite3
+
+        try:
+            with self.transaction() as conn:
+                conn.executemany("INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?)",
+                                 [(root, *record) for record in records])
+        except sqlite3.Error:
+            pass
+
+    # Change feed
+
+    def publish_changes(self, paths: Iterable[Union[str, Path]]) -> None:
+        """Record paths this process changed for the other processes; failures are ignored"""
+        import sqlite3
+
+        rows = [(os.getpid(), str(path)) for path in paths]
+        if not rows:
+            return
+        try:
+            with self.transaction() as conn:
+                conn.executemany("INSERT INTO changes (pid, path) VALUES (?, ?)", rows)
+                last = conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0]
+                if last % 1000 < len(rows):  # Trim once per thousand changes
+                    conn.execute("DELETE FROM changes WHERE seq <= ?", (last - self.changes_kept,))
+        except sqlite3.Error:
+            pass
+
+    def pending_changes(self) -> List[str]:
+        """Paths other processes changed since the previous call; the first call only sets the mark"""
+        import sqlite3
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                if self._change_seq is None or self._change_pid != os.getpid():
+                    self._change_pid = os.getpid()
+                    self._change_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+                    return []
+                rows = conn.execute("SELECT seq, pid, path FROM changes WHERE seq > ? ORDER BY seq",
+                                    (self._change_seq,)).fetchall()
+            except sqlite3.Error:
+                return []
+            if rows:
+                self._change_seq = rows[-1][0]
+            pid = os.getpid()
+            return [path for _, owner, path in rows if owner != pid]
+
+
+# Global shared store instance
+shared_store = SharedStore()
+change_notifier.relay = shared_store
@@ -0,0 +1,181 @@
+"""
+Definition extraction for code-aware navigation
+
+Python files are parsed with ``ast``, so nesting and decorators are handled
+exactly. The other languages in LANGUAGE_MAP get small line-oriented regex
+grammars that recognise the common definition forms (functions, classes and
+their relatives) without a real parser; they trade completeness for speed and
+never raise on malformed input. JSON has no definitions to extract.
+"""
+
+import ast
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .constants import LANGUAGE_MAP
+from .encoding import read_text
+from .lines import LineIndex
+from ..models.file_models import Symbol
+
+# Longest definition line kept as a symbol's signature
+_SIGNATURE_LIMIT = 200
+
+_JS_NAME = r"[A-Za-z_$][\w$]*"
+_CONTROL_WORDS = frozenset({
+    "if", "for", "while", "switch", "catch", "return", "function", "else", "do", "new",
+    "throw", "typeof", "await", "super", "this", "sizeof", "delete",
+})
+
+# language -> [(kind, pattern)]; each pattern captures the name as (?P<name>...)
+# and may override the kind with (?P<kind>...). Patterns run in MULTILINE mode.
+_GRAMMAR_SOURCES: Dict[str, List[Tuple[str, str]]] = {
+    # Only for Python that ast cannot parse (mid-edit files, newer syntax)
+    "python_fallback": [
+        ("class", r"^[ \t]*class[ \t]+(?P<name>\w+)"),
+        ("function", r"^[ \t]*(?:async[ \t]+)?def[ \t]+(?P<name>\w+)"),
+    ],
+    "javascript": [
+        ("function", rf"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:async[ \t]+)?function\b[ \t]*\*?[ \t]*(?P<name>{_JS_NAME})"),
+        ("class", rf"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?class[ \t]+(?P<name>{_JS_NAME})"),
+        ("function", rf"^[ \t]*(?:export[ \t]+)?(?:const|let|var)[ \t]+(?P<name>{_JS_NAME})[ \t]*=[ \t]*"
+                     rf"(?:async[ \t]+)?(?:function\b|\([^()\n]*\)[ \t]*=>|{_JS_NAME}[ \t]*=>)"),
+        ("method", rf"^[ \t]+(?:(?:static|async|get|set)[ \t]+)*\*?(?P<name>{_JS_NAME})[ \t]*\([^()\n]*\)[ \t]*\{{"),
+    ],
+    "typescript": [
+        ("function", rf"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:declare[ \t]+)?(?:async[ \t]+)?function\b[ \t]*\*?[ \t]*(?P<name>{_JS_NAME})"),
+        ("class", rf"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:declare[ \t]+)?(?:abstract[ \t]+)?class[ \t]+(?P<name>{_JS_NAME})"),
+        ("interface", rf"^[ \t]*(?:export[ \t]+)?(?:declare[ \t]+)?(?P<kind>interface|enum|type|namespace)[ \t]+(?P<name>{_JS_NAME})"),
+        ("function", rf"^[ \t]*(?:export[ \t]+)?(?:const|let|var)[ \t]+(?P<name>{_JS_NAME})[ \t]*(?::[^=\n]+)?=[ \t]*"
+                     rf"(?:async[ \t]+)?(?:function\b|\([^()\n]*\)[ \t]*(?::[^=\n]+)?=>|{_JS_NAME}[ \t]*=>)"),
+        ("method", rf"^[ \t]+(?:(?:public|private|protected|static|readonly|async|abstract|override|get|set)[ \t]+)*"
+                   rf"(?P<name>{_JS_NAME})[ \t]*(?:<[^>\n]*>)?[ \t]*\([^()\n]*\)[ \t]*(?::[^{{;\n]+)?\{{"),
+    ],
+    "java": [
+        ("class", r"^[ \t]*(?:(?:public|private|protected|static|final|abstract|sealed|non-sealed|strictfp)[ \t]+)*"
+                  r"(?P<kind>class|interface|enum|record|@interface)[ \t]+(?P<name>\w+)"),
+        ("method", r"^[ \t]+(?:(?:public|private|protected|static|final|abstract|synchronized|native|default)[ \t]+)*"
+                   r"(?:<[^>\n]+>[ \t]+)?[\w<>\[\],.?]+(?:[ \t]*<[^>\n]*>)?(?:\[\])*[ \t]+(?P<name>\w+)[ \t]*\([^;{}\n]*\)"
+                   r"[ \t]*(?:throws[ \t]+[\w., \t]+)?[ \t]*\{"),
+    ],
+    "c": [
+        ("function", r"^(?:[A-Za-z_][\w]*[ \t\*]+)+(?P<name>[A-Za-z_]\w*)[ \t]*\([^;{}\n]*\)[ \t]*\{?[ \t]*$"),
+        ("struct", r"^[ \t]*(?:typedef[ \t]+)?(?P<kind>struct|union|enum)[ \t]+(?P<name>\w+)[ \t]*\{"),
+        ("macro", r"^[ \t]*#[ \t]*define[ \t]+(?P<name>\w+)"),
+    ],
+    "cpp": [
+        ("function", r"^(?:[A-Za-z_][\w:<>,]*[ \t\*&]+)*(?P<name>[A-Za-z_~][\w]*(?:::[A-Za-z_~]\w*)*)[ \t]*"
+                     r"\([^;{}\n]*\)[ \t]*(?:const[ \t]*)?(?:noexcept[ \t]*)?(?:override[ \t]*)?\{?[ \t]*$"),
+        ("class", r"^[ \t]*(?:template[ \t]*<[^>\n]*>[ \t]*)?(?:typedef[ \t]+)?(?P<kind>class|struct|union|enum(?:[ \t]+class)?|namespace)"
+                  r"[ \t]+(?P<name>\w+)[^;\n]*$"),
+        ("macro", r"^[ \t]*#[ \t]*define[ \t]+(?P<name>\w+)"),
+    ],
+    "css": [
+        ("selector", r"^[ \t]*(?P<name>[.#][A-Za-z_-][\w-]*)[^{};\n]*\{"),
+        ("keyframes", r"^[ \t]*@(?:-\w+-)?keyframes[ \t]+(?P<name>[\w-]+)"),
+    ],
+    "html": [
+        ("id", r"<[A-Za-z][^<>]*?\bid[ \t]*=[ \t]*[\"'](?P<name>[^\"'<>]+)[\"']"),
+    ],
+}
+
+_grammars: Dict[str, List[Tuple[str, "re.Pattern[str]"]]] = {}
+
+
+def language_for(path: str) -> Optional[str]:
+    """Language of a file according to LANGUAGE_MAP, or None"""
+    return LANGUAGE_MAP.get(os.path.splitext(path)[1].lower())
+
+
+def _grammar(language: str) -> List[Tuple[str, "re.Pattern[str]"]]:
+    grammar = _grammars.get(language)
+    if grammar is None:
+        grammar = [(kind, re.compile(source, re.MULTILINE))
+                   for kind, source in _GRAMMAR_SOURCES.get(language, ())]
+        _grammars[language] = grammar
+    return grammar
+
+
+def _signature(line: str) -> str:
+    line = line.strip()
+    return line if len(line) <= _SIGNATURE_LIMIT else line[:_SIGNATURE_LIMIT - 3] + "..."
+
+
+def _python_symbols(text: str, file_path: str) -> Optional[List[Symbol]]:
+    """Definitions in Python source, or None if it does not parse"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    lines = text.splitlines()
+    symbols: List[Symbol] = []
+
+    def visit(body: Iterable[ast.stmt], container: Optional[str], in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                # Definitions under if/try/with blocks still belong to this scope
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    nested = getattr(node, field, None)
+                    if nested:
+                        visit([n for n in nested if isinstance(n, ast.AST)], container, in_class)
+                continue
+            line = lines[node.lineno - 1] if node.lineno <= len(lines) else ""
+            column = line.find(node.name, node.col_offset)
+            symbols.append(Symbol(node.name, kind, file_path, node.lineno,
+                                  column if column != -1 else node.col_offset,
+                                  container, _signature(line)))
+            qualified = f"{container}.{node.name}" if container else node.name
+            visit(node.body, qualified, kind == "class")
+
+    visit(tree.body, None, False)
+    return symbols
+
+
+def _grammar_symbols(text: str, file_path: str, language: str) -> List[Symbol]:
+    grammar = _grammar(language)
+    if not grammar:
+        return []
+    index = LineIndex(text)
+    found: Dict[Tuple[int, str], Symbol] = {}
+    for kind, pattern in grammar:
+        for match in pattern.finditer(text):
+            name = match.group("name")
+            if name in _CONTROL_WORDS:
+                continue
+            start = match.start("name")
+            line = index.line_of(start)
+            key = (line, name)
+            if key in found:
+                continue  # The first, more specific rule wins
+            symbol_kind = (match.groupdict().get("kind") or kind).split()[0]
+            found[key] = Symbol(name, symbol_kind, file_path, line + 1,
+                                start - index.line_start(line), None, _signature(index.line(line)))
+    return sorted(found.values(), key=lambda s: (s.line_number, s.column))
+
+
+def extract_symbols(text: str, file_path: str, language: Optional[str] = None) -> List[Symbol]:
+    """Definitions found in a file's text, in source order"""
+    language = language or language_for(file_path)
+    if language is None:
+        return []
+    if language == "python":
+        symbols = _python_symbols(text, file_path)
+        if symbols is not None:
+            return symbols
+        return _grammar_symbols(text, file_path, "python_fallback")
+    return _grammar_symbols(text, file_path, language)
+
+
+def extract_file_symbols(path: str, rel_path: str) -> Optional[List[Symbol]]:
+    """Definitions in a file on disk, or None if it cannot be read as text"""
+    try:
+        decoded = read_text(path)
+    except OSError:
+        return None
+    if decoded is None:
+        return None
+    return extract_symbols(decoded[0], rel_path)
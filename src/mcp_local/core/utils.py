@@ -2,13 +2,32 @@
 Core utilities and helper functions
 """
 
-import mimetypes
+import hashlib
+import importlib
+import json
 import fnmatch
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
+
+try:  # Optional, noticeably faster for large result sets
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
 
 from .config import DEFAULT_EXCLUDE_PATTERNS
 
+_optional_modules: Dict[str, Any] = {}
+
+
+def optional_import(name: str) -> Any:
+    """Import an optional dependency on first use; None when it is not installed"""
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:  # pragma: no cover - depends on environment
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
 
 def should_exclude_file(file_path: Path, exclude_patterns: List[str]) -> bool:
     """Check if file should be excluded based on patterns"""
@@ -28,6 +47,7 @@ def is_text_file(file_path: Path) -> bool:
     """Check if file is likely a text file"""
     try:
         # Check file extension
+        import mimetypes  # Loads the system MIME tables; only needed here
         mime_type, _ = mimetypes.guess_type(str(file_path))
         if mime_type and mime_type.startswith('text'):
             return True
@@ -65,6 +85,18 @@ def format_file_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024):.1f} MB"
 
 
+def to_json(data: Any) -> str:
+    """Serialize tool output as compact JSON in a single pass"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def hash_bytes(data: bytes) -> str:
+    """Short content hash used for version tokens"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
 def validate_path(path_str: str) -> Path:
     """Validate and resolve a file path"""
     path = Path(path_str).expanduser().resolve()
@@ -0,0 +1,196 @@
+"""
+Deterministic, resumable directory walking
+
+Directories are visited depth-first with entries sorted by name: the files of a
+directory first, then its subdirectories. Because the order is fixed, a position
+in the walk is fully described by the relative path of the current file, and the
+pending directory stack can be rebuilt from that path's ancestors. Resuming a walk
+therefore costs one directory listing per path component, not a rescan of
+everything visited before.
+
+Inside git working trees, GitAwareWalker additionally drops paths that git
+ignores unless they are tracked, and skips ignored directories entirely.
+"""
+
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .gitignore import GitRepository, find_repository, repository_at
+
+
+class TreeWalker:
+    """Walks the text-search candidates below a root in a stable order"""
+
+    def __init__(self, root: Path, show_hidden: bool = False,
+                 exclude_patterns: Sequence[str] = (),
+                 include_patterns: Sequence[str] = ("*",),
+                 track_dirs: bool = False):
+        self.root = root
+        self.show_hidden = show_hidden
+        self.exclude_patterns = list(exclude_patterns)
+        self.include_patterns = list(include_patterns)
+        # With track_dirs, the mtime of every directory listed, taken just before listing
+        self.dir_mtimes: Optional[Dict[str, int]] = {} if track_dirs else None
+        # Globs are compiled once into single alternations instead of calling
+        # fnmatch pattern by pattern for every entry
+        self._exclude = _compile_globs(self.exclude_patterns)
+        self._include = None if "*" in self.include_patterns else _compile_globs(self.include_patterns)
+
+    def _excluded(self, name: str, path: Path) -> bool:
+        # Directories are only entered after passing this check themselves, so
+        # testing the entry's own name and full path covers its parents too
+        if self._exclude is None:
+            return False
+        return bool(self._exclude.match(os.path.normcase(name))
+                    or self._exclude.match(os.path.normcase(str(path))))
+
+    def include_dir(self, rel_path: str, name: str, path: Path) -> bool:
+        """Whether the walk should descend into a directory"""
+        if not self.show_hidden and name.startswith('.'):
+            return False
+        return not self._excluded(name, path)
+
+    def include_file(self, rel_path: str, name: str, path: Path) -> bool:
+        """Whether a file is a candidate"""
+        if not self.show_hidden and name.startswith('.'):
+            return False
+        if self._include is not None and not self._include.match(os.path.normcase(name)):
+            return False
+        return not self._excluded(name, path)
+
+    def list_dir(self, rel_dir: str = "") -> Tuple[List[str], List[str]]:
+        """Sorted names of the candidate files and subdirectories of one directory"""
+        directory = self.root / rel_dir if rel_dir else self.root
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        if self.dir_mtimes is not None:
+            try:
+                self.dir_mtimes[str(directory)] = os.stat(directory).st_mtime_ns
+            except OSError:
+                pass
+        files, dirs = self._list(directory)
+        return ([name for name in files if self.include_file(prefix + name, name, directory / name)],
+                [name for name in dirs if self.include_dir(prefix + name, name, directory / name)])
+
+    def walk(self, resume_from: Optional[str] = None) -> Iterator[Tuple[str, Path]]:
+        """
+        Yield ``(relative_path, path)`` for every candidate file.
+
+        With ``resume_from`` (a relative path previously yielded), the walk starts
+        at that file, or where it would have been if it no longer exists.
+        """
+        if self.root.is_file():
+            if resume_from in (None, "", self.root.name):
+                yield self.root.name, self.root
+            return
+        resume = [part for part in resume_from.split('/') if part] if resume_from else None
+        yield from self._walk_dir("", self.root, resume)
+
+    def _list(self, directory: Path) -> Tuple[List[str], List[str]]:
+        """Sorted file and subdirectory names of a directory"""
+        files: List[str] = []
+        dirs: List[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            # Like os.walk, symlinked directories are not followed
+                            if not entry.is_symlink():
+                                dirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        files.sort()
+        dirs.sort()
+        return files, dirs
+
+    def _walk_dir(self, rel_dir: str, directory: Path,
+                  resume: Optional[List[str]]) -> Iterator[Tuple[str, Path]]:
+        files, dirs = self.list_dir(rel_dir)
+        prefix = f"{rel_dir}/" if rel_dir else ""
+
+        child_resume: Optional[List[str]] = None
+        if resume:
+            if len(resume) == 1:
+                # Resuming at a file in this directory
+                files = [name for name in files if name >= resume[0]]
+            else:
+                # Resuming inside a subdirectory: this directory's files are done
+                files = []
+                dirs = [name for name in dirs if name >= resume[0]]
+                child_resume = resume[1:]
+
+        for name in files:
+            yield prefix + name, directory / name
+
+        for name in dirs:
+            sub_resume = child_resume if child_resume is not None and name == resume[0] else None
+            yield from self._walk_dir(prefix + name, directory / name, sub_resume)
+
+
+def _compile_globs(patterns: Sequence[str]) -> Optional["re.Pattern[str]"]:
+    """One regex matching whatever any of the fnmatch-style patterns matches"""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns))
+
+
+class GitAwareWalker(TreeWalker):
+    """TreeWalker that only yields tracked or unignored paths of git working trees"""
+
+    def __init__(self, root: Path, repository: Optional[GitRepository] = None, **options):
+        super().__init__(root, **options)
+        if repository is None:
+            repository = find_repository(root)
+        # Walk-relative directory -> (repository, repository-relative directory)
+        self._repos: Dict[str, Tuple[Optional[GitRepository], str]] = {}
+        if repository is not None:
+            base = root if root.is_dir() else root.parent
+            self._repos[""] = (repository, repository.relative(base))
+        else:
+            self._repos[""] = (None, "")
+
+    def _repository_for(self, rel_dir: str) -> Tuple[Optional[GitRepository], str]:
+        """Repository owning a directory, switching at nested repositories"""
+        cached = self._repos.get(rel_dir)
+        if cached is not None:
+            return cached
+        parent, _, name = rel_dir.rpartition("/")
+        nested = repository_at(self.root / rel_dir)
+        if nested is not None:
+            result: Tuple[Optional[GitRepository], str] = (nested, "")
+        else:
+            repo, repo_dir = self._repository_for(parent)
+            result = (repo, f"{repo_dir}/{name}" if repo_dir else name)
+        self._repos[rel_dir] = result
+        return result
+
+    def _is_candidate(self, rel_path: str, is_dir: bool) -> bool:
+        parent, _, name = rel_path.rpartition("/")
+        repo, repo_dir = self._repository_for(parent)
+        if repo is None:
+            return True
+        if name == ".git":
+            return False
+        return repo.is_candidate(f"{repo_dir}/{name}" if repo_dir else name, is_dir)
+
+    def include_dir(self, rel_path: str, name: str, path: Path) -> bool:
+        return (super().include_dir(rel_path, name, path)
+                and self._is_candidate(rel_path, is_dir=True))
+
+    def include_file(self, rel_path: str, name: str, path: Path) -> bool:
+        return (super().include_file(rel_path, name, path)
+                and self._is_candidate(rel_path, is_dir=False))
+
+
+def create_walker(root: Path, respect_gitignore: bool = True, **options) -> TreeWalker:
+    """Build the walker for a search root, git-aware when the root is in a repository"""
+    if respect_gitignore:
+        return GitAwareWalker(root, **options)
+    return TreeWalker(root, **options)
@@ -2,8 +2,21 @@
 Main entry point for MCP Local
 """
 
+import os
 import sys
 import argparse
+from .core.config import (
+    CLIENT_CONCURRENCY,
+    DEFAULT_STATE_DB,
+    DRAIN_TIMEOUT,
+    HTTP_CLIENT_CONCURRENCY,
+    HTTP_HOST,
+    HTTP_PORT,
+    HTTP_WORKERS,
+    STATE_DB,
+)
+from .core.executor import tool_executor
+from .core.metrics import metrics
 from .server import create_server
 
 
@@ -13,21 +26,58 @@ def main():
     parser.add_argument("--name", default="mcp-local", 
                        help="Server name (default: mcp-local)")
     parser.add_argument("--transport", default="stdio", 
-                       choices=["stdio"], help="Transport type (default: stdio)")
+                       choices=["stdio", "streamable-http", "sse"], help="Transport type (default: stdio)")
+    parser.add_argument("--host", default=HTTP_HOST,
+                       help=f"Address the HTTP transports listen on (default: {HTTP_HOST})")
+    parser.add_argument("--port", type=int, default=HTTP_PORT,
+                       help=f"Port the HTTP transports listen on (default: {HTTP_PORT})")
+    parser.add_argument("--client-limit", type=int, default=None,
+                       help="Concurrent tool calls allowed per client, 0 for no limit "
+                            f"(default: {HTTP_CLIENT_CONCURRENCY} over HTTP)")
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS,
+                       help="Server processes for streamable-http, sharing state through "
+                            f"MCP_STATE_DB (default: {HTTP_WORKERS})")
+    parser.add_argument("--drain-timeout", type=float, default=DRAIN_TIMEOUT,
+                       help=f"Seconds shutdown waits for running tool calls (default: {DRAIN_TIMEOUT:g})")
     
     args = parser.parse_args()
+    if args.workers > 1 and args.transport != "streamable-http":
+        parser.error("--workers needs --transport streamable-http")
     
     try:
         # Create and run the server
-        server = create_server(args.name)
         print(f"Starting MCP Local server: {args.name}", file=sys.stderr)
-        server.run(transport=args.transport)
+        if args.transport == "stdio":
+            if args.client_limit is not None:
+                tool_executor.set_client_limit(args.client_limit)
+            server = create_server(args.name)
+            server.run(transport=args.transport)
+        else:
+            from .core.store import shared_store
+            from .transports import run_http, run_workers
+
+            client_limit = args.client_limit
+            if client_limit is None:
+                client_limit = (CLIENT_CONCURRENCY if "MCP_CLIENT_CONCURRENCY" in os.environ
+                                else HTTP_CLIENT_CONCURRENCY)
+            tool_executor.set_client_limit(client_limit)
+            server = create_server(args.name, host=args.host, port=args.port)
+            print(f"Listening on http://{args.host}:{args.port} ({args.transport})", file=sys.stderr)
+            if args.workers > 1:
+                shared_store.configure(STATE_DB or DEFAULT_STATE_DB)
+                print(f"Running {args.workers} workers sharing {shared_store.path}", file=sys.stderr)
+                run_workers(server, args.workers, drain_timeout=args.drain_timeout)
+            else:
+                run_http(server, args.transport, drain_timeout=args.drain_timeout)
     except KeyboardInterrupt:
         print("\nServer stopped by user", file=sys.stderr)
         sys.exit(0)
     except Exception as e:
         print(f"Error starting server: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        tool_executor.shutdown(wait=False)
+        metrics.dump()
 
 
 if __name__ == "__main__":
@@ -2,6 +2,8 @@
 Data models for file operations.
 """
 
+import base64
+import json
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -81,6 +83,8 @@ class SearchResults:
     files_with_matches: int
     search_path: str
     options: Dict[str, Any]
+    truncated: bool = False
+    next_cursor: Optional[str] = None
     
     @property
     def total_matches(self) -> int:
@@ -95,6 +99,44 @@ class SearchResults:
                 grouped[match.file_path] = []
             grouped[match.file_path].append(match)
         return grouped
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "search_term": self.search_term,
+            "search_path": self.search_path,
+            "files_searched": self.files_searched,
+            "files_with_matches": self.files_with_matches,
+            "total_matches": self.total_matches,
+            "truncated": self.truncated,
+            "next_cursor": self.next_cursor,
+            "options": self.options,
+            "matches": [match.to_dict() for match in self.matches]
+        }
+
+
+@dataclass
+class SearchCursor:
+    """Position where a paged search stopped: the next unreturned match."""
+    query: str
+    file_path: str
+    offset: int
+    
+    def encode(self) -> str:
+        """Encode as the opaque token handed to clients."""
+        raw = json.dumps({"q": self.query, "f": self.file_path, "o": self.offset},
+                         separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @classmethod
+    def decode(cls, token: str) -> "SearchCursor":
+        """Parse a token produced by encode(), raising ValueError if malformed."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return cls(query=str(data["q"]), file_path=str(data["f"]), offset=int(data["o"]))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Malformed cursor: {e}") from e
 
 
 @dataclass
@@ -111,3 +153,61 @@ class ReplaceResult:
     def success(self) -> bool:
         """Whether the replacement was successful."""
         return self.error is None
+
+
+@dataclass
+class FileRange:
+    """A file, or a range of its lines (1-indexed, inclusive), to read."""
+    path: str
+    start_line: int = 1
+    end_line: Optional[int] = None
+
+
+@dataclass
+class FileVersion:
+    """Version token identifying one revision of a file's content."""
+    content_hash: str
+    mtime_ns: int
+    size: int
+    
+    def describe(self) -> str:
+        """Format as the token shown to clients."""
+        return f"hash={self.content_hash} mtime={self.mtime_ns}"
+
+
+@dataclass
+class Symbol:
+    """A named definition found in a source file."""
+    name: str
+    kind: str
+    file_path: str
+    line_number: int
+    column: int
+    container: Optional[str] = None
+    signature: str = ""
+    
+    @property
+    def qualified_name(self) -> str:
+        """Name prefixed with its enclosing class or function, if any."""
+        return f"{self.container}.{self.name}" if self.container else self.name
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "file": self.file_path,
+            "line_number": self.line_number,
+            "column": self.column,
+            "container": self.container,
+            "signature": self.signature
+        }
+
+
+@dataclass
+class TrashEntry:
+    """A deleted file or tree waiting in a staging directory for its purge."""
+    deletion_id: str
+    original_path: str
+    staged_path: Path
+    purge_at: float  # time.time() after which it is purged
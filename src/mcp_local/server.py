@@ -2,29 +2,35 @@
 Main MCP Local server implementation
 """
 
+from typing import Any
+
 from mcp.server.fastmcp import FastMCP
 
 from .tools.file_operations import register_file_operations
 from .tools.file_editing import register_file_editing_tools
 from .tools.search_tools import register_search_tools
-from .services import backup_service, history_service, file_service
+from .tools.navigation_tools import register_navigation_tools
+from .tools.server_tools import register_server_tools
+
 
+def create_server(name: str = "mcp-local", **settings: Any) -> FastMCP:
+    """Create and configure the MCP Local server
 
-def create_server(name: str = "mcp-local") -> FastMCP:
-    """Create and configure the MCP Local server"""
+    Extra keyword arguments are FastMCP settings, such as host and port for the
+    HTTP transports.
+    """
     
     # Create the FastMCP server
-    mcp = FastMCP(name)
+    mcp = FastMCP(name, **settings)
     
-    # Initialize services
-    backup_service.initialize()
-    history_service.initialize()
-    file_service.initialize()
+    # Services set themselves up on first use, keeping startup cheap
     
     # Register all tool modules
     register_file_operations(mcp)
     register_file_editing_tools(mcp)
     register_search_tools(mcp)
+    register_navigation_tools(mcp)
+    register_server_tools(mcp)
     
     # Add a simple data query tool
     @mcp.tool()
@@ -2,12 +2,16 @@
 Services module for MCP Local
 
 This module contains business logic services that handle core functionality
-like backup management, edit history tracking, and file operations.
+like backup management, edit history tracking, file operations, staged deletes
+and path and symbol indexing.
 """
 
 from .backup_service import BackupService, backup_service
 from .history_service import HistoryService, history_service
 from .file_service import FileService, file_service
+from .path_index_service import PathIndex, PathIndexService, path_index_service
+from .symbol_index_service import SymbolIndex, SymbolIndexService, symbol_index_service
+from .trash_service import TrashService, trash_service
 
 __all__ = [
     "BackupService",
@@ -15,5 +19,13 @@ __all__ = [
     "HistoryService", 
     "history_service",
     "FileService",
-    "file_service"
+    "file_service",
+    "PathIndex",
+    "PathIndexService",
+    "path_index_service",
+    "SymbolIndex",
+    "SymbolIndexService",
+    "symbol_index_service",
+    "TrashService",
+    "trash_service"
 ]
@@ -3,12 +3,15 @@ Backup service for managing file backups
 """
 
 import datetime
-import shutil
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 
 from ..core import ServiceBase, BACKUP_DIR
+from ..core.events import change_notifier
 from ..core.exceptions import BackupError
+from ..core.locks import path_locks
 
 
 class BackupService(ServiceBase):
@@ -16,14 +19,18 @@ class BackupService(ServiceBase):
     
     def __init__(self):
         self.backup_dir = BACKUP_DIR
-        self.initialize()
+        self._name_lock = threading.Lock()
+        self._initialized_dir: Optional[Path] = None
     
     def initialize(self) -> None:
-        """Initialize backup service"""
+        """Create the backup directory; runs on the first backup into it"""
+        if self._initialized_dir == self.backup_dir:
+            return
         try:
             self.backup_dir.mkdir(exist_ok=True)
         except Exception as e:
             raise BackupError(f"Failed to initialize backup directory: {e}")
+        self._initialized_dir = self.backup_dir
     
     def cleanup(self) -> None:
         """Cleanup old backups if needed"""
@@ -37,15 +44,31 @@ class BackupService(ServiceBase):
             if not path.exists():
                 return ""
             
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{path.name}_{timestamp}.backup"
-            backup_path = self.backup_dir / backup_name
+            import shutil
             
-            shutil.copy2(path, backup_path)
+            self.initialize()
+            with path_locks.read_lock(path):
+                backup_path = self._reserve_backup_path(path.name)
+                shutil.copy2(path, backup_path)
             return str(backup_path)
         except Exception as e:
             raise BackupError(f"Failed to create backup: {e}")
     
+    def _reserve_backup_path(self, file_name: str) -> Path:
+        """Claim a backup file name that no concurrent backup is using, in any process"""
+        with self._name_lock:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            backup_path = self.backup_dir / f"{file_name}_{timestamp}.backup"
+            counter = 1
+            while True:
+                try:
+                    # O_EXCL makes the claim atomic across the workers sharing the directory
+                    os.close(os.open(backup_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                    return backup_path
+                except FileExistsError:
+                    backup_path = self.backup_dir / f"{file_name}_{timestamp}-{counter}.backup"
+                    counter += 1
+    
     def list_backups(self, file_name: Optional[str] = None) -> list:
         """List available backups"""
         try:
@@ -78,7 +101,11 @@ class BackupService(ServiceBase):
             if not backup.exists():
                 raise BackupError(f"Backup file not found: {backup_path}")
             
-            shutil.copy2(backup, target)
+            import shutil
+            
+            with path_locks.write_lock(target):
+                shutil.copy2(backup, target)
+            change_notifier.notify(target)
             return True
         except Exception as e:
             raise BackupError(f"Failed to restore backup: {e}")
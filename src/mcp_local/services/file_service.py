@@ -2,14 +2,29 @@
 File service for managing file operations
 """
 
+import errno
 import json
 import os
+import stat
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 from ..core import ServiceBase, MAX_FILE_SIZE
-from ..core.exceptions import FileNotFoundError, FileSizeError, FileAccessError
-from ..core.utils import format_file_size, validate_path
+from ..core.config import FILES_INFO_CHUNK
+from ..core.encoding import decode_file_bytes, encode_for_write, remember_encoding
+from ..core.events import change_notifier
+from ..core.exceptions import ConflictError, FileNotFoundError, FileSizeError, FileAccessError
+from ..core.executor import tool_executor
+from ..core.gitignore import find_repository
+from ..core.locks import path_locks
+from ..core.metrics import metrics
+from ..core.utils import format_file_size, hash_bytes, validate_path
+from ..models.file_models import FileVersion
+
+if TYPE_CHECKING:  # The copy machinery is only loaded by the copy and move tools
+    from ..core.fastcopy import TreePlan
 
 
 class FileService(ServiceBase):
@@ -28,6 +43,11 @@ class FileService(ServiceBase):
     
     def read_file(self, file_path: str, max_size: Optional[int] = None) -> str:
         """Read contents of a text file"""
+        return self.read_file_versioned(file_path, max_size)[0]
+    
+    def read_file_versioned(self, file_path: str,
+                            max_size: Optional[int] = None) -> Tuple[str, FileVersion]:
+        """Read a text file together with the version token of the bytes read"""
         try:
             path = validate_path(file_path)
             
@@ -42,12 +62,19 @@ class FileService(ServiceBase):
                 raise FileSizeError(f"File too large ({format_file_size(file_size)}). "
                                   f"Limit: {format_file_size(size_limit)}")
             
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with path_locks.read_lock(path):
+                with open(path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    data = f.read()
+            metrics.add("bytes_read", len(data))
             
-            return content
+            decoded = decode_file_bytes(path, data, stat)
+            if decoded is None:
+                raise FileAccessError(f"Cannot decode file '{file_path}' as text: file appears to be binary")
             
-        except (FileNotFoundError, FileSizeError):
+            return decoded[0], FileVersion(hash_bytes(data), stat.st_mtime_ns, stat.st_size)
+            
+        except (FileNotFoundError, FileSizeError, FileAccessError):
             raise
         except PermissionError:
             raise FileAccessError(f"Permission denied accessing '{file_path}'")
@@ -56,18 +83,79 @@ class FileService(ServiceBase):
         except Exception as e:
             raise FileAccessError(f"Error reading file '{file_path}': {e}")
     
-    def write_file(self, file_path: str, content: str, create_dirs: bool = True) -> bool:
-        """Write content to a file"""
+    def check_version(self, file_path: str, expected_hash: Optional[str] = None,
+                      expected_mtime: Optional[int] = None,
+                      current: Optional[FileVersion] = None) -> None:
+        """
+        Reject an edit based on a stale view of a file.
+        
+        Against a ``current`` version already read this costs nothing. Otherwise
+        the mtime is checked with a single stat and the content is only hashed
+        when an expected hash is given.
+        """
+        if expected_hash is None and expected_mtime is None:
+            return
+        
+        if current is None:
+            path = validate_path(file_path)
+            try:
+                stat = path.stat()
+            except OSError:
+                raise ConflictError(f"File '{file_path}' no longer exists")
+            mtime_ns = stat.st_mtime_ns
+        else:
+            mtime_ns = current.mtime_ns
+        
+        if expected_mtime is not None and int(expected_mtime) != mtime_ns:
+            raise ConflictError(f"File '{file_path}' was modified since mtime {expected_mtime} "
+                                f"(now {mtime_ns}); re-read it before editing")
+        
+        if expected_hash is not None:
+            if current is not None:
+                content_hash = current.content_hash
+            else:
+                with path_locks.read_lock(path):
+                    with open(path, 'rb') as f:
+                        content_hash = hash_bytes(f.read())
+            if content_hash != expected_hash:
+                raise ConflictError(f"File '{file_path}' content changed since hash {expected_hash} "
+                                    f"(now {content_hash}); re-read it before editing")
+    
+    def read_for_edit(self, file_path: str, expected_hash: Optional[str] = None,
+                      expected_mtime: Optional[int] = None) -> Tuple[str, FileVersion]:
+        """Read a file that is about to be edited, rejecting a stale expected version"""
+        # A stale mtime is caught by a stat before paying for the read
+        self.check_version(file_path, expected_mtime=expected_mtime)
+        content, version = self.read_file_versioned(file_path)
+        self.check_version(file_path, expected_hash=expected_hash, current=version)
+        return content, version
+    
+    def write_file(self, file_path: str, content: str, create_dirs: bool = True,
+                   encoding: Optional[str] = None) -> bool:
+        """Write content to a file, keeping the encoding it was read with"""
+        self.write_file_versioned(file_path, content, create_dirs, encoding)
+        return True
+    
+    def write_file_versioned(self, file_path: str, content: str, create_dirs: bool = True,
+                             encoding: Optional[str] = None) -> FileVersion:
+        """Write content to a file and return the version token of what was written"""
         try:
             path = validate_path(file_path)
             
             if create_dirs:
                 path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data, encoding = encode_for_write(path, content, encoding)
+            with path_locks.write_lock(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    stat = os.fstat(f.fileno())
+                remember_encoding(path, encoding, stat)
+            metrics.add("bytes_written", len(data))
+            change_notifier.notify(path)
             
-            return True
+            return FileVersion(hash_bytes(data), stat.st_mtime_ns, stat.st_size)
             
         except PermissionError:
             raise FileAccessError(f"Permission denied writing to '{file_path}'")
@@ -77,24 +165,27 @@ class FileService(ServiceBase):
     def get_file_info(self, file_path: str) -> dict:
         """Get detailed information about a file"""
         try:
+            given = Path(file_path).expanduser()
+            try:
+                link = os.lstat(given)
+                st = os.stat(given) if stat.S_ISLNK(link.st_mode) else link
+            except OSError as e:
+                if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                    raise FileNotFoundError(f"File '{file_path}' does not exist")
+                raise
             path = validate_path(file_path)
             
-            if not path.exists():
-                raise FileNotFoundError(f"File '{file_path}' does not exist")
-            
-            stat = path.stat()
-            
             return {
                 "path": str(path),
                 "name": path.name,
-                "size": stat.st_size,
-                "size_formatted": format_file_size(stat.st_size),
-                "is_file": path.is_file(),
-                "is_dir": path.is_dir(),
-                "is_symlink": path.is_symlink(),
-                "modified_time": stat.st_mtime,
-                "created_time": stat.st_ctime,
-                "permissions": oct(stat.st_mode)[-3:],
+                "size": st.st_size,
+                "size_formatted": format_file_size(st.st_size),
+                "is_file": stat.S_ISREG(st.st_mode),
+                "is_dir": stat.S_ISDIR(st.st_mode),
+                "is_symlink": stat.S_ISLNK(link.st_mode),
+                "modified_time": st.st_mtime,
+                "created_time": st.st_ctime,
+                "permissions": oct(st.st_mode)[-3:],
                 "extension": path.suffix,
                 "parent": str(path.parent)
             }
@@ -104,9 +195,50 @@ class FileService(ServiceBase):
         except Exception as e:
             raise FileAccessError(f"Error getting file info for '{file_path}': {e}")
     
+    @staticmethod
+    def _stat_record(file_path: str, follow_symlinks: bool) -> Dict[str, Any]:
+        """Compact metadata of one path from one lstat (and a stat for a followed link)"""
+        path = os.path.expanduser(file_path)
+        try:
+            st = os.lstat(path)
+            symlink = stat.S_ISLNK(st.st_mode)
+            if symlink and follow_symlinks:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    return {"path": file_path, "type": "symlink", "size": st.st_size,
+                            "mtime_ns": st.st_mtime_ns, "mode": oct(st.st_mode)[-3:], "broken": True}
+        except OSError as e:
+            return {"path": file_path, "error": "not found" if e.errno in (errno.ENOENT, errno.ENOTDIR)
+                    else e.strerror or str(e)}
+        
+        mode = st.st_mode
+        kind = ("file" if stat.S_ISREG(mode) else "dir" if stat.S_ISDIR(mode)
+                else "symlink" if stat.S_ISLNK(mode) else "other")
+        record = {"path": file_path, "type": kind, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                  "mode": oct(mode)[-3:]}
+        if symlink and follow_symlinks:
+            record["symlink"] = True
+        return record
+    
+    def stat_paths(self, paths: List[str], follow_symlinks: bool = True) -> List[Dict[str, Any]]:
+        """Metadata records of many paths, in order, stat'ed in parallel on the fanout threads
+        
+        Each record has path, type ("file", "dir", "symlink" or "other"), size, mtime_ns
+        and mode, or path and error for paths that cannot be stat'ed.
+        """
+        def stat_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            return [self._stat_record(file_path, follow_symlinks) for file_path in chunk]
+        
+        chunks = [paths[i:i + FILES_INFO_CHUNK] for i in range(0, len(paths), FILES_INFO_CHUNK)]
+        if len(chunks) <= 1:
+            return stat_chunk(paths)
+        futures = [tool_executor.fanout(stat_chunk, chunk) for chunk in chunks]
+        return [record for future in futures for record in future.result()]
+    
     def list_directory(self, directory: str, show_hidden: bool = False, 
-                      include_size: bool = True) -> List[dict]:
-        """List contents of a directory"""
+                      include_size: bool = True, respect_gitignore: bool = False) -> List[dict]:
+        """List contents of a directory, optionally hiding paths git ignores"""
         try:
             path = validate_path(directory)
             
@@ -116,12 +248,19 @@ class FileService(ServiceBase):
             if not path.is_dir():
                 raise FileAccessError(f"'{directory}' is not a directory")
             
+            repo = find_repository(path) if respect_gitignore else None
+            repo_dir = repo.relative(path) if repo is not None else ""
+            
             items = []
             for item in path.iterdir():
                 if not show_hidden and item.name.startswith('.'):
                     continue
                 
                 try:
+                    if repo is not None:
+                        rel_path = f"{repo_dir}/{item.name}" if repo_dir else item.name
+                        if item.name == ".git" or not repo.is_candidate(rel_path, item.is_dir()):
+                            continue
                     stat = item.stat()
                     item_info = {
                         "name": item.name,
@@ -158,12 +297,14 @@ class FileService(ServiceBase):
             if not path.exists():
                 raise FileNotFoundError(f"File '{file_path}' does not exist")
             
-            if path.is_file():
-                path.unlink()
-            elif path.is_dir():
-                path.rmdir()  # Only empty directories
-            else:
-                raise FileAccessError(f"Cannot delete '{file_path}': unsupported file type")
+            with path_locks.write_lock(path):
+                if path.is_file():
+                    path.unlink()
+                elif path.is_dir():
+                    path.rmdir()  # Only empty directories
+                else:
+                    raise FileAccessError(f"Cannot delete '{file_path}': unsupported file type")
+            change_notifier.notify(path)
             
             return True
             
@@ -192,7 +333,13 @@ class FileService(ServiceBase):
             # Create destination directory if needed
             dst.parent.mkdir(parents=True, exist_ok=True)
             
-            shutil.copy2(src, dst)
+            with path_locks.lock_paths(read=[src], write=[dst]):
+                if src.is_file():
+                    from ..core.fastcopy import copy_file
+                    copy_file(src, dst)
+                else:
+                    shutil.copy2(src, dst)
+            change_notifier.notify(dst)
             return True
             
         except FileNotFoundError:
@@ -216,7 +363,9 @@ class FileService(ServiceBase):
             # Create destination directory if needed
             dst.parent.mkdir(parents=True, exist_ok=True)
             
-            shutil.move(src, dst)
+            with path_locks.write_lock(src, dst):
+                shutil.move(src, dst)
+            change_notifier.notify(src, dst)
             return True
             
         except FileNotFoundError:
@@ -226,6 +375,193 @@ class FileService(ServiceBase):
         except Exception as e:
             raise FileAccessError(f"Error moving file: {e}")
 
+    
+    def _transfer_targets(self, sources: List[str], destination: str) -> List[Tuple[str, Path, Path]]:
+        """(source as given, source, target) for each source, cp-style: into destination if it
+        is a directory or several sources are given, else onto it"""
+        dst = validate_path(destination)
+        into = len(sources) > 1 or dst.is_dir()
+        targets = []
+        for source in sources:
+            src = self._source_path(source)
+            targets.append((source, src, dst / src.name if into else dst))
+        return targets
+    
+    @staticmethod
+    def _source_path(source: str) -> Path:
+        """Absolute source path with only its parent resolved, so a symbolic link is moved or
+        copied as a link rather than what it points to"""
+        given = Path(source).expanduser()
+        if not given.name or given.name in (".", ".."):
+            return given.resolve()
+        return given.parent.resolve() / given.name
+    
+    @staticmethod
+    def _transfer_problem(source: str, src: Path, target: Path, overwrite: bool) -> Optional[str]:
+        if not (src.exists() or src.is_symlink()):
+            return f"Source '{source}' does not exist"
+        if target == src:
+            return f"Source and target are the same path '{src}'"
+        if src.is_dir() and not src.is_symlink() and src in target.parents:
+            return f"Cannot put directory '{src}' inside itself"
+        if (target.exists() or target.is_symlink()) and not overwrite:
+            return f"Target '{target}' already exists (pass overwrite=True to replace it)"
+        return None
+    
+    def _copy_plan(self, plan: "TreePlan", on_bytes: Callable[[int], None],
+                   errors: List[Dict[str, str]]) -> Tuple[int, int, Dict[str, int]]:
+        """Carry out a copy plan, files in parallel; returns (files, bytes, count per mechanism)"""
+        import shutil
+        from ..core.fastcopy import copy_file
+        
+        for _, target_dir in plan.dirs:
+            target_dir.mkdir(parents=True, exist_ok=True)
+        
+        def copy_one(src: Path, dst: Path) -> Tuple[int, str]:
+            with path_locks.lock_paths(read=[src], write=[dst]):
+                return copy_file(src, dst, on_bytes)
+        
+        futures = [(src, tool_executor.fanout(copy_one, src, dst)) for src, dst, _ in plan.files]
+        files = copied = 0
+        methods: Dict[str, int] = {}
+        for src, future in futures:
+            try:
+                size, method = future.result()
+            except OSError as e:
+                errors.append({"source": str(src), "error": str(e)})
+                continue
+            files += 1
+            copied += size
+            methods[method] = methods.get(method, 0) + 1
+        
+        for src, dst in plan.links:
+            try:
+                if dst.is_symlink() or dst.is_file():
+                    dst.unlink()
+                os.symlink(os.readlink(src), dst)
+            except OSError as e:
+                errors.append({"source": str(src), "error": str(e)})
+        # Children first, since creating entries changes a directory's mtime
+        for src_dir, target_dir in reversed(plan.dirs):
+            shutil.copystat(src_dir, target_dir)
+        return files, copied, methods
+    
+    def _progress_counter(self, total: int, progress: Optional[Callable[[int, int], None]]
+                          ) -> Callable[[int], None]:
+        done = 0
+        lock = threading.Lock()
+        
+        def on_bytes(count: int) -> None:
+            nonlocal done
+            with lock:
+                done += count
+                current = done
+            if progress is not None:
+                progress(current, total)
+        
+        return on_bytes
+    
+    def copy_paths(self, sources: List[str], destination: str, overwrite: bool = False,
+                   progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Copy files and directory trees, spreading files over the fanout threads
+        
+        progress, if given, is called with (bytes copied, total bytes) from worker threads.
+        """
+        from ..core.fastcopy import plan_tree
+        
+        started = time.perf_counter()
+        items: List[Dict[str, Any]] = []
+        errors: List[Dict[str, str]] = []
+        plans = []
+        for source, src, target in self._transfer_targets(sources, destination):
+            problem = self._transfer_problem(source, src, target, overwrite)
+            if problem:
+                errors.append({"source": source, "error": problem})
+                continue
+            try:
+                plans.append((source, target, plan_tree(src, target)))
+            except OSError as e:
+                errors.append({"source": source, "error": str(e)})
+        
+        on_bytes = self._progress_counter(sum(plan.total_bytes for _, _, plan in plans), progress)
+        methods: Dict[str, int] = {}
+        for source, target, plan in plans:
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                files, copied, used = self._copy_plan(plan, on_bytes, errors)
+            except OSError as e:
+                errors.append({"source": source, "error": str(e)})
+                continue
+            finally:
+                change_notifier.notify(target)
+            for method, count in used.items():
+                methods[method] = methods.get(method, 0) + count
+            items.append({"source": source, "target": str(target), "files": files, "bytes": copied})
+        
+        return self._transfer_summary(items, errors, methods, started)
+    
+    def move_paths(self, sources: List[str], destination: str, overwrite: bool = False,
+                   progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Move files and directory trees: a rename where possible, else a copy and delete"""
+        import shutil
+        from ..core.fastcopy import plan_tree
+        
+        started = time.perf_counter()
+        items: List[Dict[str, Any]] = []
+        errors: List[Dict[str, str]] = []
+        methods: Dict[str, int] = {}
+        for source, src, target in self._transfer_targets(sources, destination):
+            problem = self._transfer_problem(source, src, target, overwrite)
+            if problem:
+                errors.append({"source": source, "error": problem})
+                continue
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with path_locks.write_lock(src, target):
+                    os.replace(src, target)
+                methods["rename"] = methods.get("rename", 0) + 1
+                items.append({"source": source, "target": str(target), "method": "rename"})
+                change_notifier.notify(src, target)
+                continue
+            except OSError as e:
+                # Another filesystem, or a non-empty directory to merge into
+                if e.errno not in (errno.EXDEV, errno.ENOTEMPTY, errno.EEXIST):
+                    errors.append({"source": source, "error": str(e)})
+                    continue
+            
+            try:
+                plan = plan_tree(src, target)
+                failed = len(errors)
+                files, copied, used = self._copy_plan(
+                    plan, self._progress_counter(plan.total_bytes, progress), errors)
+                removed = len(errors) == failed
+                if removed:
+                    # Only a complete copy may take the place of the source
+                    with path_locks.write_lock(src):
+                        if src.is_dir() and not src.is_symlink():
+                            shutil.rmtree(src)
+                        else:
+                            src.unlink()
+            except OSError as e:
+                errors.append({"source": source, "error": str(e)})
+                continue
+            finally:
+                change_notifier.notify(src, target)
+            for method, count in used.items():
+                methods[method] = methods.get(method, 0) + count
+            items.append({"source": source, "target": str(target), "method": "copy",
+                          "files": files, "bytes": copied, "source_removed": removed})
+        
+        return self._transfer_summary(items, errors, methods, started)
+    
+    @staticmethod
+    def _transfer_summary(items: List[Dict[str, Any]], errors: List[Dict[str, str]],
+                          methods: Dict[str, int], started: float) -> Dict[str, Any]:
+        total_bytes = sum(item.get("bytes", 0) for item in items)
+        metrics.add("bytes_copied", total_bytes)
+        return {"items": items, "errors": errors, "bytes": total_bytes,
+                "files": sum(item.get("files", 0) for item in items), "methods": methods,
+                "elapsed_seconds": round(time.perf_counter() - started, 3)}
 
 # Global file service instance
 file_service = FileService()
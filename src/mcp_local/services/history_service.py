@@ -1,19 +1,26 @@
 """
 History service for tracking file edit operations
+
+The log is kept in memory, or in the shared store when one is configured so
+that every worker of a multi-process server sees the same history.
 """
 
 import datetime
+import threading
 from typing import Dict, List, Optional
 
 from ..core import ServiceBase, MAX_EDIT_HISTORY_ENTRIES
+from ..core.store import SharedStore, shared_store
 
 
 class HistoryService(ServiceBase):
     """Service for tracking and managing edit history"""
     
-    def __init__(self):
+    def __init__(self, store: SharedStore = shared_store):
+        self.store = store
         self.edit_history: List[Dict] = []
         self.max_entries = MAX_EDIT_HISTORY_ENTRIES
+        self._lock = threading.RLock()
         self.initialize()
     
     def initialize(self) -> None:
@@ -24,8 +31,9 @@ class HistoryService(ServiceBase):
     def cleanup(self) -> None:
         """Cleanup old history entries"""
         # Trim history to max entries
-        if len(self.edit_history) > self.max_entries:
-            self.edit_history = self.edit_history[-self.max_entries:]
+        with self._lock:
+            if len(self.edit_history) > self.max_entries:
+                self.edit_history = self.edit_history[-self.max_entries:]
     
     def log_edit(self, action: str, file_path: str, details: dict) -> None:
         """Log a file editing action"""
@@ -37,16 +45,31 @@ class HistoryService(ServiceBase):
             "details": details
         }
         
-        self.edit_history.append(log_entry)
+        if self.store.enabled:
+            self.store.append_history(log_entry, self.max_entries)
+            return
         
-        # Keep only last max_entries
-        if len(self.edit_history) > self.max_entries:
-            self.edit_history.pop(0)
+        with self._lock:
+            self.edit_history.append(log_entry)
+            
+            # Keep only last max_entries
+            if len(self.edit_history) > self.max_entries:
+                self.edit_history.pop(0)
+    
+    def _entries(self) -> List[Dict]:
+        """Snapshot of the whole log, oldest first"""
+        if self.store.enabled:
+            return self.store.history()
+        with self._lock:
+            return list(self.edit_history)
     
     def get_history(self, limit: Optional[int] = None, 
                    file_path: Optional[str] = None) -> List[Dict]:
         """Get edit history with optional filtering"""
-        history = self.edit_history
+        if self.store.enabled:
+            return self.store.history(limit, file_path)
+        
+        history = self._entries()
         
         # Filter by file path if specified
         if file_path:
@@ -67,8 +90,10 @@ class HistoryService(ServiceBase):
         recent_files = []
         seen_files = set()
         
+        history = self._entries()
+        
         # Go through history in reverse order (newest first)
-        for entry in reversed(self.edit_history):
+        for entry in reversed(history):
             file_path = entry['file']
             if file_path not in seen_files:
                 recent_files.append(file_path)
@@ -81,26 +106,32 @@ class HistoryService(ServiceBase):
     
     def clear_history(self) -> None:
         """Clear all edit history"""
-        self.edit_history.clear()
+        if self.store.enabled:
+            self.store.clear_history()
+        with self._lock:
+            self.edit_history.clear()
     
     def export_history(self) -> Dict:
         """Export history for backup/analysis"""
+        history = self._entries()
         return {
             "export_time": datetime.datetime.now().isoformat(),
-            "total_entries": len(self.edit_history),
-            "history": self.edit_history
+            "total_entries": len(history),
+            "history": history
         }
     
     def get_stats(self) -> Dict:
         """Get statistics about edit history"""
-        if not self.edit_history:
+        history = self._entries()
+        
+        if not history:
             return {"total_edits": 0}
         
         # Count actions
         action_counts = {}
         file_counts = {}
         
-        for entry in self.edit_history:
+        for entry in history:
             action = entry['action']
             file_path = entry['file']
             
@@ -111,10 +142,10 @@ class HistoryService(ServiceBase):
         most_edited = sorted(file_counts.items(), key=lambda x: x[1], reverse=True)[:5]
         
         return {
-            "total_edits": len(self.edit_history),
+            "total_edits": len(history),
             "action_counts": action_counts,
             "most_edited_files": most_edited,
-            "recent_activity": len([e for e in self.edit_history 
+            "recent_activity": len([e for e in history 
                                   if (datetime.datetime.now() - 
                                      datetime.datetime.fromisoformat(e['timestamp'])).days < 1])
         }
@@ -0,0 +1,244 @@
+"""
+Path index service backing fuzzy file lookup
+
+Each indexed root keeps the filtered listing of every directory below it, taken
+with the same walker rules as searches (hidden files, default excludes, git
+ignores), plus a FuzzyPathSet over all file paths. The index stays current
+incrementally: directories touched by this server's own writes are rescanned on
+the next query, and a throttled sweep of directory modification times picks up
+changes made by other processes. Added and removed paths are layered over the
+fuzzy set until there are enough of them to rebuild it.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ..core import ServiceBase
+from ..core.config import DEFAULT_EXCLUDE_PATTERNS, PATH_INDEX_MAX_ROOTS, PATH_INDEX_POLL_INTERVAL
+from ..core.events import change_notifier
+from ..core.fuzzy import SCORE_LIMIT, FuzzyMatch, FuzzyPathSet, rank
+from ..core.walk import TreeWalker, create_walker
+
+# Pending changes layered over the fuzzy set before it is rebuilt
+COMPACT_MIN_CHANGES = 1024
+
+
+class _DirEntry(NamedTuple):
+    mtime_ns: int
+    files: List[str]
+    subdirs: List[str]
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+class PathIndex:
+    """Candidate file paths below one root, kept current incrementally"""
+
+    def __init__(self, root: Path, walker: TreeWalker):
+        self.root = root
+        self.walker = walker
+        self._dirs: Dict[str, _DirEntry] = {}
+        self._base = FuzzyPathSet(())
+        self._added: Dict[str, None] = {}
+        self._removed: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._built = False
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._added)
+
+    def paths(self) -> List[str]:
+        """All indexed file paths, relative to the root"""
+        with self._lock:
+            return self._all_paths()
+
+    def mark_changed(self, path: Path) -> None:
+        """Note that a path below the root was created, modified or removed"""
+        try:
+            rel = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        rel = "" if rel == "." else rel
+        with self._lock:
+            self._dirty.add(rel.rpartition("/")[0])
+            if rel in self._dirs:
+                self._dirty.add(rel)
+
+    def refresh(self, poll_interval: float = PATH_INDEX_POLL_INTERVAL) -> None:
+        """Build the index on first use, then apply pending and detected changes"""
+        with self._lock:
+            now = time.monotonic()
+            if not self._built:
+                self._base = FuzzyPathSet(self._scan_tree(""))
+                self._built = True
+                self._last_sweep = now
+                self._dirty.clear()
+                return
+
+            dirty, self._dirty = self._dirty, set()
+            if now - self._last_sweep >= poll_interval:
+                self._last_sweep = now
+                for rel_dir, entry in self._dirs.items():
+                    try:
+                        if os.stat(self.root / rel_dir).st_mtime_ns != entry.mtime_ns:
+                            dirty.add(rel_dir)
+                    except OSError:
+                        dirty.add(rel_dir)
+
+            # Parents first, so a removed subtree is purged before its children are visited
+            for rel_dir in sorted(dirty, key=lambda d: (d.count("/"), d)):
+                self._rescan(rel_dir)
+
+            if len(self._added) + len(self._removed) > max(COMPACT_MIN_CHANGES, len(self._base) // 50):
+                self._base = FuzzyPathSet(self._all_paths())
+                self._added.clear()
+                self._removed.clear()
+
+    def search(self, query: str, limit: int) -> List[FuzzyMatch]:
+        """Best matches for a fuzzy query"""
+        with self._lock:
+            base, added, removed = self._base, list(self._added), set(self._removed)
+        candidates = [path for path in base.candidates(query, SCORE_LIMIT + len(removed))
+                      if path not in removed]
+        candidates.extend(added)
+        return rank(query, candidates, limit)
+
+    def _all_paths(self) -> List[str]:
+        return [_join(rel_dir, name) for rel_dir, entry in self._dirs.items() for name in entry.files]
+
+    def _scan(self, rel_dir: str) -> Optional[_DirEntry]:
+        try:
+            mtime_ns = os.stat(self.root / rel_dir).st_mtime_ns
+        except OSError:
+            return None
+        files, subdirs = self.walker.list_dir(rel_dir)
+        entry = _DirEntry(mtime_ns, files, subdirs)
+        self._dirs[rel_dir] = entry
+        return entry
+
+    def _scan_tree(self, rel_dir: str) -> List[str]:
+        """Index a directory and everything below it; returns the file paths found"""
+        found: List[str] = []
+        queue = deque([rel_dir])
+        while queue:
+            current = queue.popleft()
+            entry = self._scan(current)
+            if entry is None:
+                continue
+            found.extend(_join(current, name) for name in entry.files)
+            queue.extend(_join(current, name) for name in entry.subdirs)
+        return found
+
+    def _purge_tree(self, rel_dir: str) -> List[str]:
+        """Drop a directory and everything below it; returns the file paths dropped"""
+        dropped: List[str] = []
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            entry = self._dirs.pop(current, None)
+            if entry is None:
+                continue
+            dropped.extend(_join(current, name) for name in entry.files)
+            stack.extend(_join(current, name) for name in entry.subdirs)
+        return dropped
+
+    def _add(self, paths: List[str]) -> None:
+        for path in paths:
+            if path in self._removed:
+                self._removed.discard(path)
+            else:
+                self._added[path] = None
+
+    def _forget(self, paths: List[str]) -> None:
+        for path in paths:
+            if path in self._added:
+                del self._added[path]
+            else:
+                self._removed.add(path)
+
+    def _rescan(self, rel_dir: str) -> None:
+        # Changes inside directories not indexed yet show up in the nearest indexed ancestor
+        while rel_dir not in self._dirs:
+            if not rel_dir:
+                self._add(self._scan_tree(""))
+                return
+            rel_dir = rel_dir.rpartition("/")[0]
+
+        old = self._dirs[rel_dir]
+        new = self._scan(rel_dir)
+        if new is None:
+            self._forget(self._purge_tree(rel_dir))
+            if rel_dir:
+                self._rescan(rel_dir.rpartition("/")[0])
+            return
+
+        old_files, new_files = set(old.files), set(new.files)
+        self._forget([_join(rel_dir, name) for name in old_files - new_files])
+        self._add([_join(rel_dir, name) for name in new_files - old_files])
+        old_dirs, new_dirs = set(old.subdirs), set(new.subdirs)
+        for name in old_dirs - new_dirs:
+            self._forget(self._purge_tree(_join(rel_dir, name)))
+        for name in sorted(new_dirs - old_dirs):
+            self._add(self._scan_tree(_join(rel_dir, name)))
+
+
+class PathIndexService(ServiceBase):
+    """Service keeping fuzzy-searchable path indexes for recently used roots"""
+
+    def __init__(self):
+        self.max_roots = PATH_INDEX_MAX_ROOTS
+        self._indexes: "OrderedDict[Tuple[str, bool, bool], PathIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        self.initialize()
+
+    def initialize(self) -> None:
+        """Start listening for changes made through the file services"""
+        if self._unsubscribe is None:
+            self._unsubscribe = change_notifier.subscribe(self._on_change)
+
+    def cleanup(self) -> None:
+        """Drop all indexes"""
+        with self._lock:
+            self._indexes.clear()
+
+    def get_index(self, root: Path, respect_gitignore: bool = True,
+                  show_hidden: bool = False) -> PathIndex:
+        """Up-to-date index for a directory, built on first use"""
+        key = (str(root), respect_gitignore, show_hidden)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                walker = create_walker(root, respect_gitignore, show_hidden=show_hidden,
+                                       exclude_patterns=DEFAULT_EXCLUDE_PATTERNS)
+                index = PathIndex(root, walker)
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_roots:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(key)
+        index.refresh()
+        return index
+
+    def find(self, query: str, root: Path, limit: int = 50, respect_gitignore: bool = True,
+             show_hidden: bool = False) -> Tuple[List[FuzzyMatch], int]:
+        """Ranked fuzzy matches below root and the number of paths indexed there"""
+        index = self.get_index(root, respect_gitignore, show_hidden)
+        return index.search(query, limit), len(index)
+
+    def _on_change(self, path: Path) -> None:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.mark_changed(path)
+
+
+# Global path index service instance
+path_index_service = PathIndexService()
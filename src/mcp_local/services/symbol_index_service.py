@@ -0,0 +1,340 @@
+"""
+Symbol index service backing find_symbol
+
+For each root, the definitions of every source file (as listed by the path
+index) are extracted once and kept with the file's mtime and size. Extraction
+runs on a background thread that hands batches of files to a process pool, so a
+first query on a large tree only waits as long as it chooses to and then answers
+from what has been indexed so far. Afterwards only files reported changed by this
+server, or found changed by a throttled stat sweep, are extracted again.
+
+With a shared store configured, extracted definitions are also saved there and
+files whose mtime and size match a stored entry are taken from it, so the
+workers of a multi-process server parse each file once between them.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from ..core import ServiceBase
+from ..core.config import (
+    MAX_FILE_SIZE,
+    PATH_INDEX_MAX_ROOTS,
+    PATH_INDEX_POLL_INTERVAL,
+    SYMBOL_INDEX_BATCH_SIZE,
+    SYMBOL_INDEX_WORKERS,
+)
+from ..core.events import change_notifier
+from ..core.store import SharedStore, shared_store
+from ..core.symbols import extract_file_symbols, language_for
+from ..models.file_models import Symbol
+from .path_index_service import path_index_service
+
+if TYPE_CHECKING:  # multiprocessing is slow to import; the pool is created on first use
+    from concurrent.futures import ProcessPoolExecutor
+
+_FileEntry = Tuple[int, int, List[Symbol]]  # (mtime_ns, size, symbols)
+
+# Tie-breaks between equally good matches: definitions of types first
+_KIND_ORDER = {"class": 0, "interface": 0, "struct": 0, "enum": 0, "type": 0, "namespace": 0,
+               "function": 1, "method": 2}
+
+
+def _encode_symbols(symbols: List[Symbol]) -> str:
+    return json.dumps([[symbol.name, symbol.kind, symbol.file_path, symbol.line_number, symbol.column,
+                        symbol.container, symbol.signature] for symbol in symbols])
+
+
+def _decode_symbols(data: str) -> List[Symbol]:
+    return [Symbol(*fields) for fields in json.loads(data)]
+
+
+def _extract_batch(root: str, rel_paths: List[str]) -> List[Tuple[str, Optional[_FileEntry]]]:
+    """Stat and extract a batch of files; runs in worker processes"""
+    results: List[Tuple[str, Optional[_FileEntry]]] = []
+    for rel_path in rel_paths:
+        path = os.path.join(root, rel_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            results.append((rel_path, None))
+            continue
+        # Oversized files are usually generated or minified; keep them without symbols
+        symbols = extract_file_symbols(path, rel_path) if stat.st_size <= MAX_FILE_SIZE else None
+        results.append((rel_path, (stat.st_mtime_ns, stat.st_size, symbols or [])))
+    return results
+
+
+class SymbolIndex:
+    """Definitions of the source files below one root, refreshed in the background"""
+
+    def __init__(self, root: Path, list_paths: Callable[[], List[str]],
+                 pool: Callable[[], Optional["ProcessPoolExecutor"]],
+                 store: SharedStore = shared_store):
+        self.root = root
+        self._list_paths = list_paths
+        self._pool = pool
+        self._store = store
+        self._files: Dict[str, _FileEntry] = {}
+        self._pending = 0
+        self._dirty: Set[str] = set()
+        self._by_name: Optional[Dict[str, List[Symbol]]] = None
+        self._built = False
+        self._last_sweep = 0.0
+        self._worker: Optional[threading.Thread] = None
+        self._idle = threading.Event()
+        self._idle.set()
+        self._lock = threading.Lock()
+
+    @property
+    def indexing(self) -> bool:
+        """Whether an update is running"""
+        return not self._idle.is_set()
+
+    def progress(self) -> Tuple[int, int]:
+        """Files indexed and files still waiting for extraction"""
+        with self._lock:
+            return len(self._files), self._pending
+
+    def mark_changed(self, path: Path) -> None:
+        """Note that a file below the root was modified, created or removed"""
+        try:
+            rel_path = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            self._dirty.add(rel_path)
+
+    def refresh(self, poll_interval: float = PATH_INDEX_POLL_INTERVAL) -> None:
+        """Start a background update if changes are pending or a sweep is due"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            now = time.monotonic()
+            # A changed directory (moved or removed) can affect any file below it
+            sweep = (not self._built or now - self._last_sweep >= poll_interval
+                     or any(language_for(path) is None for path in self._dirty))
+            if not sweep and not self._dirty:
+                return
+            if sweep:
+                self._last_sweep = now
+            dirty, self._dirty = self._dirty, set()
+            self._idle.clear()
+            self._worker = threading.Thread(target=self._update, args=(sweep, dirty),
+                                            name="mcp-symbol-index", daemon=True)
+            self._worker.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the running update finishes; False on timeout"""
+        return self._idle.wait(timeout)
+
+    def lookup(self, query: str, kind: Optional[str] = None, exact: bool = False,
+               limit: int = 50) -> List[Symbol]:
+        """Symbols whose name (or qualified name, for dotted queries) matches the query"""
+        by_name = self._names()
+        wanted = query.lower()
+        dotted = "." in wanted
+        last = wanted.rsplit(".", 1)[-1]
+
+        if exact:
+            names = [last] if last in by_name else []
+        else:
+            names = [name for name in by_name if last in name]
+
+        ranked = []
+        for name in names:
+            for symbol in by_name[name]:
+                if kind and symbol.kind != kind:
+                    continue
+                if dotted:
+                    qualified = symbol.qualified_name.lower()
+                    if not (qualified.endswith(wanted) if exact else wanted in qualified):
+                        continue
+                if symbol.name == query or symbol.qualified_name == query:
+                    tier = 0
+                elif name == last:
+                    tier = 1
+                elif name.startswith(last):
+                    tier = 2
+                else:
+                    tier = 3
+                ranked.append(((tier, len(name), _KIND_ORDER.get(symbol.kind, 3),
+                                symbol.file_path, symbol.line_number), symbol))
+        ranked.sort(key=lambda item: item[0])
+        return [symbol for _, symbol in ranked[:limit]]
+
+    def _names(self) -> Dict[str, List[Symbol]]:
+        with self._lock:
+            if self._by_name is None:
+                by_name: Dict[str, List[Symbol]] = {}
+                for _, _, symbols in self._files.values():
+                    for symbol in symbols:
+                        by_name.setdefault(symbol.name.lower(), []).append(symbol)
+                self._by_name = by_name
+            return self._by_name
+
+    def _update(self, sweep: bool, dirty: Set[str]) -> None:
+        try:
+            if sweep:
+                stale = self._sweep()
+            else:
+                stale = sorted(dirty)
+            self._extract(stale)
+            with self._lock:
+                self._built = True
+        finally:
+            self._idle.set()
+
+    def _sweep(self) -> List[str]:
+        """Reconcile with the current file list; returns files needing extraction"""
+        current = [path for path in self._list_paths() if language_for(path)]
+        with self._lock:
+            known = dict(self._files)
+        stale = []
+        for rel_path in current:
+            entry = known.pop(rel_path, None)
+            if entry is not None:
+                try:
+                    stat = os.stat(self.root / rel_path)
+                except OSError:
+                    stale.append(rel_path)
+                    continue
+                if (stat.st_mtime_ns, stat.st_size) == entry[:2]:
+                    continue
+            stale.append(rel_path)
+        if known:
+            with self._lock:
+                for rel_path in known:
+                    self._files.pop(rel_path, None)
+                self._by_name = None
+        return stale
+
+    def _reuse_stored(self, stale: List[str]) -> List[str]:
+        """Take definitions another worker stored for unchanged files; returns the rest"""
+        stored = self._store.load_symbols(str(self.root), stale)
+        if not stored:
+            return stale
+        remaining = []
+        reused: Dict[str, _FileEntry] = {}
+        for rel_path in stale:
+            record = stored.get(rel_path)
+            if record is not None:
+                try:
+                    stat = os.stat(self.root / rel_path)
+                except OSError:
+                    stat = None
+                if stat is not None and (stat.st_mtime_ns, stat.st_size) == record[:2]:
+                    reused[rel_path] = (record[0], record[1], _decode_symbols(record[2]))
+                    continue
+            remaining.append(rel_path)
+        with self._lock:
+            self._files.update(reused)
+            self._by_name = None
+        return remaining
+
+    def _extract(self, stale: List[str]) -> None:
+        if stale and self._store.enabled:
+            stale = self._reuse_stored(stale)
+        if not stale:
+            return
+        batches = [stale[i:i + SYMBOL_INDEX_BATCH_SIZE]
+                   for i in range(0, len(stale), SYMBOL_INDEX_BATCH_SIZE)]
+        with self._lock:
+            self._pending = len(stale)
+        root = str(self.root)
+        pool = self._pool()
+        if pool is None:
+            results = (_extract_batch(root, batch) for batch in batches)
+        else:
+            futures = [pool.submit(_extract_batch, root, batch) for batch in batches]
+            results = (future.result() for future in as_completed(futures))
+        try:
+            for batch in results:
+                # Results become visible batch by batch while the rest is extracted
+                with self._lock:
+                    for rel_path, entry in batch:
+                        if entry is None:
+                            self._files.pop(rel_path, None)
+                        else:
+                            self._files[rel_path] = entry
+                    self._pending -= len(batch)
+                    self._by_name = None
+                if self._store.enabled:
+                    self._store.save_symbols(root, [(rel_path, entry[0], entry[1], _encode_symbols(entry[2]))
+                                                    for rel_path, entry in batch if entry is not None])
+        finally:
+            with self._lock:
+                self._pending = 0
+
+
+class SymbolIndexService(ServiceBase):
+    """Service keeping symbol indexes for recently used roots"""
+
+    def __init__(self, workers: int = SYMBOL_INDEX_WORKERS):
+        self.workers = max(0, workers)
+        self.max_roots = PATH_INDEX_MAX_ROOTS
+        self._indexes: "OrderedDict[Tuple[str, bool], SymbolIndex]" = OrderedDict()
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        self.initialize()
+
+    def initialize(self) -> None:
+        """Start listening for changes made through the file services"""
+        if self._unsubscribe is None:
+            self._unsubscribe = change_notifier.subscribe(self._on_change)
+
+    def cleanup(self) -> None:
+        """Drop all indexes and stop the worker processes"""
+        with self._lock:
+            self._indexes.clear()
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            if sys.version_info >= (3, 9):
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:  # No cancel_futures before 3.9; queued extractions finish on their own
+                pool.shutdown(wait=False)
+
+    def get_index(self, root: Path, respect_gitignore: bool = True) -> SymbolIndex:
+        """Index for a directory, with a background update started if one is due"""
+        key = (str(root), respect_gitignore)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = SymbolIndex(
+                    root,
+                    lambda: path_index_service.get_index(root, respect_gitignore).paths(),
+                    self._get_pool,
+                )
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_roots:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(key)
+        index.refresh()
+        return index
+
+    def _get_pool(self) -> Optional["ProcessPoolExecutor"]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _on_change(self, path: Path) -> None:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.mark_changed(path)
+
+
+# Global symbol index service instance
+symbol_index_service = SymbolIndexService()
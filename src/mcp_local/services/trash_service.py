@@ -0,0 +1,327 @@
+"""
+Trash service for recursive deletes that return at once and can be undone
+
+delete() moves the target into a staging directory on the same filesystem with
+one rename, so it is gone from the caller's view immediately whatever its size.
+It waits there for the undo window, during which restore() renames it back, and
+is then purged by a background thread that walks it with scandir and removes
+entries relative to open directory descriptors, never resolving a full path.
+
+Staging directories hold ``<id>`` (the deleted file or tree) and ``<id>.path``
+(its original location), where the id starts with the purge deadline. Any
+process can therefore restore or purge an entry, and entries left behind by a
+stopped server are purged by the next one that uses the directory.
+"""
+
+import errno
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core import ServiceBase
+from ..core.config import TRASH_DIR, TRASH_UNDO_SECONDS
+from ..core.events import change_notifier
+from ..core.exceptions import FileAccessError, FileNotFoundError
+from ..core.locks import path_locks
+from ..models.file_models import TrashEntry
+
+# Staging directory created next to a target on another filesystem than TRASH_DIR
+STAGING_NAME = ".mcp_local_trash"
+
+_PATH_SUFFIX = ".path"
+_PURGING_SUFFIX = ".purging"
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_NOFOLLOW", 0)
+
+
+def _open_dir(name: str, dir_fd: Optional[int] = None) -> int:
+    fd = os.open(name, _DIR_FLAGS, dir_fd=dir_fd)
+    try:
+        mode = os.fstat(fd).st_mode
+        if not mode & stat.S_IWUSR:  # Read-only directories would refuse the unlinks
+            os.fchmod(fd, stat.S_IMODE(mode) | stat.S_IRWXU)
+    except OSError:
+        pass
+    return fd
+
+
+def _clear(fd: int) -> Tuple[List[str], int]:
+    """Unlink everything but subdirectories in an open directory; returns (subdirectories, entries removed)"""
+    subdirs = []
+    removed = 0
+    with os.scandir(fd) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            else:
+                os.unlink(entry.name, dir_fd=fd)
+                removed += 1
+    return subdirs, removed
+
+
+def purge_tree(path: Path) -> int:
+    """Remove a file, link or directory tree without following links; returns entries removed"""
+    if path.is_symlink() or not path.is_dir():
+        path.unlink()
+        return 1
+    if not (os.unlink in os.supports_dir_fd and os.scandir in os.supports_fd):
+        import shutil
+
+        shutil.rmtree(path)
+        return 1
+
+    parent_fd = os.open(path.parent, _DIR_FLAGS)
+    stack: List[Tuple[int, List[str], str, int]] = []  # (fd, subdirectories left, name, parent fd)
+    removed = 0
+    try:
+        fd = _open_dir(path.name, parent_fd)
+        stack.append((fd, [], path.name, parent_fd))
+        subdirs, removed = _clear(fd)
+        stack[-1][1].extend(subdirs)
+        # Depth first, holding one descriptor per level rather than one per directory
+        while stack:
+            fd, subdirs, name, parent = stack[-1]
+            if subdirs:
+                child_name = subdirs.pop()
+                child = _open_dir(child_name, fd)
+                stack.append((child, [], child_name, fd))
+                child_subdirs, count = _clear(child)
+                stack[-1][1].extend(child_subdirs)
+                removed += count
+                continue
+            stack.pop()
+            os.close(fd)
+            os.rmdir(name, dir_fd=parent)
+            removed += 1
+    finally:
+        for fd, _, _, _ in stack:
+            os.close(fd)
+        os.close(parent_fd)
+    return removed
+
+
+class TrashService(ServiceBase):
+    """Service staging deleted files and trees for undo and purging them in the background"""
+
+    def __init__(self, trash_dir: Path = TRASH_DIR, undo_seconds: float = TRASH_UNDO_SECONDS):
+        self.trash_dir = trash_dir
+        self.undo_seconds = undo_seconds
+        self._staging_dirs: Set[Path] = set()
+        self._sequence = 0
+        self._purger: Optional[threading.Thread] = None
+        self._wakeup = threading.Condition()
+        self._rescan = False
+        self._purged = 0
+
+    def initialize(self) -> None:
+        """Nothing to prepare; staging directories are created on the first delete"""
+        pass
+
+    def cleanup(self) -> None:
+        """Purge staged entries whose undo window has passed"""
+        self.purge_due()
+
+    def _staging_dir(self, path: Path) -> Path:
+        """A staging directory on the same filesystem as path"""
+        device = os.lstat(path).st_dev
+        for candidate in (self.trash_dir, path.parent / STAGING_NAME):
+            try:
+                candidate.mkdir(mode=0o700, exist_ok=True)
+                if os.stat(candidate).st_dev == device:
+                    with self._wakeup:
+                        self._staging_dirs.add(candidate)
+                    return candidate
+            except OSError:
+                continue
+        raise FileAccessError(f"No staging directory on the filesystem of '{path}'")
+
+    def _known_dirs(self) -> List[Path]:
+        with self._wakeup:
+            return sorted({self.trash_dir, *self._staging_dirs})
+
+    def _next_id(self, purge_at: float) -> str:
+        with self._wakeup:
+            self._sequence += 1
+            sequence = self._sequence
+        return f"{int(purge_at * 1000)}-{os.getpid()}-{sequence}"
+
+    def _protected(self, path: Path) -> bool:
+        """Whether path is the trash, holds it or is staged; staged entries go through restore()"""
+        return (path == self.trash_dir or path in self.trash_dir.parents or path.name == STAGING_NAME
+                or any(staging in path.parents for staging in self._known_dirs()))
+
+    def delete(self, file_path: str, recursive: bool = False) -> TrashEntry:
+        """Stage a file or tree for deletion with one rename; it is purged after the undo window"""
+        # Resolve the parent only, so a symbolic link is deleted rather than what it points to
+        given = Path(file_path).expanduser()
+        path = given.parent.resolve() / given.name
+        if not given.name or given.name in (".", ".."):
+            path = given.resolve()
+
+        if not (path.exists() or path.is_symlink()):
+            raise FileNotFoundError(f"'{file_path}' does not exist")
+        if path.parent == path or self._protected(path):
+            raise FileAccessError(f"Refusing to delete '{file_path}'")
+        if path.is_dir() and not path.is_symlink() and not recursive and any(path.iterdir()):
+            raise FileAccessError(f"Cannot delete non-empty directory '{file_path}' without recursive=True")
+
+        try:
+            staging = self._staging_dir(path)
+            purge_at = time.time() + self.undo_seconds
+            deletion_id = self._next_id(purge_at)
+            staged = staging / deletion_id
+            # The origin is written first, so a crash in between leaves nothing unaccounted for
+            (staging / (deletion_id + _PATH_SUFFIX)).write_text(str(path), encoding="utf-8")
+            with path_locks.write_lock(path):
+                try:
+                    os.rename(path, staged)
+                except OSError:
+                    (staging / (deletion_id + _PATH_SUFFIX)).unlink()
+                    raise
+        except PermissionError:
+            raise FileAccessError(f"Permission denied deleting '{file_path}'")
+        except OSError as e:
+            raise FileAccessError(f"Error deleting '{file_path}': {e}")
+
+        change_notifier.notify(path)
+        self._schedule()
+        return TrashEntry(deletion_id, str(path), staged, purge_at)
+
+    def _find(self, deletion_id: str) -> Optional[TrashEntry]:
+        for entry in self.pending():
+            if entry.deletion_id == deletion_id:
+                return entry
+        return None
+
+    def restore(self, deletion_id: str) -> TrashEntry:
+        """Put a staged entry back where it was deleted from, if it has not been purged yet"""
+        entry = self._find(deletion_id)
+        if entry is None:
+            raise FileNotFoundError(f"No deleted entry '{deletion_id}' is waiting for purge")
+        original = Path(entry.original_path)
+        if original.exists() or original.is_symlink():
+            raise FileAccessError(f"Cannot restore '{deletion_id}': '{original}' exists again")
+
+        try:
+            original.parent.mkdir(parents=True, exist_ok=True)
+            with path_locks.write_lock(original):
+                os.rename(entry.staged_path, original)
+        except OSError as e:
+            if not entry.staged_path.exists():
+                raise FileNotFoundError(f"Deleted entry '{deletion_id}' was purged")
+            raise FileAccessError(f"Error restoring '{deletion_id}': {e}")
+
+        try:
+            (entry.staged_path.parent / (deletion_id + _PATH_SUFFIX)).unlink()
+        except OSError:
+            pass
+        change_notifier.notify(original)
+        return entry
+
+    def pending(self) -> List[TrashEntry]:
+        """Staged entries not purged yet, across the known staging directories, oldest first"""
+        entries = []
+        for staging in self._known_dirs():
+            try:
+                names = os.listdir(staging)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(_PATH_SUFFIX):
+                    continue
+                deletion_id = name[:-len(_PATH_SUFFIX)]
+                staged = staging / deletion_id
+                try:
+                    original = (staging / name).read_text(encoding="utf-8")
+                    purge_at = int(deletion_id.split("-", 1)[0]) / 1000
+                except (OSError, ValueError):
+                    continue
+                if staged.exists() or staged.is_symlink():
+                    entries.append(TrashEntry(deletion_id, original, staged, purge_at))
+        entries.sort(key=lambda entry: entry.purge_at)
+        return entries
+
+    def purge_due(self, now: Optional[float] = None) -> int:
+        """Purge the staged entries whose undo window has passed; returns entries purged"""
+        now = time.time() if now is None else now
+        purged = 0
+        for staging in self._known_dirs():
+            try:
+                names = os.listdir(staging)
+            except OSError:
+                continue
+            for name in names:
+                deletion_id = name.split(".", 1)[0]
+                try:
+                    due = int(deletion_id.split("-", 1)[0]) / 1000 <= now
+                except ValueError:
+                    continue
+                if due and self._purge_one(staging, name):
+                    purged += 1
+            if staging.name == STAGING_NAME:
+                try:
+                    staging.rmdir()  # Only once empty; local staging directories are not kept
+                    with self._wakeup:
+                        self._staging_dirs.discard(staging)
+                except OSError:
+                    pass
+        self._purged += purged
+        return purged
+
+    def _purge_one(self, staging: Path, name: str) -> bool:
+        """Purge one entry, claiming it by rename so concurrent purgers and restores skip it"""
+        if name.endswith(_PATH_SUFFIX):
+            if (staging / name[:-len(_PATH_SUFFIX)]).exists():
+                return False  # Removed along with its entry
+            claimed = staging / name
+        elif name.endswith(_PURGING_SUFFIX):
+            claimed = staging / name  # Left over from an interrupted purge
+        else:
+            claimed = staging / (name + _PURGING_SUFFIX)
+            try:
+                os.rename(staging / name, claimed)
+            except OSError:
+                return False
+            try:
+                (staging / (name + _PATH_SUFFIX)).unlink()
+            except OSError:
+                pass
+        try:
+            purge_tree(claimed)
+        except OSError as e:
+            if e.errno != errno.ENOENT:  # Else another process purged it first
+                return False
+        return not name.endswith(_PATH_SUFFIX)
+
+    def _schedule(self) -> None:
+        """Start the purge thread if needed and have it look at the new deadlines"""
+        with self._wakeup:
+            self._rescan = True
+            if self._purger is None:
+                self._purger = threading.Thread(target=self._purge_loop, name="mcp-trash-purge", daemon=True)
+                self._purger.start()
+            self._wakeup.notify()
+
+    def _purge_loop(self) -> None:
+        while True:
+            self.purge_due()
+            entries = self.pending()
+            with self._wakeup:
+                if self._rescan:
+                    self._rescan = False
+                    continue
+                if not entries:
+                    self._purger = None
+                    return
+                self._wakeup.wait(max(0.0, entries[0].purge_at - time.time()) + 0.01)
+
+    def stats(self) -> Dict[str, int]:
+        """Entries waiting for purge and entries purged by this process"""
+        return {"pending": len(self.pending()), "purged": self._purged}
+
+
+# Global trash service instance
+trash_service = TrashService()
@@ -7,9 +7,13 @@ This module contains all the MCP tools organized by functionality.
 from .file_operations import register_file_operations
 from .file_editing import register_file_editing_tools
 from .search_tools import register_search_tools
+from .navigation_tools import register_navigation_tools
+from .server_tools import register_server_tools
 
 __all__ = [
     "register_file_operations",
-    "register_file_editing_tools"
-    "register_search_tools"
+    "register_file_editing_tools",
+    "register_search_tools",
+    "register_navigation_tools",
+    "register_server_tools"
 ]
@@ -2,69 +2,80 @@
 Advanced file editing tools
 """
 
+import asyncio
 import re
-import difflib
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
 
 from ..core import FileOperationBase
+from ..core.diff import unified_diff
+from ..core.executor import tool_executor
+from ..core.locks import path_locks
+from ..core.lines import LineIndex
+from ..core.patterns import pattern_cache
 from ..services import file_service, backup_service, history_service
 
 
+def _as_line_block(content: str) -> str:
+    """Terminate replacement content with a newline so it forms whole lines"""
+    if content and not content.endswith('\n'):
+        return content + '\n'
+    return content
+
+
 class EditFileLinesTool(FileOperationBase):
     """Tool for editing specific lines in a file"""
     
     def __init__(self):
         super().__init__("edit_file_lines", "Replace specific lines in a file with new content")
     
-    def execute(self, file_path: str, start_line: int, new_content: str, end_line: Optional[int] = None) -> str:
+    def execute(self, file_path: str, start_line: int, new_content: str, end_line: Optional[int] = None,
+                expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None) -> str:
         try:
             path = self.validate_file_path(file_path)
-            if not path.exists():
-                return f"File '{file_path}' does not exist"
-            
-            # Create backup
-            backup_path = backup_service.create_backup(str(path))
-            
-            # Read current content
-            content = file_service.read_file(file_path)
-            lines = content.splitlines(keepends=True)
-            
-            total_lines = len(lines)
-            start_idx = start_line - 1
-            end_idx = end_line if end_line else start_line
-            
-            if start_idx < 0 or start_idx >= total_lines:
-                return f"Invalid line number {start_line}. File has {total_lines} lines"
-            
-            # Store original content for logging
-            original_lines = lines[start_idx:end_idx]
-            
-            # Replace lines
-            new_lines = new_content.splitlines(keepends=True)
-            if new_content and not new_content.endswith('\n'):
-                if new_lines:
-                    new_lines[-1] += '\n'
-            
-            lines[start_idx:end_idx] = new_lines
-            
-            # Write back to file
-            new_file_content = ''.join(lines)
-            file_service.write_file(file_path, new_file_content)
-            
-            # Log the edit
-            history_service.log_edit("edit_lines", str(path), {
-                "start_line": start_line,
-                "end_line": end_line,
-                "original_lines": [line.rstrip() for line in original_lines],
-                "new_lines": [line.rstrip() for line in new_lines],
-                "backup": backup_path
-            })
-            
-            return f"Successfully edited lines {start_line}-{end_line or start_line} in '{path}'"
-            
+            with path_locks.write_lock(path):
+                if not path.exists():
+                    return f"File '{file_path}' does not exist"
+                
+                # Read current content, rejecting a stale expected version
+                content, _ = file_service.read_for_edit(file_path, expected_hash, expected_mtime)
+                index = LineIndex(content)
+                
+                total_lines = len(index)
+                start_idx = start_line - 1
+                end_idx = end_line if end_line else start_line
+                
+                if start_idx < 0 or start_idx >= total_lines:
+                    return f"Invalid line number {start_line}. File has {total_lines} lines"
+                
+                # Store original content for logging
+                original_lines = index.lines(start_idx, end_idx)
+                
+                # Splice the new block in by character offset
+                block = _as_line_block(new_content)
+                begin, finish = index.span(start_idx, end_idx)
+                
+                # Create backup
+                backup_path = backup_service.create_backup(str(path))
+                
+                # Write back to file
+                new_file_content = content[:begin] + block + content[finish:]
+                version = file_service.write_file_versioned(file_path, new_file_content)
+                
+                # Log the edit
+                history_service.log_edit("edit_lines", str(path), {
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "original_lines": [line.rstrip() for line in original_lines],
+                    "new_lines": [line.rstrip() for line in block.splitlines()],
+                    "backup": backup_path
+                })
+                
+                return (f"Successfully edited lines {start_line}-{end_line or start_line} in '{path}'\n"
+                        f"Version: {version.describe()}")
+                
         except Exception as e:
             return f"Error editing file lines: {str(e)}"
 
@@ -75,40 +86,42 @@ class InsertLinesTool(FileOperationBase):
     def __init__(self):
         super().__init__("insert_lines", "Insert new lines at a specific position in the file")
     
-    def execute(self, file_path: str, line_number: int, content: str) -> str:
+    def execute(self, file_path: str, line_number: int, content: str,
+                expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None) -> str:
         try:
             path = self.validate_file_path(file_path)
-            if not path.exists():
-                return f"File '{file_path}' does not exist"
-            
-            backup_path = backup_service.create_backup(str(path))
-            
-            # Read current content
-            file_content = file_service.read_file(file_path)
-            lines = file_content.splitlines(keepends=True)
-            
-            insert_idx = max(0, min(line_number - 1, len(lines)))
-            new_lines = content.splitlines(keepends=True)
-            
-            # Ensure proper line endings
-            if content and not content.endswith('\n'):
-                if new_lines:
-                    new_lines[-1] += '\n'
-            
-            lines[insert_idx:insert_idx] = new_lines
-            
-            # Write back to file
-            new_file_content = ''.join(lines)
-            file_service.write_file(file_path, new_file_content)
-            
-            history_service.log_edit("insert_lines", str(path), {
-                "line_number": line_number,
-                "inserted_lines": [line.rstrip() for line in new_lines],
-                "backup": backup_path
-            })
-            
-            return f"Successfully inserted {len(new_lines)} lines at line {line_number} in '{path}'"
-            
+            with path_locks.write_lock(path):
+                if not path.exists():
+                    return f"File '{file_path}' does not exist"
+                
+                # Read current content, rejecting a stale expected version
+                file_content, _ = file_service.read_for_edit(file_path, expected_hash, expected_mtime)
+                index = LineIndex(file_content)
+                
+                backup_path = backup_service.create_backup(str(path))
+                
+                insert_idx = max(0, min(line_number - 1, len(index)))
+                block = _as_line_block(content)
+                new_lines = block.splitlines()
+                
+                offset, _ = index.span(insert_idx, insert_idx)
+                if offset == len(file_content) and file_content and not file_content.endswith('\n'):
+                    # Appending after an unterminated last line must not join the two
+                    block = '\n' + block
+                
+                # Write back to file
+                new_file_content = file_content[:offset] + block + file_content[offset:]
+                version = file_service.write_file_versioned(file_path, new_file_content)
+                
+                history_service.log_edit("insert_lines", str(path), {
+                    "line_number": line_number,
+                    "inserted_lines": [line.rstrip() for line in new_lines],
+                    "backup": backup_path
+                })
+                
+                return (f"Successfully inserted {len(new_lines)} lines at line {line_number} in '{path}'\n"
+                        f"Version: {version.describe()}")
+                
         except Exception as e:
             return f"Error inserting lines: {str(e)}"
 
@@ -119,41 +132,44 @@ class DeleteLinesTool(FileOperationBase):
     def __init__(self):
         super().__init__("delete_lines", "Delete specific lines from a file")
     
-    def execute(self, file_path: str, start_line: int, end_line: Optional[int] = None) -> str:
+    def execute(self, file_path: str, start_line: int, end_line: Optional[int] = None,
+                expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None) -> str:
         try:
             path = self.validate_file_path(file_path)
-            if not path.exists():
-                return f"File '{file_path}' does not exist"
-            
-            backup_path = backup_service.create_backup(str(path))
-            
-            # Read current content
-            file_content = file_service.read_file(file_path)
-            lines = file_content.splitlines(keepends=True)
-            
-            total_lines = len(lines)
-            start_idx = start_line - 1
-            end_idx = end_line if end_line else start_line
-            
-            if start_idx < 0 or start_idx >= total_lines:
-                return f"Invalid line number {start_line}. File has {total_lines} lines"
-            
-            deleted_lines = lines[start_idx:end_idx]
-            del lines[start_idx:end_idx]
-            
-            # Write back to file
-            new_file_content = ''.join(lines)
-            file_service.write_file(file_path, new_file_content)
-            
-            history_service.log_edit("delete_lines", str(path), {
-                "start_line": start_line,
-                "end_line": end_line,
-                "deleted_lines": [line.rstrip() for line in deleted_lines],
-                "backup": backup_path
-            })
-            
-            return f"Successfully deleted lines {start_line}-{end_line or start_line} from '{path}'"
-            
+            with path_locks.write_lock(path):
+                if not path.exists():
+                    return f"File '{file_path}' does not exist"
+                
+                # Read current content, rejecting a stale expected version
+                file_content, _ = file_service.read_for_edit(file_path, expected_hash, expected_mtime)
+                index = LineIndex(file_content)
+                
+                total_lines = len(index)
+                start_idx = start_line - 1
+                end_idx = end_line if end_line else start_line
+                
+                if start_idx < 0 or start_idx >= total_lines:
+                    return f"Invalid line number {start_line}. File has {total_lines} lines"
+                
+                deleted_lines = index.lines(start_idx, end_idx)
+                begin, finish = index.span(start_idx, end_idx)
+                
+                backup_path = backup_service.create_backup(str(path))
+                
+                # Write back to file
+                new_file_content = file_content[:begin] + file_content[finish:]
+                version = file_service.write_file_versioned(file_path, new_file_content)
+                
+                history_service.log_edit("delete_lines", str(path), {
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "deleted_lines": [line.rstrip() for line in deleted_lines],
+                    "backup": backup_path
+                })
+                
+                return (f"Successfully deleted lines {start_line}-{end_line or start_line} from '{path}'\n"
+                        f"Version: {version.describe()}")
+                
         except Exception as e:
             return f"Error deleting lines: {str(e)}"
 
@@ -164,41 +180,43 @@ class ReplaceInFileTool(FileOperationBase):
     def __init__(self):
         super().__init__("replace_in_file", "Find and replace text in a file")
     
-    def execute(self, file_path: str, search_pattern: str, replace_with: str, use_regex: bool = False) -> str:
+    def execute(self, file_path: str, search_pattern: str, replace_with: str, use_regex: bool = False,
+                expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None) -> str:
         try:
             path = self.validate_file_path(file_path)
-            if not path.exists():
-                return f"File '{file_path}' does not exist"
-            
-            backup_path = backup_service.create_backup(str(path))
-            
-            # Read current content
-            content = file_service.read_file(file_path)
-            original_content = content
-            
-            if use_regex:
-                try:
-                    content = re.sub(search_pattern, replace_with, content)
-                    count = len(re.findall(search_pattern, original_content))
-                except re.error as e:
-                    return f"Invalid regex pattern: {e}"
-            else:
-                count = content.count(search_pattern)
-                content = content.replace(search_pattern, replace_with)
-            
-            # Write back to file
-            file_service.write_file(file_path, content)
-            
-            history_service.log_edit("replace_in_file", str(path), {
-                "search_pattern": search_pattern,
-                "replace_with": replace_with,
-                "use_regex": use_regex,
-                "replacements_made": count,
-                "backup": backup_path
-            })
-            
-            return f"Successfully made {count} replacements in '{path}'"
-            
+            with path_locks.write_lock(path):
+                if not path.exists():
+                    return f"File '{file_path}' does not exist"
+                
+                # Read current content, rejecting a stale expected version
+                content, _ = file_service.read_for_edit(file_path, expected_hash, expected_mtime)
+                
+                if use_regex:
+                    try:
+                        # One pass substitutes and counts
+                        content, count = pattern_cache.compile(search_pattern).subn(replace_with, content)
+                    except re.error as e:
+                        return f"Invalid regex pattern: {e}"
+                else:
+                    count = content.count(search_pattern)
+                    content = content.replace(search_pattern, replace_with)
+                
+                backup_path = backup_service.create_backup(str(path))
+                
+                # Write back to file
+                version = file_service.write_file_versioned(file_path, content)
+                
+                history_service.log_edit("replace_in_file", str(path), {
+                    "search_pattern": search_pattern,
+                    "replace_with": replace_with,
+                    "use_regex": use_regex,
+                    "replacements_made": count,
+                    "backup": backup_path
+                })
+                
+                return (f"Successfully made {count} replacements in '{path}'\n"
+                        f"Version: {version.describe()}")
+                
         except Exception as e:
             return f"Error replacing in file: {str(e)}"
 
@@ -209,7 +227,7 @@ class GetFileDiffTool(FileOperationBase):
     def __init__(self):
         super().__init__("get_file_diff", "Show differences between current file and its backup")
     
-    def execute(self, file_path: str, backup_file: Optional[str] = None) -> str:
+    def execute(self, file_path: str, backup_file: Optional[str] = None, context_lines: int = 3) -> str:
         try:
             path = self.validate_file_path(file_path)
             if not path.exists():
@@ -231,21 +249,22 @@ class GetFileDiffTool(FileOperationBase):
             current_content = file_service.read_file(file_path)
             backup_content = file_service.read_file(str(backup_path))
             
-            current_lines = current_content.splitlines(keepends=True)
-            backup_lines = backup_content.splitlines(keepends=True)
+            current_lines = current_content.splitlines()
+            backup_lines = backup_content.splitlines()
             
-            diff = list(difflib.unified_diff(
+            diff = "\n".join(unified_diff(
                 backup_lines,
                 current_lines,
                 fromfile=f"{path.name} (backup)",
                 tofile=f"{path.name} (current)",
+                n=max(0, context_lines),
                 lineterm=""
             ))
             
             if not diff:
                 return "No differences found"
             
-            return f"Differences for '{path}':\n\n" + "\n".join(diff)
+            return f"Differences for '{path}':\n\n" + diff
             
         except Exception as e:
             return f"Error generating diff: {str(e)}"
@@ -309,33 +328,82 @@ def register_file_editing_tools(mcp: FastMCP):
     history_tool = GetEditHistoryTool()
     
     @mcp.tool()
-    def edit_file_lines(file_path: str, start_line: int, new_content: str, end_line: Optional[int] = None) -> str:
-        """Replace specific lines in a file with new content"""
-        return edit_tool.execute(file_path=file_path, start_line=start_line, 
-                               new_content=new_content, end_line=end_line)
+    async def edit_file_lines(file_path: str, start_line: int, new_content: str, end_line: Optional[int] = None,
+                              expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None,
+                              profile: bool = False) -> str:
+        """Replace specific lines in a file with new content.
+        
+        Pass expected_hash/expected_mtime from a previous read to reject the edit if the file changed.
+        Pass profile=True to append the slowest functions of this call to the result.
+        """
+        return await tool_executor.run("edit_file_lines", edit_tool.execute, profile=profile,
+                                       file_path=file_path, start_line=start_line,
+                                       new_content=new_content, end_line=end_line,
+                                       expected_hash=expected_hash, expected_mtime=expected_mtime)
     
     @mcp.tool()
-    def insert_lines(file_path: str, line_number: int, content: str) -> str:
-        """Insert new lines at a specific position in the file"""
-        return insert_tool.execute(file_path=file_path, line_number=line_number, content=content)
+    async def insert_lines(file_path: str, line_number: int, content: str,
+                           expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None,
+                           profile: bool = False) -> str:
+        """Insert new lines at a specific position in the file.
+        
+        Pass expected_hash/expected_mtime from a previous read to reject the edit if the file changed.
+        Pass profile=True to append the slowest functions of this call to the result.
+        """
+        return await tool_executor.run("insert_lines", insert_tool.execute, profile=profile,
+                                       file_path=file_path, line_number=line_number,
+                                       content=content, expected_hash=expected_hash,
+                                       expected_mtime=expected_mtime)
     
     @mcp.tool()
-    def delete_lines(file_path: str, start_line: int, end_line: Optional[int] = None) -> str:
-        """Delete specific lines from a file"""
-        return delete_tool.execute(file_path=file_path, start_line=start_line, end_line=end_line)
+    async def delete_lines(file_path: str, start_line: int, end_line: Optional[int] = None,
+                           expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None,
+                           profile: bool = False) -> str:
+        """Delete specific lines from a file.
+        
+        Pass expected_hash/expected_mtime from a previous read to reject the edit if the file changed.
+        Pass profile=True to append the slowest functions of this call to the result.
+        """
+        return await tool_executor.run("delete_lines", delete_tool.execute, profile=profile,
+                                       file_path=file_path, start_line=start_line,
+                                       end_line=end_line, expected_hash=expected_hash,
+                                       expected_mtime=expected_mtime)
     
     @mcp.tool()
-    def replace_in_file(file_path: str, search_pattern: str, replace_with: str, use_regex: bool = False) -> str:
-        """Find and replace text in a file"""
-        return replace_tool.execute(file_path=file_path, search_pattern=search_pattern,
-                                  replace_with=replace_with, use_regex=use_regex)
+    async def replace_in_file(file_path: str, search_pattern: str, replace_with: str, use_regex: bool = False,
+                              expected_hash: Optional[str] = None, expected_mtime: Optional[int] = None,
+                              profile: bool = False) -> str:
+        """Find and replace text in a file.
+        
+        Pass expected_hash/expected_mtime from a previous read to reject the edit if the file changed.
+        Pass profile=True to append the slowest functions of this call to the result.
+        """
+        return await tool_executor.run("replace_in_file", replace_tool.execute, profile=profile,
+                                       file_path=file_path, search_pattern=search_pattern,
+                                       replace_with=replace_with, use_regex=use_regex,
+                                       expected_hash=expected_hash, expected_mtime=expected_mtime)
     
     @mcp.tool()
-    def get_file_diff(file_path: str, backup_file: Optional[str] = None) -> str:
+    async def get_file_diff(file_path: str, backup_file: Optional[str] = None, context_lines: int = 3) -> str:
         """Show differences between current file and its backup"""
-        return diff_tool.execute(file_path=file_path, backup_file=backup_file)
+        return await tool_executor.run("get_file_diff", diff_tool.execute, cpu_bound=True,
+                                       file_path=file_path, backup_file=backup_file,
+                                       context_lines=context_lines)
+    
+    @mcp.tool()
+    async def get_files_diff(file_paths: List[str], context_lines: int = 3) -> str:
+        """Show differences between several files and their latest backups, diffed in parallel"""
+        if not file_paths:
+            return "No files given"
+        diffs = await asyncio.gather(*(
+            tool_executor.run("get_file_diff", diff_tool.execute, cpu_bound=True,
+                              file_path=file_path, context_lines=context_lines)
+            for file_path in file_paths
+        ))
+        return "\n\n".join(f"=== {file_path} ===\n{diff}" for file_path, diff in zip(file_paths, diffs))
     
     @mcp.tool()
-    def get_edit_history(limit: int = 20, file_path: Optional[str] = None) -> str:
+    async def get_edit_history(limit: int = 20, file_path: Optional[str] = None) -> str:
         """Get the history of file edits"""
-        return history_tool.execute(limit=limit, file_path=file_path)
+        return await tool_executor.run("get_edit_history", history_tool.execute,
+                                       limit=limit, file_path=file_path)
@@ -2,14 +2,23 @@
 Basic file operation tools
 """
 
-from typing import Optional
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
 from pathlib import Path
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 from ..core import FileOperationBase
+from ..core.executor import tool_executor
+from ..core.locks import path_locks
+from ..core.lines import LineIndex
 from ..core.exceptions import FileNotFoundError, FileAccessError
-from ..services import file_service, backup_service, history_service
+from ..core.config import FILES_INFO_MAX_PATHS, PROGRESS_INTERVAL, READ_FILES_MAX_BYTES, READ_FILES_MAX_FILES
+from ..core.utils import format_file_size, to_json
+from ..models.file_models import FileRange
+from ..services import file_service, backup_service, history_service, trash_service
 
 
 class ListFilesTool(FileOperationBase):
@@ -18,22 +27,30 @@ class ListFilesTool(FileOperationBase):
     def __init__(self):
         super().__init__("list_files", "List files and directories in the specified path")
     
-    def execute(self, directory: str = ".", show_hidden: bool = False) -> str:
+    def execute(self, directory: str = ".", show_hidden: bool = False,
+                output_format: str = "text", respect_gitignore: bool = True) -> str:
         try:
-            items = file_service.list_directory(directory, show_hidden, include_size=True)
+            self.validate_output_format(output_format)
+            items = file_service.list_directory(directory, show_hidden, include_size=True,
+                                                respect_gitignore=respect_gitignore)
+            
+            if output_format == "json":
+                return to_json({"directory": directory, "items": items})
             
             if not items:
                 return f"Directory '{directory}' is empty"
             
-            result = f"Contents of '{directory}':\n"
+            lines = [f"Contents of '{directory}':"]
             for item in items:
                 icon = "📁" if item["is_dir"] else "📄"
                 size_info = f" ({item.get('size_formatted', '')})" if item.get('size_formatted') else ""
-                result += f"{icon} {item['name']}{size_info}\n"
+                lines.append(f"{icon} {item['name']}{size_info}")
             
-            return result
+            return "\n".join(lines) + "\n"
             
         except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
             return f"Error: {str(e)}"
 
 
@@ -45,9 +62,9 @@ class ReadFileTool(FileOperationBase):
     
     def execute(self, file_path: str) -> str:
         try:
-            content = file_service.read_file(file_path)
+            content, version = file_service.read_file_versioned(file_path)
             path = self.validate_file_path(file_path)
-            return f"Contents of '{path}':\n\n{content}"
+            return f"Contents of '{path}':\nVersion: {version.describe()}\n\n{content}"
             
         except Exception as e:
             return f"Error reading file: {str(e)}"
@@ -59,26 +76,31 @@ class WriteFileTool(FileOperationBase):
     def __init__(self):
         super().__init__("write_file", "Write content to a file")
     
-    def execute(self, file_path: str, content: str) -> str:
+    def execute(self, file_path: str, content: str, expected_hash: Optional[str] = None,
+                expected_mtime: Optional[int] = None) -> str:
         try:
             path = self.validate_file_path(file_path)
-            
-            # Create backup if file exists
-            backup_path = ""
-            if path.exists():
-                backup_path = backup_service.create_backup(str(path))
-            
-            # Write the file
-            file_service.write_file(file_path, content)
-            
-            # Log the edit
-            history_service.log_edit("write_file", str(path), {
-                "content_length": len(content),
-                "backup": backup_path
-            })
-            
-            return f"Successfully wrote {len(content)} characters to '{path}'"
-            
+            with path_locks.write_lock(path):
+                # Refuse to overwrite a file that changed since the caller read it
+                file_service.check_version(file_path, expected_hash, expected_mtime)
+                
+                # Create backup if file exists
+                backup_path = ""
+                if path.exists():
+                    backup_path = backup_service.create_backup(str(path))
+                
+                # Write the file
+                version = file_service.write_file_versioned(file_path, content)
+                
+                # Log the edit
+                history_service.log_edit("write_file", str(path), {
+                    "content_length": len(content),
+                    "backup": backup_path
+                })
+                
+                return (f"Successfully wrote {len(content)} characters to '{path}'\n"
+                        f"Version: {version.describe()}")
+                
         except Exception as e:
             return f"Error writing file: {str(e)}"
 
@@ -95,23 +117,22 @@ class GetFileLinesTool(FileOperationBase):
             if not path.exists():
                 return f"File '{file_path}' does not exist"
             
-            content = file_service.read_file(file_path)
-            lines = content.splitlines()
+            content, version = file_service.read_file_versioned(file_path)
+            index = LineIndex(content)
             
-            total_lines = len(lines)
+            total_lines = len(index)
             start_idx = max(0, start_line - 1)
             end_idx = min(total_lines, end_line) if end_line else total_lines
             
             if start_idx >= total_lines:
                 return f"Start line {start_line} exceeds file length ({total_lines} lines)"
             
-            selected_lines = lines[start_idx:end_idx]
-            result = f"Lines {start_line}-{start_idx + len(selected_lines)} of '{path}':\n\n"
-            
-            for i, line in enumerate(selected_lines, start=start_line):
-                result += f"{i:4d}: {line}\n"
+            selected_lines = index.lines(start_idx, end_idx)
+            header = (f"Lines {start_line}-{start_idx + len(selected_lines)} of '{path}':\n"
+                      f"Version: {version.describe()}\n\n")
+            body = "".join(f"{i:4d}: {line}\n" for i, line in enumerate(selected_lines, start=start_line))
             
-            return result
+            return header + body
             
         except Exception as e:
             return f"Error reading file lines: {str(e)}"
@@ -123,10 +144,14 @@ class GetFileInfoTool(FileOperationBase):
     def __init__(self):
         super().__init__("get_file_info", "Get detailed information about a file or directory")
     
-    def execute(self, file_path: str) -> str:
+    def execute(self, file_path: str, output_format: str = "text") -> str:
         try:
+            self.validate_output_format(output_format)
             info = file_service.get_file_info(file_path)
             
+            if output_format == "json":
+                return to_json(info)
+            
             result = f"Information for '{info['path']}':\n"
             result += f"  Name: {info['name']}\n"
             result += f"  Size: {info['size_formatted']} ({info['size']} bytes)\n"
@@ -145,9 +170,332 @@ class GetFileInfoTool(FileOperationBase):
             return result
             
         except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error getting file info: {str(e)}"
+
+
+class GetFilesInfoTool(FileOperationBase):
+    """Tool for getting compact metadata of many paths at once"""
+    
+    def __init__(self):
+        super().__init__("get_files_info", "Get size, type and modification time of many paths")
+    
+    def execute(self, paths: List[str], follow_symlinks: bool = True, output_format: str = "text") -> str:
+        try:
+            self.validate_output_format(output_format)
+            if len(paths) > FILES_INFO_MAX_PATHS:
+                raise ValueError(f"Too many paths ({len(paths)}); the limit is {FILES_INFO_MAX_PATHS} per call")
+            records = file_service.stat_paths(paths, follow_symlinks)
+            
+            if output_format == "json":
+                return to_json({"files": records})
+            
+            result = f"Information for {len(records)} path(s):\n"
+            for record in records:
+                if "error" in record:
+                    result += f"❌ {record['path']}: {record['error']}\n"
+                    continue
+                kind = record["type"] + (" (link)" if record.get("symlink") else "")
+                kind += " (broken)" if record.get("broken") else ""
+                result += (f"- {record['path']}  {kind}  {format_file_size(record['size'])}  "
+                           f"{_clock(record['mtime_ns'] / 1e9)}  {record['mode']}\n")
+            return result
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
             return f"Error getting file info: {str(e)}"
 
 
+def _as_range(item: Union[str, dict, FileRange]) -> FileRange:
+    if isinstance(item, FileRange):
+        return item
+    if isinstance(item, str):
+        return FileRange(item)
+    return FileRange(**item)
+
+
+class ReadFilesTool(FileOperationBase):
+    """Tool for reading many files, or line ranges of them, in one call"""
+    
+    def __init__(self):
+        super().__init__("read_files", "Read several files or line ranges at once")
+    
+    def _read_one(self, request: FileRange, exhausted: threading.Event) -> Optional[Dict[str, Any]]:
+        """Read one range on a fanout thread; None if the budget ran out before it started"""
+        if exhausted.is_set():
+            return None
+        path = self.validate_file_path(request.path)
+        content, version = file_service.read_file_versioned(request.path)
+        index = LineIndex(content)
+        total_lines = len(index)
+        start_idx = max(0, request.start_line - 1)
+        end_idx = min(total_lines, request.end_line) if request.end_line else total_lines
+        if start_idx >= total_lines and total_lines:
+            raise ValueError(f"Start line {request.start_line} exceeds file length ({total_lines} lines)")
+        return {"path": str(path), "start_line": start_idx + 1, "total_lines": total_lines,
+                "version": {"hash": version.content_hash, "mtime": version.mtime_ns},
+                "lines": index.lines(start_idx, end_idx)}
+    
+    def execute(self, files: List[Union[str, dict, FileRange]], max_bytes: int = READ_FILES_MAX_BYTES,
+                output_format: str = "text") -> str:
+        try:
+            self.validate_output_format(output_format)
+            requests = [_as_range(item) for item in files]
+            if not requests:
+                raise ValueError("No files given")
+            if len(requests) > READ_FILES_MAX_FILES:
+                raise ValueError(f"Too many files ({len(requests)}); the limit is {READ_FILES_MAX_FILES} per call")
+            if max_bytes <= 0:
+                raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+            
+            # Reads run in parallel; the budget is spent in request order as they complete
+            exhausted = threading.Event()
+            futures = [tool_executor.fanout(self._read_one, request, exhausted) for request in requests]
+            entries = []
+            used = 0
+            for request, future in zip(requests, futures):
+                if exhausted.is_set():
+                    future.cancel()
+                    entries.append({"path": request.path, "skipped": True})
+                    continue
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    entries.append({"path": request.path, "error": str(e)})
+                    continue
+                if entry is None:
+                    entries.append({"path": request.path, "skipped": True})
+                    continue
+                lines = entry.pop("lines")
+                kept = 0
+                for line in lines:
+                    size = len(line.encode("utf-8")) + 1
+                    if used + size > max_bytes:
+                        exhausted.set()
+                        break
+                    used += size
+                    kept += 1
+                if lines and not kept:
+                    entries.append({"path": request.path, "skipped": True})
+                    continue
+                entry["end_line"] = entry["start_line"] + kept - 1
+                entry["lines"] = lines[:kept]
+                if kept < len(lines):
+                    entry["truncated"] = True
+                entries.append(entry)
+            
+            skipped = sum(1 for entry in entries if entry.get("skipped"))
+            truncated = exhausted.is_set()
+            if output_format == "json":
+                for entry in entries:
+                    if "lines" in entry:
+                        entry["content"] = "".join(f"{line}\n" for line in entry.pop("lines"))
+                return to_json({"files": entries, "bytes": used, "max_bytes": max_bytes,
+                                "budget_exhausted": truncated})
+            
+            sections = []
+            for entry in entries:
+                if "error" in entry:
+                    sections.append(f"❌ '{entry['path']}': {entry['error']}\n")
+                elif entry.get("skipped"):
+                    continue
+                else:
+                    header = (f"Lines {entry['start_line']}-{entry['end_line']} of '{entry['path']}' "
+                              f"({entry['total_lines']} lines):\n"
+                              f"Version: hash={entry['version']['hash']} mtime={entry['version']['mtime']}\n\n")
+                    body = "".join(f"{i:4d}: {line}\n"
+                                   for i, line in enumerate(entry["lines"], start=entry["start_line"]))
+                    sections.append(header + body)
+            if truncated:
+                sections.append(f"⚠️ Stopped at the {max_bytes}-byte budget: "
+                                f"{sum(1 for entry in entries if entry.get('truncated'))} file(s) truncated, "
+                                f"{skipped} skipped. Request the rest in another call.\n")
+            return "\n".join(sections)
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error reading files: {str(e)}"
+
+
+def _progress_reporter(ctx: Optional[Context]) -> Optional[Callable[[int, int], None]]:
+    """Callback, safe to call from worker threads, sending throttled MCP progress notifications;
+    None when the client did not ask for progress"""
+    try:
+        meta = ctx.request_context.meta if ctx is not None else None
+    except ValueError:  # Not inside a request
+        return None
+    if meta is None or meta.progressToken is None:
+        return None
+    loop = asyncio.get_running_loop()
+    last = 0.0
+    
+    def report(done: int, total: int) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if done < total and now - last < PROGRESS_INTERVAL:
+            return
+        last = now
+        asyncio.run_coroutine_threadsafe(ctx.report_progress(done, total), loop)
+    
+    return report
+
+
+def _format_transfer(verb: str, summary: Dict[str, Any]) -> str:
+    methods = ", ".join(f"{method} {count}" for method, count in sorted(summary["methods"].items()))
+    lines = [f"{'✅' if not summary['errors'] else '⚠️'} {verb} {len(summary['items'])} item(s): "
+             f"{summary['files']} files, {format_file_size(summary['bytes'])} "
+             f"in {summary['elapsed_seconds']:.2f}s" + (f" ({methods})" if methods else "")]
+    for item in summary["items"]:
+        line = f"- {item['source']} → {item['target']}"
+        if "files" in item:
+            line += f" ({item['files']} files, {format_file_size(item['bytes'])})"
+        if item.get("source_removed") is False:
+            line += " - source kept because the copy was incomplete"
+        lines.append(line)
+    for error in summary["errors"]:
+        lines.append(f"❌ {error['source']}: {error['error']}")
+    return "\n".join(lines) + "\n"
+
+
+class CopyPathsTool(FileOperationBase):
+    """Tool for copying files and directory trees in bulk"""
+    
+    def __init__(self):
+        super().__init__("copy_paths", "Copy files and directory trees")
+    
+    def execute(self, sources: List[str], destination: str, overwrite: bool = False,
+                output_format: str = "text", progress: Optional[Callable[[int, int], None]] = None) -> str:
+        try:
+            self.validate_output_format(output_format)
+            if not sources:
+                raise ValueError("No sources given")
+            summary = file_service.copy_paths(sources, destination, overwrite, progress)
+            return to_json(summary) if output_format == "json" else _format_transfer("Copied", summary)
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error copying: {str(e)}"
+
+
+class MovePathsTool(FileOperationBase):
+    """Tool for moving files and directory trees in bulk"""
+    
+    def __init__(self):
+        super().__init__("move_paths", "Move files and directory trees")
+    
+    def execute(self, sources: List[str], destination: str, overwrite: bool = False,
+                output_format: str = "text", progress: Optional[Callable[[int, int], None]] = None) -> str:
+        try:
+            self.validate_output_format(output_format)
+            if not sources:
+                raise ValueError("No sources given")
+            summary = file_service.move_paths(sources, destination, overwrite, progress)
+            return to_json(summary) if output_format == "json" else _format_transfer("Moved", summary)
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error moving: {str(e)}"
+
+
+def _clock(timestamp: float) -> str:
+    import datetime
+    
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class DeletePathsTool(FileOperationBase):
+    """Tool for deleting files and directory trees, with an undo window"""
+    
+    def __init__(self):
+        super().__init__("delete_paths", "Delete files and directory trees")
+    
+    def execute(self, paths: List[str], recursive: bool = False, output_format: str = "text") -> str:
+        try:
+            self.validate_output_format(output_format)
+            if not paths:
+                raise ValueError("No paths given")
+            deleted = []
+            errors = []
+            for file_path in paths:
+                try:
+                    entry = trash_service.delete(file_path, recursive)
+                except (FileNotFoundError, FileAccessError) as e:
+                    errors.append({"path": file_path, "error": str(e)})
+                    continue
+                history_service.log_edit("delete", entry.original_path, {"deletion_id": entry.deletion_id})
+                deleted.append({"path": entry.original_path, "deletion_id": entry.deletion_id,
+                                "purge_at": entry.purge_at})
+            
+            if output_format == "json":
+                return to_json({"deleted": deleted, "errors": errors})
+            result = f"{'✅' if not errors else '⚠️'} Deleted {len(deleted)} of {len(paths)} path(s)"
+            if deleted:
+                result += f"; restorable with restore_deleted until {_clock(deleted[0]['purge_at'])}"
+            result += "\n"
+            for item in deleted:
+                result += f"- {item['path']} (id {item['deletion_id']})\n"
+            for error in errors:
+                result += f"❌ {error['path']}: {error['error']}\n"
+            return result
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error deleting: {str(e)}"
+
+
+class RestoreDeletedTool(FileOperationBase):
+    """Tool for undoing deletes whose undo window is still open"""
+    
+    def __init__(self):
+        super().__init__("restore_deleted", "Restore deleted files and trees")
+    
+    def execute(self, deletion_ids: Optional[List[str]] = None, output_format: str = "text") -> str:
+        try:
+            self.validate_output_format(output_format)
+            if not deletion_ids:
+                pending = [{"deletion_id": entry.deletion_id, "path": entry.original_path,
+                            "purge_at": entry.purge_at} for entry in trash_service.pending()]
+                if output_format == "json":
+                    return to_json({"pending": pending})
+                if not pending:
+                    return "No deleted paths are waiting to be purged\n"
+                result = f"🗑️ {len(pending)} deleted path(s) can be restored:\n"
+                for item in pending:
+                    result += f"- {item['deletion_id']}: {item['path']} (purged at {_clock(item['purge_at'])})\n"
+                return result
+            
+            restored = []
+            errors = []
+            for deletion_id in deletion_ids:
+                try:
+                    entry = trash_service.restore(deletion_id)
+                except (FileNotFoundError, FileAccessError) as e:
+                    errors.append({"deletion_id": deletion_id, "error": str(e)})
+                    continue
+                history_service.log_edit("restore", entry.original_path, {"deletion_id": deletion_id})
+                restored.append({"deletion_id": deletion_id, "path": entry.original_path})
+            
+            if output_format == "json":
+                return to_json({"restored": restored, "errors": errors})
+            result = f"{'✅' if not errors else '⚠️'} Restored {len(restored)} of {len(deletion_ids)} path(s)\n"
+            for item in restored:
+                result += f"- {item['path']}\n"
+            for error in errors:
+                result += f"❌ {error['deletion_id']}: {error['error']}\n"
+            return result
+            
+        except Exception as e:
+            if output_format == "json":
+                return to_json({"error": str(e)})
+            return f"Error restoring: {str(e)}"
+
+
 def register_file_operations(mcp: FastMCP):
     """Register file operation tools with the MCP server"""
     
@@ -156,29 +504,154 @@ def register_file_operations(mcp: FastMCP):
     write_tool = WriteFileTool()
     lines_tool = GetFileLinesTool()
     info_tool = GetFileInfoTool()
+    files_info_tool = GetFilesInfoTool()
+    read_many_tool = ReadFilesTool()
+    copy_tool = CopyPathsTool()
+    move_tool = MovePathsTool()
+    delete_tool = DeletePathsTool()
+    restore_tool = RestoreDeletedTool()
     
     @mcp.tool()
-    def list_files(directory: str = ".", show_hidden: bool = False) -> str:
-        """List files and directories in the specified path"""
-        return list_tool.execute(directory=directory, show_hidden=show_hidden)
+    async def list_files(directory: str = ".", show_hidden: bool = False,
+                         output_format: str = "text", respect_gitignore: bool = True) -> str:
+        """List files and directories in the specified path (output_format: "text" or "json").
+        
+        Inside git repositories, entries git ignores are hidden unless respect_gitignore is False.
+        """
+        return await tool_executor.run("list_files", list_tool.execute,
+                                       directory=directory, show_hidden=show_hidden,
+                                       output_format=output_format,
+                                       respect_gitignore=respect_gitignore)
     
     @mcp.tool()
-    def read_file(file_path: str) -> str:
-        """Read the contents of a text file"""
-        return read_tool.execute(file_path=file_path)
+    async def read_file(file_path: str) -> str:
+        """Read the contents of a text file, with a version token for optimistic edits"""
+        return await tool_executor.run("read_file", read_tool.execute,
+                                       file_path=file_path)
     
     @mcp.tool()
-    def write_file(file_path: str, content: str) -> str:
-        """Write content to a file"""
-        return write_tool.execute(file_path=file_path, content=content)
+    async def read_files(files: List[Union[str, FileRange]], max_bytes: int = READ_FILES_MAX_BYTES,
+                         output_format: str = "text") -> str:
+        """Read several files, or line ranges of them, in one call.
+        
+        Each entry is a path, or {"path", "start_line", "end_line"} (1-indexed, inclusive).
+        Files are read in parallel; their content is returned in request order until
+        max_bytes is spent, after which files are truncated at a line or skipped.
+        Each file comes with a version token for optimistic edits.
+        
+        Args:
+            files: Paths or line ranges to read (up to 200).
+            max_bytes: Total bytes of file content to return.
+            output_format: "text" for numbered lines, or "json".
+        """
+        return await tool_executor.run("read_files", read_many_tool.execute,
+                                       files=files, max_bytes=max_bytes, output_format=output_format)
     
     @mcp.tool()
-    def get_file_lines(file_path: str, start_line: int = 1, end_line: Optional[int] = None) -> str:
-        """Get specific lines from a file (1-indexed)"""
-        return lines_tool.execute(file_path=file_path, start_line=start_line, end_line=end_line)
+    async def write_file(file_path: str, content: str, expected_hash: Optional[str] = None,
+                         expected_mtime: Optional[int] = None) -> str:
+        """Write content to a file.
+        
+        Pass expected_hash/expected_mtime from a previous read to reject the write if the file changed.
+        """
+        return await tool_executor.run("write_file", write_tool.execute,
+                                       file_path=file_path, content=content,
+                                       expected_hash=expected_hash, expected_mtime=expected_mtime)
     
     @mcp.tool()
-    def get_file_info(file_path: str) -> str:
-        """Get detailed information about a file or directory"""
-        return info_tool.execute(file_path=file_path)
-
+    async def get_file_lines(file_path: str, start_line: int = 1, end_line: Optional[int] = None) -> str:
+        """Get specific lines from a file (1-indexed), with a version token for optimistic edits"""
+        return await tool_executor.run("get_file_lines", lines_tool.execute,
+                                       file_path=file_path, start_line=start_line,
+                                       end_line=end_line)
+    
+    @mcp.tool()
+    async def get_file_info(file_path: str, output_format: str = "text") -> str:
+        """Get detailed information about a file or directory (output_format: "text" or "json")"""
+        return await tool_executor.run("get_file_info", info_tool.execute,
+                                       file_path=file_path, output_format=output_format)
+    
+    @mcp.tool()
+    async def get_files_info(paths: List[str], follow_symlinks: bool = True, output_format: str = "text") -> str:
+        """Get type, size, modification time and mode of many paths in one call.
+        
+        Each path costs one lstat (and a stat for followed links), run in parallel, so
+        polling a working set for changes is cheap. Prefer output_format="json": records
+        carry mtime_ns, and missing paths come back as {"path", "error"} entries.
+        
+        Args:
+            paths: Up to 10000 files or directories.
+            follow_symlinks: Describe what links point to (flagged "symlink") instead of the links.
+            output_format: "text" or "json".
+        """
+        return await tool_executor.run("get_files_info", files_info_tool.execute,
+                                       paths=paths, follow_symlinks=follow_symlinks, output_format=output_format)
+    
+    @mcp.tool()
+    async def copy_paths(sources: List[str], destination: str, overwrite: bool = False,
+                         output_format: str = "text", ctx: Optional[Context] = None) -> str:
+        """Copy files and directory trees, like `cp -r`.
+        
+        With several sources, or an existing directory as destination, each source is copied
+        into it; otherwise the single source is copied to destination. Files are copied in
+        parallel using reflinks, copy_file_range or sendfile where the filesystem supports them,
+        keeping modes and timestamps, and progress is reported when the client asks for it.
+        
+        Args:
+            sources: Files or directories to copy.
+            destination: Target directory, or target path for a single source.
+            overwrite: Replace existing targets (directories are merged).
+            output_format: "text" or "json".
+        """
+        return await tool_executor.run("copy_paths", copy_tool.execute,
+                                       sources=sources, destination=destination, overwrite=overwrite,
+                                       output_format=output_format, progress=_progress_reporter(ctx))
+    
+    @mcp.tool()
+    async def move_paths(sources: List[str], destination: str, overwrite: bool = False,
+                         output_format: str = "text", ctx: Optional[Context] = None) -> str:
+        """Move files and directory trees, like `mv`.
+        
+        Targets are chosen as in copy_paths. A move within one filesystem is an atomic rename;
+        across filesystems the source is copied as in copy_paths and removed only once every
+        file was copied.
+        
+        Args:
+            sources: Files or directories to move.
+            destination: Target directory, or target path for a single source.
+            overwrite: Replace existing targets (directories are merged).
+            output_format: "text" or "json".
+        """
+        return await tool_executor.run("move_paths", move_tool.execute,
+                                       sources=sources, destination=destination, overwrite=overwrite,
+                                       output_format=output_format, progress=_progress_reporter(ctx))
+    
+    @mcp.tool()
+    async def delete_paths(paths: List[str], recursive: bool = False, output_format: str = "text") -> str:
+        """Delete files and directories, with an undo window.
+        
+        Each path is moved into a trash staging area with one rename, so even a large tree
+        is gone at once; it is purged in the background once the undo window
+        (MCP_TRASH_UNDO_SECONDS, 10 minutes by default) has passed. Symbolic links are
+        deleted themselves, not their targets.
+        
+        Args:
+            paths: Files or directories to delete.
+            recursive: Allow deleting non-empty directories.
+            output_format: "text" or "json".
+        
+        Returns the deletion ids to pass to restore_deleted.
+        """
+        return await tool_executor.run("delete_paths", delete_tool.execute,
+                                       paths=paths, recursive=recursive, output_format=output_format)
+    
+    @mcp.tool()
+    async def restore_deleted(deletion_ids: Optional[List[str]] = None, output_format: str = "text") -> str:
+        """Undo deletes made with delete_paths whose undo window is still open.
+        
+        Args:
+            deletion_ids: Ids returned by delete_paths; omit to list what can be restored.
+            output_format: "text" or "json".
+        """
+        return await tool_executor.run("restore_deleted", restore_tool.execute,
+                                       deletion_ids=deletion_ids, output_format=output_format)
@@ -0,0 +1,172 @@
+"""
+Navigation tools for MCP: locating files by partial name and definitions by symbol.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from mcp.server.fastmcp import FastMCP
+
+from ..core.config import OUTPUT_FORMATS, SYMBOL_INDEX_WAIT
+from ..core.executor import tool_executor
+from ..core.utils import to_json
+from ..services.path_index_service import path_index_service
+from ..services.symbol_index_service import symbol_index_service
+
+
+def _highlight(path: str, positions) -> str:
+    """Bold the characters the query matched"""
+    marked = set(positions)
+    return "".join(f"**{char}**" if i in marked else char for i, char in enumerate(path)).replace("****", "")
+
+
+def _find_files_impl(query: str, root: str = ".", max_results: int = 50,
+                     respect_gitignore: bool = True, show_hidden: bool = False,
+                     output_format: str = "text") -> str:
+    """Implementation for fuzzy file lookup by partial path"""
+    if output_format not in OUTPUT_FORMATS:
+        return f"❌ Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    def fail(message: str) -> str:
+        return to_json({"error": message}) if output_format == "json" else f"❌ {message}"
+
+    try:
+        path = Path(root).expanduser().resolve()
+        if not path.is_dir():
+            return fail(f"Directory '{root}' does not exist")
+        query = "".join(query.split()).replace("\\", "/")
+        if not query:
+            return fail("Query must not be empty")
+
+        matches, total = path_index_service.find(
+            query, path, limit=max(1, max_results),
+            respect_gitignore=respect_gitignore, show_hidden=show_hidden
+        )
+    except Exception as e:
+        return fail(f"Error finding files: {e}")
+
+    if output_format == "json":
+        return to_json({
+            "query": query,
+            "root": str(path),
+            "total_indexed": total,
+            "matches": [{"path": m.path, "score": round(m.score, 2), "positions": m.positions}
+                        for m in matches],
+        })
+
+    if not matches:
+        return f"🔍 No files matching '{query}' among {total} files in {path}"
+    lines = [f"🔍 **Files matching '{query}'** ({len(matches)} shown, {total} indexed in {path})\n"]
+    lines.extend(f"{i}. {_highlight(m.path, m.positions)}" for i, m in enumerate(matches, 1))
+    return "\n".join(lines)
+
+
+def _find_symbol_impl(query: str, root: str = ".", kind: Optional[str] = None, exact: bool = False,
+                      max_results: int = 50, respect_gitignore: bool = True,
+                      output_format: str = "text") -> str:
+    """Implementation for definition lookup through the symbol index"""
+    if output_format not in OUTPUT_FORMATS:
+        return f"❌ Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    def fail(message: str) -> str:
+        return to_json({"error": message}) if output_format == "json" else f"❌ {message}"
+
+    try:
+        path = Path(root).expanduser().resolve()
+        if not path.is_dir():
+            return fail(f"Directory '{root}' does not exist")
+        query = query.strip()
+        if not query:
+            return fail("Query must not be empty")
+
+        index = symbol_index_service.get_index(path, respect_gitignore)
+        complete = index.wait(SYMBOL_INDEX_WAIT)
+        symbols = index.lookup(query, kind=kind or None, exact=exact, limit=max(1, max_results))
+        indexed, pending = index.progress()
+    except Exception as e:
+        return fail(f"Error finding symbols: {e}")
+
+    if output_format == "json":
+        return to_json({
+            "query": query,
+            "root": str(path),
+            "symbols": [symbol.to_dict() for symbol in symbols],
+            "files_indexed": indexed,
+            "complete": complete,
+            "files_pending": pending,
+        })
+
+    note = "" if complete else f"\n\n⏳ Still indexing ({pending} files left); results may be incomplete."
+    if not symbols:
+        return f"🔍 No symbols matching '{query}' in {indexed} indexed files{note}"
+    lines = [f"🔍 **Symbols matching '{query}'** ({len(symbols)} shown)\n"]
+    for symbol in symbols:
+        lines.append(f"{symbol.kind} **{symbol.qualified_name}** — {symbol.file_path}:{symbol.line_number}")
+        if symbol.signature:
+            lines.append(f"     {symbol.signature}")
+    return "\n".join(lines) + note
+
+
+# --- MCP Tool Registration ---
+
+def register_navigation_tools(mcp: FastMCP):
+    """Register file navigation tools with the MCP server."""
+
+    @mcp.tool()
+    async def find_files(query: str, root: str = ".", max_results: int = 50,
+                         respect_gitignore: bool = True, show_hidden: bool = False,
+                         output_format: str = "text") -> str:
+        """
+        Find files by partial or abbreviated path, like an editor's "Go to file".
+
+        Query characters must appear in order in the file's path relative to root,
+        ignoring case: "srvcfg" finds "server/config.py". Matches on word starts,
+        consecutive characters and the file name rank first. Paths come from an
+        in-memory index that is kept up to date between calls.
+
+        Args:
+            query: Characters of the wanted path in order, e.g. "tstgitign" or "core/walk".
+            root: Directory whose files are searched.
+            max_results: Maximum number of ranked paths to return.
+            respect_gitignore: If True, inside git repositories only tracked or unignored files are listed.
+            show_hidden: If True, includes hidden files and directories (those starting with ".").
+            output_format: "text" for a ranked list, or "json" for paths with scores and matched positions.
+
+        Returns:
+            Ranked matching paths relative to root, best first.
+        """
+        # The index lives in this process, so lookups stay on worker threads
+        return await tool_executor.run(
+            "find_files", _find_files_impl,
+            query=query, root=root, max_results=max_results,
+            respect_gitignore=respect_gitignore, show_hidden=show_hidden, output_format=output_format
+        )
+
+    @mcp.tool()
+    async def find_symbol(query: str, root: str = ".", kind: Optional[str] = None, exact: bool = False,
+                          max_results: int = 50, respect_gitignore: bool = True,
+                          output_format: str = "text") -> str:
+        """
+        Jump to definitions: find functions, classes, methods and other named symbols.
+
+        Python is parsed exactly; JavaScript, TypeScript, Java, C, C++, CSS and HTML use
+        lightweight grammars. The index is built in the background on first use and
+        then kept current, so later lookups return immediately.
+
+        Args:
+            query: Symbol name or part of it, e.g. "handler"; "Class.method" matches qualified names.
+            root: Directory whose source files are indexed.
+            kind: Only return this kind, e.g. "class", "function", "method", "interface", "struct".
+            exact: If True, the name must match exactly (ignoring case) instead of as a substring.
+            max_results: Maximum number of symbols to return.
+            respect_gitignore: If True, inside git repositories only tracked or unignored files are indexed.
+            output_format: "text" for a readable list, or "json" for structured symbols.
+
+        Returns:
+            Matching definitions with file, line and signature, best matches first.
+        """
+        return await tool_executor.run(
+            "find_symbol", _find_symbol_impl,
+            query=query, root=root, kind=kind, exact=exact, max_results=max_results,
+            respect_gitignore=respect_gitignore, output_format=output_format
+        )
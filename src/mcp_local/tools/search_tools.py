@@ -2,18 +2,25 @@
 Advanced search tools for MCP.
 """
 
-import os
 import re
-import fnmatch
 from pathlib import Path
 from typing import Optional, List
 
 from mcp.server.fastmcp import FastMCP
 
 # Assuming these imports are available in your project structure
+from ..core.config import OUTPUT_FORMATS
 from ..core.constants import DEFAULT_EXCLUDE_PATTERNS, FILE_TYPE_GROUPS
-from ..core.utils import should_exclude_file, is_text_file
-from ..models.file_models import SearchMatch
+from ..core.encoding import read_text
+from ..core.exceptions import SearchError
+from ..core.executor import tool_executor
+from ..core.lines import LineIndex
+from ..core.metrics import metrics
+from ..core.patterns import pattern_cache
+from ..core.search_cache import search_cache
+from ..core.utils import is_text_file, hash_bytes, to_json
+from ..core.walk import create_walker
+from ..models.file_models import SearchCursor, SearchMatch, SearchResults
 
 
 # --- Implementation of the search logic ---
@@ -26,26 +33,36 @@ def _search_in_files_impl(search_pattern: str, directory: str = ".", file_patter
             return f"Directory '{directory}' does not exist"
         
         matches = []
+        if use_regex:
+            try:
+                matcher = pattern_cache.get(search_pattern).matcher
+            except re.error as e:
+                return f"Error searching files: invalid regex: {e}"
         
         for file_path in path.rglob(file_pattern):
             if file_path.is_file() and is_text_file(file_path):
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
+                    decoded = read_text(file_path)
+                    if decoded is None:
+                        continue
+                    content = decoded[0]
                     
                     if use_regex:
-                        # Find all lines that contain a match, not just the matches themselves
-                        if re.search(search_pattern, content, re.MULTILINE):
-                            lines = content.split('\n')
-                            for i, line in enumerate(lines, 1):
-                                if re.search(search_pattern, line):
-                                    matches.append(f"{file_path}:{i}: {line.strip()}")
-                    else:
-                        if search_pattern in content:
-                            lines = content.split('\n')
-                            for i, line in enumerate(lines, 1):
-                                if search_pattern in line:
-                                    matches.append(f"{file_path}:{i}: {line.strip()}")
+                        # One scan over the buffer; report each matching line once
+                        last_line = -1
+                        for hit in matcher.finditer(content):
+                            if hit.line != last_line:
+                                last_line = hit.line
+                                matches.append(f"{file_path}:{hit.line + 1}: {hit.index.line(hit.line).strip()}")
+                    elif search_pattern:
+                        # Jump between occurrences and slice out only the hit lines
+                        pos = content.find(search_pattern)
+                        if pos != -1:
+                            index = LineIndex(content)
+                            while pos != -1:
+                                i = index.line_of(pos)
+                                matches.append(f"{file_path}:{i + 1}: {index.line(i).strip()}")
+                                pos = content.find(search_pattern, index.line_end(i, keepends=True))
                 except Exception:
                     # Ignore files that can't be read
                     continue
@@ -67,7 +84,12 @@ def _search_in_files_impl(search_pattern: str, directory: str = ".", file_patter
         return f"Error searching files: {str(e)}"
 
 
-def _search_adv_impl(
+def _query_fingerprint(search_term: str, base_path: Path, **options) -> str:
+    """Identify a search so that cursors are only honoured by the query that issued them"""
+    return hash_bytes(to_json([search_term, str(base_path), sorted(options.items())]).encode("utf-8"))
+
+
+def _run_search(
     search_term: str,
     search_path: str = ".",
     case_sensitive: bool = False,
@@ -78,126 +100,208 @@ def _search_adv_impl(
     file_types: str = "all",
     max_results: int = 1000,
     context_lines: int = 2,
-    show_hidden: bool = False
-) -> str:
-    """Implementation for VSCode-like search across files and directories"""
+    show_hidden: bool = False,
+    cursor: Optional[str] = None,
+    respect_gitignore: bool = True
+) -> SearchResults:
+    """Walk the tree and collect one page of matches, raising SearchError for bad input"""
+    base_path = Path(search_path).expanduser().resolve()
+    if not base_path.exists():
+        raise SearchError(f"Path '{search_path}' does not exist")
+    
+    # Prepare search pattern
+    search_flags = 0 if case_sensitive else re.IGNORECASE
     try:
-        base_path = Path(search_path).expanduser().resolve()
-        if not base_path.exists():
-            return f"❌ Path '{search_path}' does not exist"
-        
-        # Prepare search pattern
-        search_flags = 0 if case_sensitive else re.IGNORECASE
-        
-        if use_regex:
-            try:
-                pattern_str = r'\b' + search_term + r'\b' if whole_word else search_term
-                pattern = re.compile(pattern_str, search_flags)
-            except re.error as e:
-                return f"❌ Invalid regex pattern: {e}"
-        else:
-            escaped_term = re.escape(search_term)
-            pattern_str = r'\b' + escaped_term + r'\b' if whole_word else escaped_term
-            pattern = re.compile(pattern_str, search_flags)
-        
-        # Prepare file patterns
-        if include_patterns:
-            include_list = [p.strip() for p in include_patterns.split(',')]
-        elif file_types in FILE_TYPE_GROUPS:
-            include_list = FILE_TYPE_GROUPS[file_types]
-        else:
-            include_list = [f"*.{p.strip()}" for p in file_types.split(',')] if file_types != "all" else ["*"]
-        
-        exclude_list = DEFAULT_EXCLUDE_PATTERNS.copy()
-        if exclude_patterns:
-            exclude_list.extend([p.strip() for p in exclude_patterns.split(',')])
-        
-        # Search files
-        matches = []
-        files_searched = 0
-        files_with_matches = 0
+        compiled = pattern_cache.get(search_term, search_flags, whole_word, is_regex=use_regex)
+    except re.error as e:
+        raise SearchError(f"Invalid regex pattern: {e}")
+    matcher = compiled.matcher
+    
+    # Prepare file patterns
+    if include_patterns:
+        include_list = [p.strip() for p in include_patterns.split(',')]
+    elif file_types in FILE_TYPE_GROUPS:
+        include_list = FILE_TYPE_GROUPS[file_types]
+    else:
+        include_list = [f"*.{p.strip()}" for p in file_types.split(',')] if file_types != "all" else ["*"]
+    
+    exclude_list = DEFAULT_EXCLUDE_PATTERNS.copy()
+    if exclude_patterns:
+        exclude_list.extend([p.strip() for p in exclude_patterns.split(',')])
+    
+    # Resume where the previous page stopped
+    fingerprint = _query_fingerprint(
+        search_term, base_path, case_sensitive=case_sensitive, whole_word=whole_word,
+        use_regex=use_regex, include=include_list, exclude=exclude_list, show_hidden=show_hidden,
+        respect_gitignore=respect_gitignore
+    )
+    resume_path: Optional[str] = None
+    resume_offset = 0
+    if cursor:
+        try:
+            position = SearchCursor.decode(cursor)
+        except ValueError as e:
+            raise SearchError(f"Invalid cursor: {e}")
+        if position.query != fingerprint:
+            raise SearchError("Cursor does not belong to this search; repeat the original query")
+        resume_path, resume_offset = position.file_path, position.offset
+    
+    # A repeated query is answered from the cache while the tree is unchanged
+    cache_key = (fingerprint, cursor or "", max_results, context_lines)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    snapshot = search_cache.snapshot(base_path)
+    file_mtimes = {}
+    
+    # Search files
+    matches = []
+    files_searched = 0
+    files_with_matches = 0
+    next_cursor: Optional[str] = None
+    
+    walker = create_walker(base_path, respect_gitignore=respect_gitignore, show_hidden=show_hidden,
+                           exclude_patterns=exclude_list, include_patterns=include_list,
+                           track_dirs=search_cache.enabled)
+    for rel_path, file_path in walker.walk(resume_from=resume_path):
+        if not is_text_file(file_path):
+            continue
         
-        # Walk through directory
-        for root, dirs, files in os.walk(base_path, topdown=True):
-            root_path = Path(root)
+        try:
+            decoded = read_text(file_path)
+            if decoded is None:
+                continue
+            files_searched += 1
+            content = decoded[0]
             
-            # Filter directories based on exclude patterns and hidden flag
-            dirs[:] = [d for d in dirs if not should_exclude_file(root_path / d, exclude_list) and (show_hidden or not d.startswith('.'))]
-
-            for file_name in files:
-                if not show_hidden and file_name.startswith('.'):
-                    continue
-                
-                file_path = root_path / file_name
-                
-                if not any(fnmatch.fnmatch(file_name, p) for p in include_list):
-                    continue
-                
-                if should_exclude_file(file_path, exclude_list):
-                    continue
-                
-                if not is_text_file(file_path):
-                    continue
-                
-                files_searched += 1
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                    
-                    file_has_match = False
-                    for line_num, line in enumerate(lines, 1):
-                        for match_obj in pattern.finditer(line):
-                            start_line = max(0, line_num - context_lines - 1)
-                            end_line = min(len(lines), line_num + context_lines)
-                            context = [f"{'   ' if i != line_num - 1 else '>> '}{i+1:4d}: {lines[i].rstrip()}" for i in range(start_line, end_line)]
-                            
-                            match = SearchMatch(
-                                file_path=str(file_path.relative_to(base_path)),
-                                line_number=line_num,
-                                column=match_obj.start() + 1,
-                                line_content=line.strip(),
-                                context_lines=context
-                            )
-                            matches.append(match)
-                            file_has_match = True
-                            if len(matches) >= max_results:
-                                break
-                    if file_has_match:
-                        files_with_matches += 1
-                except Exception:
-                    continue
-
+            skip_before = resume_offset if rel_path == resume_path else 0
+            
+            file_has_match = False
+            context_line, context = -1, []
+            for hit in matcher.finditer(content, skip_before):
                 if len(matches) >= max_results:
+                    # The page is full: remember the first match it could not hold
+                    next_cursor = SearchCursor(fingerprint, rel_path, hit.start).encode()
                     break
-            if len(matches) >= max_results:
-                break
-        
-        # Format results
-        if not matches:
-            return f"🔍 No matches found for '{search_term}' in {files_searched} files"
-        
-        result = f"🔍 **Search Results for '{search_term}'**\n"
-        result += f"Found {len(matches)} matches in {files_with_matches} files (searched {files_searched} files)\n\n"
-        
-        files_dict = {}
-        for match in matches:
-            if match.file_path not in files_dict:
-                files_dict[match.file_path] = []
-            files_dict[match.file_path].append(match)
-        
-        for file_path, file_matches in files_dict.items():
-            result += f"📄 **{file_path}** ({len(file_matches)} matches)\n"
-            for match in file_matches:
-                result += "\n".join(f"     {line}" for line in match.context_lines)
-                result += "\n---\n"
-        
-        if len(matches) >= max_results:
-            result += f"\n⚠️ Results limited to {max_results} matches. Consider refining your search."
-            
-        return result.strip()
+                
+                index, line_idx = hit.index, hit.line
+                text = index.line(line_idx)
+                if line_idx != context_line:
+                    # Context is built only for lines that really matched, once per line
+                    start_line = max(0, line_idx - context_lines)
+                    context = [
+                        f"{'   ' if i != line_idx else '>> '}{i+1:4d}: {line.rstrip()}"
+                        for i, line in enumerate(index.lines(start_line, line_idx + 1 + context_lines), start_line)
+                    ]
+                    context_line = line_idx
+                
+                column = hit.column
+                match = SearchMatch(
+                    file_path=rel_path,
+                    line_number=line_idx + 1,
+                    column=column + 1,
+                    line_content=text.strip(),
+                    highlighted_line=f"{text[:column]}**{hit.text}**{text[column + hit.end - hit.start:]}",
+                    context_lines=context
+                )
+                matches.append(match)
+                file_has_match = True
+            if file_has_match:
+                files_with_matches += 1
+            if file_has_match or file_path == base_path:
+                file_mtimes[str(file_path)] = file_path.stat().st_mtime_ns
+        except Exception:
+            continue
         
+        if next_cursor:
+            break
+    metrics.add("files_scanned", files_searched)
+    
+    results = SearchResults(
+        search_term=search_term,
+        matches=matches,
+        files_searched=files_searched,
+        files_with_matches=files_with_matches,
+        search_path=str(base_path),
+        options={
+            "case_sensitive": case_sensitive,
+            "whole_word": whole_word,
+            "use_regex": use_regex,
+            "file_types": file_types,
+            "max_results": max_results,
+            "context_lines": context_lines,
+            "respect_gitignore": respect_gitignore,
+        },
+        truncated=next_cursor is not None,
+        next_cursor=next_cursor
+    )
+    search_cache.put(cache_key, base_path, snapshot, results, walker.dir_mtimes or {}, file_mtimes)
+    return results
+
+
+def _format_search_text(results: SearchResults) -> str:
+    """Render search results as the Markdown report shown to agents"""
+    if not results.matches:
+        return f"🔍 No matches found for '{results.search_term}' in {results.files_searched} files"
+    
+    parts = [
+        f"🔍 **Search Results for '{results.search_term}'**\n",
+        f"Found {results.total_matches} matches in {results.files_with_matches} files "
+        f"(searched {results.files_searched} files)\n\n",
+    ]
+    
+    for file_path, file_matches in results.group_by_file().items():
+        parts.append(f"📄 **{file_path}** ({len(file_matches)} matches)\n")
+        for match in file_matches:
+            parts.append("\n".join(f"     {line}" for line in match.context_lines))
+            parts.append("\n---\n")
+    
+    if results.truncated:
+        parts.append(f"\n⚠️ Results limited to {results.options['max_results']} matches. "
+                     f"Repeat the search with cursor=\"{results.next_cursor}\" for the next page, "
+                     "or refine your search.")
+    
+    return "".join(parts).strip()
+
+
+def _search_adv_impl(
+    search_term: str,
+    search_path: str = ".",
+    case_sensitive: bool = False,
+    whole_word: bool = False,
+    use_regex: bool = False,
+    include_patterns: Optional[str] = None,
+    exclude_patterns: Optional[str] = None,
+    file_types: str = "all",
+    max_results: int = 1000,
+    context_lines: int = 2,
+    show_hidden: bool = False,
+    output_format: str = "text",
+    cursor: Optional[str] = None,
+    respect_gitignore: bool = True
+) -> str:
+    """Implementation for VSCode-like search across files and directories"""
+    if output_format not in OUTPUT_FORMATS:
+        return f"❌ Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+    
+    try:
+        results = _run_search(
+            search_term=search_term, search_path=search_path, case_sensitive=case_sensitive,
+            whole_word=whole_word, use_regex=use_regex, include_patterns=include_patterns,
+            exclude_patterns=exclude_patterns, file_types=file_types, max_results=max_results,
+            context_lines=context_lines, show_hidden=show_hidden, cursor=cursor,
+            respect_gitignore=respect_gitignore
+        )
+    except SearchError as e:
+        return to_json({"error": str(e)}) if output_format == "json" else f"❌ {e}"
     except Exception as e:
+        if output_format == "json":
+            return to_json({"error": f"Search error: {e}"})
         return f"❌ Search error: {str(e)}"
+    
+    if output_format == "json":
+        return to_json(results.to_dict())
+    return _format_search_text(results)
 
 
 # --- MCP Tool Registration ---
@@ -206,7 +310,7 @@ def register_search_tools(mcp: FastMCP):
     """Register advanced search tools with the MCP server."""
     
     @mcp.tool()
-    def search_in_files(search_pattern: str, directory: str = ".", file_pattern: str = "*", use_regex: bool = False) -> str:
+    async def search_in_files(search_pattern: str, directory: str = ".", file_pattern: str = "*", use_regex: bool = False) -> str:
         """
         Search for a text pattern across multiple files (like grep).
         
@@ -219,10 +323,13 @@ def register_search_tools(mcp: FastMCP):
         Returns:
             A string containing the file paths, line numbers, and content of matching lines.
         """
-        return _search_in_files_impl(search_pattern=search_pattern, directory=directory, file_pattern=file_pattern, use_regex=use_regex)
+        return await tool_executor.run(
+            "search_in_files", _search_in_files_impl, cpu_bound=True,
+            search_pattern=search_pattern, directory=directory, file_pattern=file_pattern, use_regex=use_regex
+        )
 
     @mcp.tool()
-    def search_adv(
+    async def search_adv(
         search_term: str,
         search_path: str = ".",
         case_sensitive: bool = False,
@@ -233,7 +340,11 @@ def register_search_tools(mcp: FastMCP):
         file_types: str = "all",
         max_results: int = 1000,
         context_lines: int = 2,
-        show_hidden: bool = False
+        show_hidden: bool = False,
+        output_format: str = "text",
+        cursor: Optional[str] = None,
+        respect_gitignore: bool = True,
+        profile: bool = False
     ) -> str:
         """
         Perform an advanced, VSCode-like search across files with extensive filtering.
@@ -250,13 +361,21 @@ def register_search_tools(mcp: FastMCP):
             max_results: The maximum number of individual matches to return.
             context_lines: Number of lines to show before and after the matching line.
             show_hidden: If True, searches in hidden files and directories (those starting with ".").
+            output_format: "text" for a Markdown report, or "json" for compact structured results.
+            cursor: The next_cursor token from a previous page of this same search, to resume after it.
+            respect_gitignore: If True, inside git repositories only tracked or unignored files are searched.
+            profile: If True, profiles this search and appends the slowest functions to the result.
 
         Returns:
-            A formatted string with detailed search results, including context for each match.
+            A formatted string with detailed search results, including context for each match,
+            or a JSON object with "matches" and search statistics. When more matches remain,
+            the results carry a next_cursor token for fetching the following page.
         """
-        return _search_adv_impl(
+        return await tool_executor.run(
+            "search_adv", _search_adv_impl, cpu_bound=True, profile=profile,
             search_term=search_term, search_path=search_path, case_sensitive=case_sensitive,
             whole_word=whole_word, use_regex=use_regex, include_patterns=include_patterns,
             exclude_patterns=exclude_patterns, file_types=file_types, max_results=max_results,
-            context_lines=context_lines, show_hidden=show_hidden
+            context_lines=context_lines, show_hidden=show_hidden, output_format=output_format,
+            cursor=cursor, respect_gitignore=respect_gitignore
         )
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Server introspection tools for MCP: per-tool latency, work counters and cache statistics.
+"""
+
+import os
+from typing import Any, Dict
+
+from mcp.server.fastmcp import FastMCP
+
+from ..core.config import OUTPUT_FORMATS
+from ..core.executor import tool_executor
+from ..core.metrics import metrics
+from ..core.patterns import pattern_cache
+from ..core.search_cache import search_cache
+from ..core.utils import to_json
+
+
+def _collect_metrics() -> Dict[str, Any]:
+    """Metrics snapshot together with cache and worker pool state"""
+    data = metrics.snapshot()
+    data["caches"] = {"patterns": pattern_cache.stats(), "search_results": search_cache.stats()}
+    data["executor"] = {"pid": os.getpid(),
+                        "worker_threads": tool_executor.max_workers,
+                        "process_workers": tool_executor.process_workers,
+                        "client_limit": tool_executor.client_limit,
+                        "in_flight": tool_executor.in_flight,
+                        "draining": tool_executor.draining}
+    return data
+
+
+def _get_server_metrics_impl(output_format: str = "text", dump: bool = False) -> str:
+    """Implementation for reporting server metrics"""
+    if output_format not in OUTPUT_FORMATS:
+        return f"❌ Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    data = _collect_metrics()
+    if dump:
+        data["dump_file"] = metrics.dump()
+    if output_format == "json":
+        return to_json(data)
+
+    if not data["enabled"]:
+        lines = ["📊 **Server metrics** (recording disabled; set MCP_METRICS=1)\n"]
+    else:
+        lines = [f"📊 **Server metrics** (up {data['uptime_seconds']:.0f}s)\n"]
+    for name, tool in data["tools"].items():
+        if not tool["calls"] and not tool["counters"]:
+            continue
+        line = f"- **{name}**: {tool['calls']} calls"
+        if tool["errors"]:
+            line += f", {tool['errors']} errors"
+        latency = tool.get("latency_ms")
+        if latency:
+            line += (f", mean {latency['mean']:.1f}ms, p50 ≤{latency['p50']:g}ms, "
+                     f"p95 ≤{latency['p95']:g}ms, max {latency['max']:.1f}ms")
+        if tool["counters"]:
+            line += "; " + ", ".join(f"{key} {value}" for key, value in tool["counters"].items())
+        lines.append(line)
+    for name, stats in data["caches"].items():
+        lines.append(f"- cache {name}: {stats['size']}/{stats['maxsize']} entries, "
+                     f"{stats['hits']} hits, {stats['misses']} misses")
+    if data.get("dump_file"):
+        lines.append(f"\nWrote Prometheus metrics to {data['dump_file']}")
+    return "\n".join(lines)
+
+
+def register_server_tools(mcp: FastMCP):
+    """Register server introspection tools with the MCP server."""
+
+    @mcp.tool()
+    async def get_server_metrics(output_format: str = "text", dump: bool = False) -> str:
+        """
+        Report per-tool call counts, latency percentiles and work counters.
+
+        Counters include bytes read and written, files scanned and cache hits and
+        misses, attributed to the tool that caused them. Percentiles are bucket
+        upper bounds.
+
+        Args:
+            output_format: "text" for a summary, or "json" for the full structured snapshot.
+            dump: If True, also write the metrics in Prometheus text format to MCP_METRICS_FILE.
+
+        Returns:
+            Metrics recorded since the server started.
+        """
+        return await tool_executor.run("get_server_metrics", _get_server_metrics_impl,
+                                       output_format=output_format, dump=dump)
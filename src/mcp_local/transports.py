@@ -0,0 +1,175 @@
+"""
+HTTP transports for MCP Local: streamable HTTP and SSE, served by uvicorn
+
+One process serves every client, so the caches, indexes and worker pools are
+shared between them. The first SIGINT or SIGTERM starts a drain: tool calls are
+refused while those already running get up to the drain timeout to finish,
+then the server closes its connections and exits. A second signal exits at once.
+
+One process runs Python code on one core at a time, so run_workers() can instead
+fork several processes that accept from one listening socket. The workers serve
+streamable HTTP statelessly, since any of them may receive a client's next
+request, and share the edit history, symbol definitions and change feed through
+the shared store; the parent only supervises them.
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from types import FrameType
+from typing import Dict, Optional, Tuple
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+from .core.executor import ToolExecutor, tool_executor
+from .core.metrics import metrics
+
+HTTP_TRANSPORTS = ("streamable-http", "sse")
+
+# Seconds left for idle streams to close once the tool calls have drained
+_CONNECTION_CLOSE_TIMEOUT = 2.0
+
+# A worker exiting this soon after it started is failing to start, not crashing
+_MIN_WORKER_UPTIME = 5.0
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that lets running tool calls finish before shutting down"""
+
+    def __init__(self, config: uvicorn.Config, executor: ToolExecutor = tool_executor,
+                 drain_timeout: float = 30.0):
+        super().__init__(config)
+        self.executor = executor
+        self.drain_timeout = drain_timeout
+        self.drain_deadline: Optional[float] = None
+
+    def begin_drain(self) -> None:
+        """Stop accepting tool calls and exit once the running ones finish"""
+        if self.drain_deadline is None:
+            self.executor.begin_drain()
+            self.drain_deadline = time.monotonic() + self.drain_timeout
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self.drain_deadline is None:
+            self.begin_drain()
+            return
+        self.force_exit = True
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_deadline is not None and (
+                not self.executor.in_flight or time.monotonic() >= self.drain_deadline):
+            return True
+        return await super().on_tick(counter)
+
+
+def create_app(mcp: FastMCP, transport: str):
+    """ASGI application serving the MCP server over the given HTTP transport"""
+    if transport not in HTTP_TRANSPORTS:
+        raise ValueError(f"Unknown HTTP transport '{transport}'. Use one of: {', '.join(HTTP_TRANSPORTS)}")
+    return mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+
+
+def _config(app, mcp: FastMCP) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+        timeout_graceful_shutdown=_CONNECTION_CLOSE_TIMEOUT,
+    )
+
+
+def run_http(mcp: FastMCP, transport: str, drain_timeout: float = 30.0,
+             executor: ToolExecutor = tool_executor) -> None:
+    """Serve the MCP server over HTTP at its configured host and port until stopped"""
+    DrainingServer(_config(create_app(mcp, transport), mcp), executor, drain_timeout).run()
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(config: uvicorn.Config, sock: socket.socket, number: int,
+                drain_timeout: float, executor: ToolExecutor) -> None:
+    """Body of a forked worker; never returns"""
+    # Its own process group keeps a terminal's Ctrl-C from reaching it twice
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if metrics.dump_path:
+        metrics.dump_path = f"{metrics.dump_path}.worker{number}"
+    code = 0
+    try:
+        DrainingServer(config, executor, drain_timeout).run(sockets=[sock])
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        executor.shutdown(wait=False)
+        metrics.dump()
+        os._exit(code)
+
+
+def run_workers(mcp: FastMCP, workers: int, drain_timeout: float = 30.0,
+                executor: ToolExecutor = tool_executor) -> None:
+    """Serve streamable HTTP from several forked workers sharing one socket until stopped
+
+    SIGINT and SIGTERM are passed on to the workers, which drain and exit; a
+    worker that dies on its own is replaced.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Multiple workers need os.fork(), which this platform lacks")
+    # Any worker may receive any request, so no session state can live in one of them
+    mcp.settings.stateless_http = True
+    config = _config(create_app(mcp, "streamable-http"), mcp)
+    sock = _listen(mcp.settings.host, mcp.settings.port)
+    children: Dict[int, Tuple[int, float]] = {}  # pid -> (worker number, start time)
+    stopping = False
+
+    def spawn(number: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(config, sock, number, drain_timeout, executor)
+        children[pid] = (number, time.monotonic())
+
+    def forward(sig: int, frame: Optional[FrameType]) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for number in range(workers):
+            spawn(number)
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            number, started = children.pop(pid, (None, 0.0))
+            if number is None or stopping:
+                continue
+            if time.monotonic() - started < _MIN_WORKER_UPTIME:
+                print(f"Worker {number} failed to start (status {status}); stopping", file=sys.stderr)
+                forward(signal.SIGTERM, None)
+                continue
+            print(f"Worker {number} exited (status {status}); restarting", file=sys.stderr)
+            spawn(number)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        sock.close()
@@ -0,0 +1,55 @@
+"""
+Tests for the benchmark suite
+"""
+
+from benchmarks.suite import Result, compare, main, run_suite
+from benchmarks.synthetic import PROFILES, generate_tree
+from mcp_local.services import backup_service, history_service
+from mcp_local.tools import file_editing
+
+
+def result(name, median):
+    return Result(name, "ops", 1, median, median, median, 5)
+
+
+class TestBenchmarkSuite:
+    """Tests for tree generation, baseline comparison and a quick run"""
+
+    def test_trees_are_reproducible(self, temp_dir):
+        """Test the same seed writes the same bytes with old timestamps"""
+        first = generate_tree(temp_dir / "a", PROFILES["quick"])
+        second = generate_tree(temp_dir / "b", PROFILES["quick"])
+
+        files = sorted(p.relative_to(first["root"]) for p in first["root"].rglob("*") if p.is_file())
+        assert files == sorted(p.relative_to(second["root"]) for p in second["root"].rglob("*") if p.is_file())
+        assert all((first["root"] / f).read_bytes() == (second["root"] / f).read_bytes() for f in files)
+        assert first["edit_target"].stat().st_mtime_ns == 0
+
+    def test_compare_scales_baseline(self):
+        """Test regressions are judged against the baseline scaled by calibration"""
+        baseline = {"calibration": 0.01, "results": [{"name": "read_file", "median": 0.010},
+                                                     {"name": "search_literal", "median": 0.100}]}
+        results = [result("read_file", 0.024), result("search_literal", 0.260), result("new", 1.0)]
+
+        regressions = compare(results, calibration=0.02, baseline=baseline, threshold=0.25)
+
+        assert [r.name for r in regressions] == ["search_literal"]
+        assert round(regressions[0].slowdown, 2) == 0.3
+
+    def test_quick_run(self, temp_dir, monkeypatch):
+        """Test every benchmark runs on the quick tree and the CLI compares with a baseline"""
+        monkeypatch.setattr(backup_service, "backup_dir", temp_dir / "shared_backups")
+        edits = len(history_service.get_history())
+        results = run_suite(temp_dir / "run", PROFILES["quick"], repeat=1, warmup=0)
+        assert not (temp_dir / "shared_backups").exists()
+        assert len(history_service.get_history()) == edits
+        assert file_editing.backup_service is backup_service
+        assert file_editing.history_service is history_service
+        baseline = temp_dir / "baseline.json"
+
+        assert [r.name for r in results] == ["search_literal", "search_regex", "search_cached", "read_file",
+                                             "edit_file_lines", "insert_delete_lines", "create_backup"]
+        assert all(r.median > 0 and r.throughput > 0 for r in results)
+        assert main(["--profile", "quick", "--repeat", "1", "--baseline", str(baseline), "--save"]) == 0
+        assert main(["--profile", "quick", "--repeat", "1", "--baseline", str(baseline),
+                     "--threshold", "1000"]) == 0
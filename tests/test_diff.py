@@ -0,0 +1,154 @@
+"""
+Tests for the line diff engine and the diff tools
+"""
+
+import asyncio
+import difflib
+import random
+
+import pytest
+
+from mcp_local.core import diff
+from mcp_local.core.diff import matching_blocks, unified_diff
+from mcp_local.server import create_server
+from mcp_local.services import backup_service, file_service
+from mcp_local.tools.file_editing import GetFileDiffTool
+
+
+def patch(a, diff_lines):
+    """Apply unified diff lines (as produced with lineterm="") to a"""
+    result, position = [], 0
+    for line in diff_lines:
+        if line.startswith(("---", "+++")):
+            continue
+        if line.startswith("@@"):
+            start = int(line.split()[1][1:].split(",")[0])
+            length = line.split()[1].split(",")
+            target = start if len(length) > 1 and length[1] == "0" else start - 1
+            result.extend(a[position:target])
+            position = target
+        elif line[0] == " ":
+            assert a[position] == line[1:]
+            result.append(a[position])
+            position += 1
+        elif line[0] == "-":
+            assert a[position] == line[1:]
+            position += 1
+        else:
+            result.append(line[1:])
+    return result + a[position:]
+
+
+def mutate(rng, lines, alphabet):
+    lines = list(lines)
+    for _ in range(rng.randrange(8)):
+        op = rng.random()
+        if op < 0.4 and lines:
+            del lines[rng.randrange(len(lines))]
+        elif op < 0.8:
+            lines.insert(rng.randrange(len(lines) + 1), str(rng.randrange(alphabet)))
+        elif lines:
+            lines[rng.randrange(len(lines))] = "changed"
+    return lines
+
+
+class TestDiffEngine:
+    """Tests for matching blocks and unified output"""
+
+    def test_matches_difflib_format(self):
+        """Test headers, ranges and context lines follow difflib.unified_diff"""
+        a = [f"line {i}" for i in range(20)]
+        b = a[:2] + ["new"] + a[3:15] + a[16:] + ["tail"]
+
+        ours = list(unified_diff(a, b, "a.txt", "b.txt", n=2, lineterm=""))
+
+        assert ours == list(difflib.unified_diff(a, b, "a.txt", "b.txt", n=2, lineterm=""))
+
+    def test_identical_and_empty(self):
+        """Test equal inputs produce no output and empty sides diff cleanly"""
+        assert list(unified_diff(["x"], ["x"])) == []
+        assert list(unified_diff([], [], lineterm="")) == []
+        assert list(unified_diff([], ["x"], lineterm="")) == ["--- ", "+++ ", "@@ -0,0 +1 @@", "+x"]
+
+    @pytest.mark.parametrize("alphabet", [2, 5, 50])
+    def test_random_edits_round_trip(self, alphabet):
+        """Test blocks really match and the diff turns a into b"""
+        rng = random.Random(alphabet)
+        for _ in range(300):
+            a = [str(rng.randrange(alphabet)) for _ in range(rng.randrange(40))]
+            b = mutate(rng, a, alphabet)
+
+            blocks = matching_blocks(a, b)
+            for (i, j, size), (i2, j2, _) in zip(blocks, blocks[1:]):
+                assert a[i:i + size] == b[j:j + size]
+                assert i + size <= i2 and j + size <= j2
+            assert blocks[-1] == (len(a), len(b), 0)
+            assert patch(a, list(unified_diff(a, b, n=rng.randrange(4), lineterm=""))) == b
+
+    def test_large_rewrite_uses_anchors(self):
+        """Test a large file with scattered edits keeps every untouched line"""
+        a = [f"row {i}" for i in range(20000)]
+        b = list(a)
+        for i in range(0, len(b), 10):
+            b[i] = f"edited {i}"
+
+        blocks = matching_blocks(a, b)
+
+        assert sum(size for _, _, size in blocks) == 18000
+        assert patch(a, list(unified_diff(a, b, lineterm=""))) == b
+
+    @pytest.mark.parametrize("swap", [False, True])
+    def test_repetitive_input_stays_bounded(self, swap, monkeypatch):
+        """Test blocks of one repeated line stop bisecting after a few give-ups and still diff correctly"""
+        a = ["x"] * 50000 + ["y"] * 50000
+        b = ["y"] * 50000 + ["x"] * 50000
+        if swap:
+            a, b = b, a
+        calls = []
+        real_bisect = diff._bisect
+
+        def counting(*args):
+            result = real_bisect(*args)
+            calls.append(result[2])
+            return result
+
+        monkeypatch.setattr(diff, "_bisect", counting)
+
+        assert patch(a, list(unified_diff(a, b, lineterm=""))) == b
+        assert calls.count(False) == diff._MAX_GIVE_UPS
+        assert len(calls) < 2 * diff._MAX_GIVE_UPS
+
+
+class TestDiffTools:
+    """Tests for get_file_diff and get_files_diff"""
+
+    def test_diff_against_latest_backup(self, temp_dir):
+        """Test the diff shows the change made since the backup"""
+        path = temp_dir / f"{temp_dir.name}_notes.txt"
+        path.write_text("one\ntwo\nthree\n")
+        backup_service.create_backup(str(path))
+        file_service.write_file(str(path), "one\n2\nthree\n")
+
+        result = GetFileDiffTool().execute(str(path), context_lines=0)
+
+        assert "@@ -2 +2 @@" in result
+        assert "-two\n+2" in result
+
+    def test_many_files_in_one_call(self, temp_dir):
+        """Test each file gets its own section, in the order given"""
+        paths = []
+        for name in ("first.txt", "second.txt"):
+            path = temp_dir / f"{temp_dir.name}_{name}"
+            path.write_text("old\n")
+            backup_service.create_backup(str(path))
+            file_service.write_file(str(path), f"new {name}\n")
+            paths.append(str(path))
+        server = create_server("test-server")
+
+        result = asyncio.run(server.call_tool("get_files_diff", {
+            "file_paths": paths + [str(temp_dir / "missing.txt")]}))
+        text = "".join(getattr(item, "text", "") for item in result)
+
+        assert text.index("=== " + paths[0]) < text.index("+new first.txt") < text.index("=== " + paths[1])
+        assert "+new second.txt" in text
+        assert "missing.txt' does not exist" in text
@@ -0,0 +1,85 @@
+"""
+Tests for encoding detection and the decoding read path
+"""
+
+import codecs
+
+import pytest
+
+from mcp_local.core.encoding import (
+    clear_encoding_cache, detect_encoding, get_cached_encoding, read_text, sniff_encoding
+)
+from mcp_local.services import file_service
+from mcp_local.tools.search_tools import _search_adv_impl
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_encoding_cache()
+    yield
+    clear_encoding_cache()
+
+
+class TestSniffEncoding:
+    """Tests for sniff_encoding"""
+
+    def test_boms(self):
+        """Test byte-order marks take precedence"""
+        assert sniff_encoding(codecs.BOM_UTF8 + b"abc") == "utf-8-sig"
+        assert sniff_encoding("abc".encode("utf-16")) == "utf-16"
+        assert sniff_encoding("abc".encode("utf-32")) == "utf-32"
+
+    def test_utf8_and_legacy(self):
+        """Test UTF-8 samples, truncated characters and legacy fallbacks"""
+        assert sniff_encoding("héllo".encode("utf-8")) == "utf-8"
+        assert sniff_encoding("héllo".encode("utf-8")[:2]) == "utf-8"
+        assert sniff_encoding("café crème".encode("cp1252")) in ("cp1252", "latin-1", "iso8859-1",
+                                                                   "windows-1252")
+
+    def test_bomless_utf16_and_binary(self):
+        """Test NUL layouts distinguish UTF-16 text from binary noise"""
+        assert sniff_encoding("plain text".encode("utf-16-le")) == "utf-16-le"
+        assert sniff_encoding("plain text".encode("utf-16-be")) == "utf-16-be"
+        assert sniff_encoding(b"\x00\x01\x02\x03\xff\x00\x10\x00\x00\x00") is None
+
+
+class TestReadText:
+    """Tests for the single-pass read path"""
+
+    def test_latin1_file_round_trip(self, temp_dir, reset_services):
+        """Test non-UTF-8 files are read and written back in their own encoding"""
+        path = temp_dir / "legacy.txt"
+        path.write_bytes("naïve café\n".encode("cp1252"))
+
+        assert file_service.read_file(str(path)) == "naïve café\n"
+        file_service.write_file(str(path), "naïve café au lait\n")
+        assert path.read_bytes() == "naïve café au lait\n".encode("cp1252")
+
+    def test_detection_is_cached(self, temp_dir):
+        """Test the detected encoding is cached until the file changes"""
+        path = temp_dir / "bom.txt"
+        path.write_bytes(codecs.BOM_UTF8 + b"hello\r\nworld\r\n")
+
+        text, encoding = read_text(path)
+        assert text == "hello\nworld\n"
+        assert encoding == "utf-8-sig"
+        assert get_cached_encoding(path) == "utf-8-sig"
+        assert detect_encoding(path) == "utf-8-sig"
+
+    def test_binary_file_rejected(self, temp_dir):
+        """Test binary files are reported rather than decoded"""
+        path = temp_dir / "blob.bin"
+        path.write_bytes(bytes(range(256)) * 4)
+
+        assert read_text(path) is None
+        with pytest.raises(Exception, match="binary"):
+            file_service.read_file(str(path))
+
+    def test_search_matches_non_utf8_text(self, temp_dir):
+        """Test search decodes legacy encodings instead of dropping bytes"""
+        (temp_dir / "notes.txt").write_bytes("Grüße aus Köln\n".encode("cp1252"))
+
+        result = _search_adv_impl("Köln", search_path=str(temp_dir))
+
+        assert "notes.txt" in result
+        assert "Grüße aus Köln" in result
@@ -0,0 +1,72 @@
+"""
+Tests for asynchronous tool execution
+"""
+
+import asyncio
+import threading
+import time
+
+from mcp_local.core.executor import ToolExecutor
+from mcp_local.server import create_server
+
+
+class TestToolExecutor:
+    """Tests for ToolExecutor"""
+
+    def test_runs_off_the_event_loop(self):
+        """Test blocking calls run on worker threads and overlap"""
+        executor = ToolExecutor(max_workers=4, concurrency_limits={})
+
+        async def main():
+            loop_thread = threading.get_ident()
+            started = time.perf_counter()
+            threads = await asyncio.gather(*[
+                executor.run("sleepy", lambda: (time.sleep(0.1), threading.get_ident())[1])
+                for _ in range(4)
+            ])
+            return loop_thread, threads, time.perf_counter() - started
+
+        try:
+            loop_thread, threads, elapsed = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert loop_thread not in threads
+        assert elapsed < 0.35
+
+    def test_per_tool_limit_serializes(self):
+        """Test a limit of one never runs two calls of the same tool at once"""
+        executor = ToolExecutor(max_workers=4, concurrency_limits={"edit": 1})
+        active = []
+        peak = []
+
+        def work():
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.02)
+            active.pop()
+
+        async def main():
+            await asyncio.gather(*[executor.run("edit", work) for _ in range(5)])
+
+        try:
+            asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert max(peak) == 1
+
+
+class TestRegisteredTools:
+    """Tests for the async tool wrappers registered on the server"""
+
+    def test_call_tool_through_server(self, sample_file):
+        """Test a registered tool runs through the executor and returns its text"""
+        server = create_server("test-server")
+
+        result = asyncio.run(server.call_tool("get_file_lines", {
+            "file_path": str(sample_file), "start_line": 2, "end_line": 2
+        }))
+
+        text = "".join(getattr(item, "text", "") for item in result)
+        assert "Line 2" in text
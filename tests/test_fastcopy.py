@@ -0,0 +1,202 @@
+"""
+Tests for the fast copy mechanisms and the bulk copy and move tools
+"""
+
+import errno
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from mcp_local.core import fastcopy
+from mcp_local.core.locks import path_locks
+from mcp_local.tools.file_operations import CopyPathsTool, MovePathsTool
+
+file_module = sys.modules["mcp_local.services.file_service"]
+
+
+@pytest.fixture
+def tree(temp_dir):
+    src = temp_dir / "src"
+    (src / "a" / "b").mkdir(parents=True)
+    (src / "a" / "b" / "big.bin").write_bytes(os.urandom(300_000))
+    (src / "top.txt").write_text("top\n")
+    (src / "empty.txt").write_text("")
+    (src / "run.sh").write_text("#!/bin/sh\n")
+    (src / "run.sh").chmod(0o750)
+    os.utime(src / "top.txt", (1_000_000_000, 1_000_000_000))
+    os.symlink("top.txt", src / "link")
+    return src
+
+
+@pytest.fixture(autouse=True)
+def fresh_refusals(monkeypatch):
+    monkeypatch.setattr(fastcopy, "_refused", {})
+
+
+class TestCopyFile:
+    """Tests for copying one file's content"""
+
+    def test_copies_content_mode_and_times(self, tree, temp_dir):
+        """Test content, mode and mtime all survive the copy"""
+        size, method = fastcopy.copy_file(tree / "run.sh", temp_dir / "copy.sh")
+        assert size == len("#!/bin/sh\n")
+        assert method in ("clone", "copy_file_range", "sendfile", "read")
+        assert (temp_dir / "copy.sh").read_text() == "#!/bin/sh\n"
+        assert (temp_dir / "copy.sh").stat().st_mode & 0o777 == 0o750
+
+        fastcopy.copy_file(tree / "top.txt", temp_dir / "copy.txt")
+        assert (temp_dir / "copy.txt").stat().st_mtime == 1_000_000_000
+
+    def test_refused_mechanisms_fall_back_and_are_remembered(self, tree, temp_dir, monkeypatch):
+        """Test a mechanism that refuses falls through to the next and is skipped afterwards"""
+        calls = []
+
+        def refuse(*args):
+            calls.append(args)
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(fastcopy, "_clone", refuse)
+        monkeypatch.setattr(fastcopy, "_copy_file_range", refuse)
+        monkeypatch.setattr(fastcopy, "_sendfile", refuse)
+        source = tree / "a" / "b" / "big.bin"
+
+        assert fastcopy.copy_file(source, temp_dir / "one.bin") == (300_000, "read")
+        tried = len(calls)
+        assert fastcopy.copy_file(source, temp_dir / "two.bin") == (300_000, "read")
+        assert len(calls) == tried
+        assert (temp_dir / "two.bin").read_bytes() == source.read_bytes()
+
+    def test_failure_after_writing_is_not_hidden(self, tree, temp_dir, monkeypatch):
+        """Test an error once bytes were written raises instead of falling back"""
+        def partial(src_fd, dst_fd, count):
+            os.write(dst_fd, b"x")
+            raise OSError(errno.EINVAL, "Invalid argument")
+
+        monkeypatch.setattr(fastcopy, "_clone", lambda *args: (_ for _ in ()).throw(OSError(errno.ENOTTY, "")))
+        monkeypatch.setattr(fastcopy, "_copy_file_range", partial)
+        with pytest.raises(OSError):
+            fastcopy.copy_file(tree / "top.txt", temp_dir / "broken.txt")
+
+
+class TestCopyPathsTool:
+    """Tests for the copy_paths tool"""
+
+    def test_copies_tree_with_links_and_progress(self, tree, temp_dir):
+        """Test a tree is copied whole, links stay links and progress reaches the total"""
+        reports = []
+        result = json.loads(CopyPathsTool().execute([str(tree)], str(temp_dir / "dst"), output_format="json",
+                                                    progress=lambda done, total: reports.append((done, total))))
+
+        dst = temp_dir / "dst"
+        assert result["errors"] == []
+        assert result["files"] == 4
+        assert (dst / "a" / "b" / "big.bin").read_bytes() == (tree / "a" / "b" / "big.bin").read_bytes()
+        assert os.readlink(dst / "link") == "top.txt"
+        assert (dst / "run.sh").stat().st_mode & 0o777 == 0o750
+        assert reports[-1] == (result["bytes"], result["bytes"])
+
+    def test_several_sources_go_into_destination(self, tree, temp_dir):
+        """Test several sources are copied into the destination directory"""
+        result = CopyPathsTool().execute([str(tree / "top.txt"), str(tree / "a")], str(temp_dir / "out"))
+        assert "Copied 2 item(s)" in result
+        assert (temp_dir / "out" / "top.txt").read_text() == "top\n"
+        assert (temp_dir / "out" / "a" / "b" / "big.bin").exists()
+
+    def test_existing_target_needs_overwrite(self, tree, temp_dir):
+        """Test an existing target is reported unless overwrite is set"""
+        target = temp_dir / "top.txt"
+        target.write_text("old")
+        result = CopyPathsTool().execute([str(tree / "top.txt")], str(target))
+        assert "already exists" in result
+        assert target.read_text() == "old"
+
+        CopyPathsTool().execute([str(tree / "top.txt")], str(target), overwrite=True)
+        assert target.read_text() == "top\n"
+
+    def test_symlink_source_is_copied_as_a_link(self, tree, temp_dir):
+        """Test a link given as source is recreated as a link, not replaced by its target"""
+        result = json.loads(CopyPathsTool().execute([str(tree / "link")], str(temp_dir / "copy"),
+                                                    output_format="json"))
+        assert result["errors"] == []
+        assert os.readlink(temp_dir / "copy") == "top.txt"
+        assert (tree / "link").is_symlink()
+
+    def test_opposite_overwriting_copies_finish(self, temp_dir, monkeypatch):
+        """Test two files copied onto each other at the same time do not deadlock"""
+        left, right = temp_dir / "left.txt", temp_dir / "right.txt"
+        left.write_text("left")
+        right.write_text("right")
+        checkout = path_locks._checkout
+
+        def slow_checkout(key):
+            time.sleep(0.05)  # Both copies get their first lock before either asks for its second
+            return checkout(key)
+
+        monkeypatch.setattr(path_locks, "_checkout", slow_checkout)
+        threads = [threading.Thread(target=CopyPathsTool().execute, args=([str(src)], str(dst), True), daemon=True)
+                   for src, dst in ((left, right), (right, left))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert not any(thread.is_alive() for thread in threads)
+
+    def test_directory_into_itself(self, tree):
+        """Test copying a directory inside itself is refused"""
+        result = json.loads(CopyPathsTool().execute([str(tree)], str(tree / "a" / "inner"), output_format="json"))
+        assert "inside itself" in result["errors"][0]["error"]
+
+
+class TestMovePathsTool:
+    """Tests for the move_paths tool"""
+
+    def test_same_filesystem_is_a_rename(self, tree, temp_dir):
+        """Test a move on one filesystem renames without copying"""
+        inode = (tree / "a" / "b" / "big.bin").stat().st_ino
+        result = json.loads(MovePathsTool().execute([str(tree)], str(temp_dir / "moved"), output_format="json"))
+        assert result["methods"] == {"rename": 1}
+        assert not tree.exists()
+        assert (temp_dir / "moved" / "a" / "b" / "big.bin").stat().st_ino == inode
+
+    def test_symlink_source_is_moved_as_a_link(self, tree, temp_dir):
+        """Test moving a link moves the link and leaves its target in place"""
+        (temp_dir / "dst").mkdir()
+        MovePathsTool().execute([str(tree / "link")], str(temp_dir / "dst"))
+        assert os.readlink(temp_dir / "dst" / "link") == "top.txt"
+        assert not (tree / "link").is_symlink()
+        assert (tree / "top.txt").read_text() == "top\n"
+
+    def test_cross_device_copies_then_removes(self, tree, temp_dir, monkeypatch):
+        """Test EXDEV falls back to a copy and removes the source afterwards"""
+        def cross_device(src, dst):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(file_module.os, "replace", cross_device)
+        result = json.loads(MovePathsTool().execute([str(tree)], str(temp_dir / "moved"), output_format="json"))
+        item = result["items"][0]
+        assert item["method"] == "copy" and item["source_removed"] is True
+        assert not tree.exists()
+        assert (temp_dir / "moved" / "top.txt").read_text() == "top\n"
+        assert os.readlink(temp_dir / "moved" / "link") == "top.txt"
+
+    def test_failed_copy_keeps_source(self, tree, temp_dir, monkeypatch):
+        """Test the source stays when part of the fallback copy failed"""
+        monkeypatch.setattr(file_module.os, "replace",
+                            lambda src, dst: (_ for _ in ()).throw(OSError(errno.EXDEV, "")))
+        real_copy = fastcopy.copy_file
+
+        def flaky(src, dst, on_bytes=None):
+            if src.name == "big.bin":
+                raise OSError(errno.ENOSPC, "No space left on device")
+            return real_copy(src, dst, on_bytes)
+
+        monkeypatch.setattr(fastcopy, "copy_file", flaky)
+        result = MovePathsTool().execute([str(tree)], str(temp_dir / "moved"))
+        assert "source kept" in result
+        assert "No space left" in result
+        assert (tree / "a" / "b" / "big.bin").exists()
@@ -2,11 +2,14 @@
 Tests for file operations tools
 """
 
+import json
+
 import pytest
 from pathlib import Path
 
 from mcp_local.tools.file_operations import (
-    ListFilesTool, ReadFileTool, WriteFileTool, GetFileLinesTool, GetFileInfoTool
+    ListFilesTool, ReadFileTool, ReadFilesTool, WriteFileTool, GetFileLinesTool, GetFileInfoTool,
+    GetFilesInfoTool
 )
 
 
@@ -46,6 +49,24 @@ class TestListFilesTool:
         result_with_hidden = tool.execute(directory=str(temp_dir), show_hidden=True)
         assert ".hidden" in result_with_hidden
         assert "visible.txt" in result_with_hidden
+    
+    def test_list_files_json(self, temp_dir):
+        """Test structured listing output"""
+        (temp_dir / "file1.txt").write_text("content1")
+        (temp_dir / "subdir").mkdir()
+        
+        tool = ListFilesTool()
+        data = json.loads(tool.execute(directory=str(temp_dir), output_format="json"))
+        
+        assert [item["name"] for item in data["items"]] == ["subdir", "file1.txt"]
+        assert data["items"][1]["size"] == 8
+    
+    def test_list_files_unknown_format(self, temp_dir):
+        """Test an unsupported output format is rejected"""
+        tool = ListFilesTool()
+        result = tool.execute(directory=str(temp_dir), output_format="xml")
+        
+        assert "Unknown output format" in result
 
 
 class TestReadFileTool:
@@ -146,3 +167,125 @@ class TestGetFileInfoTool:
         
         assert "Type: Directory" in result
         assert "Name:" in result
+    
+    def test_get_file_info_json(self, sample_file):
+        """Test structured file information"""
+        tool = GetFileInfoTool()
+        info = json.loads(tool.execute(file_path=str(sample_file), output_format="json"))
+        
+        assert info["name"] == sample_file.name
+        assert info["is_file"] is True
+        assert info["size"] == sample_file.stat().st_size
+    
+    def test_get_file_info_symlink(self, sample_file, temp_dir):
+        """Test a link is described by its target and flagged as a link"""
+        link = temp_dir / "link.txt"
+        link.symlink_to(sample_file)
+        info = json.loads(GetFileInfoTool().execute(file_path=str(link), output_format="json"))
+        
+        assert info["is_symlink"] is True
+        assert info["is_file"] is True
+        assert info["size"] == sample_file.stat().st_size
+
+
+class TestGetFilesInfoTool:
+    """Tests for GetFilesInfoTool"""
+    
+    def test_records_in_request_order(self, temp_dir, sample_file):
+        """Test many paths come back in order with missing ones reported"""
+        paths = []
+        for i in range(150):
+            path = temp_dir / f"f{i}.txt"
+            path.write_text("x" * i)
+            paths.append(str(path))
+        paths.insert(75, str(temp_dir / "missing.txt"))
+        paths.append(str(temp_dir))
+        
+        records = json.loads(GetFilesInfoTool().execute(paths, output_format="json"))["files"]
+        
+        assert [record["path"] for record in records] == paths
+        assert records[75] == {"path": str(temp_dir / "missing.txt"), "error": "not found"}
+        assert [record["size"] for record in records[:75]] == list(range(75))
+        assert records[-1]["type"] == "dir"
+        assert records[0]["mtime_ns"] == Path(paths[0]).stat().st_mtime_ns
+    
+    def test_symlinks(self, temp_dir, sample_file):
+        """Test links are followed and flagged, described themselves, or reported broken"""
+        (temp_dir / "link").symlink_to(sample_file)
+        (temp_dir / "dangling").symlink_to(temp_dir / "nowhere")
+        paths = [str(temp_dir / "link"), str(temp_dir / "dangling")]
+        
+        followed = json.loads(GetFilesInfoTool().execute(paths, output_format="json"))["files"]
+        assert followed[0]["type"] == "file" and followed[0]["symlink"] is True
+        assert followed[1]["broken"] is True
+        
+        own = json.loads(GetFilesInfoTool().execute(paths, follow_symlinks=False, output_format="json"))["files"]
+        assert [record["type"] for record in own] == ["symlink", "symlink"]
+    
+    def test_text_output(self, sample_file):
+        """Test the text listing shows one line per path"""
+        result = GetFilesInfoTool().execute([str(sample_file), "/nonexistent/x"])
+        
+        assert "Information for 2 path(s)" in result
+        assert f"- {sample_file}  file" in result
+        assert "❌ /nonexistent/x: not found" in result
+
+
+class TestReadFilesTool:
+    """Tests for ReadFilesTool"""
+    
+    def test_read_files_ranges_and_errors(self, sample_file, temp_dir):
+        """Test whole files, line ranges and failures come back in request order"""
+        tool = ReadFilesTool()
+        data = json.loads(tool.execute(
+            files=[str(sample_file), {"path": str(sample_file), "start_line": 2, "end_line": 3},
+                   str(temp_dir / "missing.txt")],
+            output_format="json"))
+        
+        whole, part, missing = data["files"]
+        assert whole["content"] == sample_file.read_text()
+        assert (part["start_line"], part["end_line"], part["content"]) == (2, 3, "Line 2\nLine 3\n")
+        assert part["version"] == whole["version"]
+        assert "does not exist" in missing["error"]
+        assert data["budget_exhausted"] is False
+    
+    def test_read_files_byte_budget(self, temp_dir):
+        """Test content stops at the budget, truncating at a line and skipping the rest"""
+        paths = []
+        for i in range(4):
+            path = temp_dir / f"f{i}.txt"
+            path.write_text("".join(f"{i}{n:04d}\n" for n in range(10)))  # 6 bytes per line
+            paths.append(str(path))
+        tool = ReadFilesTool()
+        
+        data = json.loads(tool.execute(files=paths, max_bytes=90, output_format="json"))
+        
+        assert data["bytes"] == 90
+        assert [entry.get("end_line") for entry in data["files"][:2]] == [10, 5]
+        assert data["files"][1]["truncated"] is True
+        assert [entry.get("skipped") for entry in data["files"][2:]] == [True, True]
+        
+        text = tool.execute(files=paths, max_bytes=90)
+        assert "Lines 1-5 of" in text
+        assert "1 file(s) truncated, 2 skipped" in text
+    
+    def test_read_files_text_format(self, sample_file):
+        """Test text output numbers lines and carries the version token"""
+        result = ReadFilesTool().execute(files=[{"path": str(sample_file), "start_line": 4}])
+        
+        assert "Lines 4-5 of" in result
+        assert "   4: Line 4" in result
+        assert "Version: hash=" in result
+    
+    def test_read_files_rejects_empty_and_bad_format(self, sample_file):
+        """Test an empty request and an unknown format are errors"""
+        tool = ReadFilesTool()
+        assert tool.execute(files=[]).startswith("Error")
+        assert "Unknown output format" in tool.execute(files=[str(sample_file)], output_format="xml")
+    
+    def test_read_files_rejects_non_positive_budget(self, sample_file):
+        """Test a zero or negative max_bytes is an error rather than an empty read"""
+        tool = ReadFilesTool()
+        assert "max_bytes must be positive" in tool.execute(files=[str(sample_file)], max_bytes=-5)
+        assert "max_bytes must be positive" in json.loads(
+            tool.execute(files=[str(sample_file)], max_bytes=0, output_format="json"))["error"]
@@ -0,0 +1,192 @@
+"""
+Tests for fuzzy path matching and the find_files index
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+from mcp_local.core import fuzzy
+from mcp_local.core.fuzzy import FuzzyPathSet, rank, score_path
+from mcp_local.services import file_service
+from mcp_local.services.path_index_service import PathIndexService
+from mcp_local.tools import navigation_tools
+from mcp_local.tools.navigation_tools import _find_files_impl
+
+
+def is_subsequence(query, path):
+    chars = iter(path.lower())
+    return all(char in chars for char in query.lower())
+
+
+def random_paths(rnd, count):
+    words = ["src", "lib", "core", "Test", "util", "cfg", "a", "io", "x_y", "Main"]
+    paths = set()
+    while len(paths) < count:
+        depth = rnd.randint(0, 3)
+        parts = [rnd.choice(words) for _ in range(depth)]
+        parts.append(rnd.choice(words) + rnd.choice(["", ".py", ".md", "-2.txt"]))
+        paths.add("/".join(parts))
+    return sorted(paths)
+
+
+class TestFuzzyPathSet:
+    """Tests for candidate selection and scoring"""
+
+    @pytest.mark.parametrize("vectorized", [True, False])
+    def test_candidates_are_exactly_the_subsequence_matches(self, vectorized):
+        """Test every path containing the query in order is found, and nothing else"""
+        rnd = random.Random(37)
+        paths = random_paths(rnd, 400)
+        path_set = FuzzyPathSet(paths)
+        path_set._vectorized = path_set._vectorized and vectorized
+        for query in ["s", "cfg", "src/c", "tst", "maIN.p", "x_", "l/u", "zz", "a/a/a", "ioio.md"]:
+            expected = {p for p in paths if is_subsequence(query, p)}
+            found = path_set.candidates(query, limit=len(paths))
+            assert sorted(found) == sorted(expected), query
+
+    def test_limit_prefers_matches_in_the_file_name(self):
+        """Test the cheap pre-rank keeps name matches when candidates are cut"""
+        paths = [f"config/dir{i}/readme.md" for i in range(50)] + ["docs/config.py"]
+
+        assert FuzzyPathSet(paths).candidates("config", limit=1) == ["docs/config.py"]
+
+    def test_ranking(self):
+        """Test word starts, contiguous runs and file names rank first"""
+        paths = ["src/server/config.py", "docs/serving-recipes/cfg.md", "src/services/reverse_config.py",
+                 "tests/test_gitignore.py", "tests/fixtures/tst_git/ignore.txt"]
+
+        assert rank("srvcfg", paths, 1)[0].path == "src/server/config.py"
+        assert rank("tstgitign", paths, 1)[0].path == "tests/test_gitignore.py"
+        assert rank("config", paths, 1)[0].path == "src/server/config.py"
+
+    def test_positions(self):
+        """Test matched positions point at the query characters"""
+        match = score_path("wlk", "core/walk.py")
+
+        assert [match.path[i] for i in match.positions] == ["w", "l", "k"]
+        assert score_path("zz", "core/walk.py") is None
+
+
+class TestPathIndex:
+    """Tests for the incrementally maintained path index"""
+
+    @pytest.fixture
+    def service(self):
+        return PathIndexService()
+
+    @pytest.fixture
+    def tree(self, temp_dir):
+        for name in ("src/app.py", "src/util/helpers.py", "README.md", ".cache/pkg/index.js"):
+            (temp_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / name).write_text("x\n")
+        return temp_dir.resolve()
+
+    def test_indexes_candidate_files(self, service, tree):
+        """Test the index holds the same files a search walk would visit"""
+        index = service.get_index(tree)
+
+        assert sorted(index.paths()) == ["README.md", "src/app.py", "src/util/helpers.py"]
+        assert len(index) == 3
+
+    def test_own_writes_are_seen_immediately(self, service, tree):
+        """Test files written, moved and deleted through the services update the index"""
+        service.get_index(tree, respect_gitignore=False)
+        file_service.write_file(str(tree / "src/new/widget.py"), "pass\n")
+        file_service.move_file(str(tree / "src/app.py"), str(tree / "src/main.py"))
+        file_service.delete_file(str(tree / "README.md"))
+
+        index = service.get_index(tree, respect_gitignore=False)
+        assert sorted(index.paths()) == ["src/main.py", "src/new/widget.py", "src/util/helpers.py"]
+        assert [m.path for m in index.search("widg", 5)] == ["src/new/widget.py"]
+        assert index.search("readme", 5) == []
+
+    def test_outside_changes_are_polled(self, service, tree):
+        """Test changes by other processes show up after a directory mtime sweep"""
+        index = service.get_index(tree)
+        (tree / "src/util/extra.py").write_text("x\n")
+        os.remove(tree / "src/util/helpers.py")
+        (tree / "docs").mkdir()
+        (tree / "docs/guide.md").write_text("x\n")
+        # Make the change visible even on filesystems with coarse timestamps
+        os.utime(tree / "src/util", ns=(0, 0))
+        os.utime(tree, ns=(0, 0))
+
+        index.refresh(poll_interval=0)
+        assert sorted(index.paths()) == ["README.md", "docs/guide.md", "src/app.py", "src/util/extra.py"]
+
+    def test_compaction_keeps_results(self, service, tree, monkeypatch):
+        """Test rebuilding the fuzzy set after many changes loses nothing"""
+        monkeypatch.setattr(sys.modules[PathIndexService.__module__], "COMPACT_MIN_CHANGES", 2)
+        index = service.get_index(tree)
+        for i in range(5):
+            file_service.write_file(str(tree / f"gen/file{i}.py"), "x\n")
+        index = service.get_index(tree)
+
+        assert not index._added and not index._removed
+        assert len(index) == 8
+        assert index.search("gen/file3", 1)[0].path == "gen/file3.py"
+
+
+class TestFindFilesTool:
+    """Tests for the find_files tool"""
+
+    def test_text_and_json(self, temp_dir, monkeypatch):
+        """Test both output formats list ranked relative paths"""
+        monkeypatch.setattr(navigation_tools, "path_index_service", PathIndexService())
+        (temp_dir / "pkg").mkdir()
+        (temp_dir / "pkg" / "walker.py").write_text("x\n")
+        (temp_dir / "pkg" / "other.py").write_text("x\n")
+
+        text = _find_files_impl("pkwlk", root=str(temp_dir))
+        data = json.loads(_find_files_impl("pkwlk", root=str(temp_dir), output_format="json"))
+
+        assert "1. **pk**g/**w**a**lk**er.py" in text
+        assert data["total_indexed"] == 2
+        assert [m["path"] for m in data["matches"]] == ["pkg/walker.py"]
+
+    def test_errors(self, temp_dir):
+        """Test bad roots and empty queries are reported"""
+        assert "does not exist" in _find_files_impl("x", root=str(temp_dir / "missing"))
+        assert "must not be empty" in _find_files_impl("  ", root=str(temp_dir))
+        assert "Unknown output format" in _find_files_impl("x", output_format="xml")
+
+
+def test_without_numpy_falls_back(monkeypatch):
+    """Test the regex path is used when NumPy is unavailable"""
+    monkeypatch.setattr(fuzzy, "np", None)
+    monkeypatch.setattr(fuzzy, "_numpy_tried", True)
+    path_set = FuzzyPathSet(["a/b/c.py", "x.py"])
+
+    assert path_set.candidates("abc") == ["a/b/c.py"]
+
+
+def test_concurrent_first_use_sees_numpy_ready(monkeypatch):
+    """Test threads racing the first import all see NumPy and its tables, never a half-set state"""
+    numpy = pytest.importorskip("numpy")
+    monkeypatch.setattr(fuzzy, "np", None)
+    monkeypatch.setattr(fuzzy, "_BYTE_BITS", None)
+    monkeypatch.setattr(fuzzy, "_numpy_tried", False)
+
+    def slow_import(name):
+        time.sleep(0.05)  # Other threads arrive while the first is still importing
+        return numpy
+
+    monkeypatch.setattr(fuzzy, "optional_import", slow_import)
+    seen = []
+
+    def first_use():
+        seen.append((fuzzy._have_numpy(), fuzzy._BYTE_BITS is not None))
+
+    threads = [threading.Thread(target=first_use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == [(True, True)] * 4
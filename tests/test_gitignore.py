@@ -0,0 +1,121 @@
+"""
+Tests for git-aware file enumeration
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from mcp_local.core.gitignore import IgnoreRuleSet, find_repository, parse_gitignore, read_git_index
+from mcp_local.core.walk import create_walker
+from mcp_local.services import file_service
+from mcp_local.tools.search_tools import _search_adv_impl
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(temp_dir):
+    """A working tree with ignored, tracked-but-ignored and nested .gitignore files"""
+    (temp_dir / ".git").mkdir()
+    (temp_dir / ".gitignore").write_text("# build output\nout/\n*.tmp\n!keep.tmp\n/rooted.txt\n")
+    for name in ("src/app.py", "src/gen/code.py", "out/bundle.js", "scratch.tmp",
+                 "keep.tmp", "rooted.txt", "src/rooted.txt", "vendor/lib.py"):
+        (temp_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (temp_dir / name).write_text("needle\n")
+    (temp_dir / "src" / ".gitignore").write_text("gen/**\n")
+    return temp_dir
+
+
+class TestIgnoreRules:
+    """Tests for gitignore pattern semantics"""
+
+    def test_pattern_semantics(self):
+        """Test anchoring, directory-only rules, double stars and negation"""
+        rules = IgnoreRuleSet(parse_gitignore(
+            "*.log\n!important.log\nbuild/\n/top.txt\ndocs/**/draft.md\n\\#literal\n"
+        ))
+
+        assert rules.is_ignored("a/b/debug.log", False)
+        assert not rules.is_ignored("important.log", False)
+        assert rules.is_ignored("pkg/build", True)
+        assert not rules.is_ignored("pkg/build", False)
+        assert rules.is_ignored("top.txt", False)
+        assert not rules.is_ignored("sub/top.txt", False)
+        assert rules.is_ignored("docs/draft.md", False)
+        assert rules.is_ignored("docs/a/b/draft.md", False)
+        assert rules.is_ignored("#literal", False)
+
+    def test_nested_rules_are_scoped(self):
+        """Test rules from a subdirectory's .gitignore only apply beneath it"""
+        rules = IgnoreRuleSet(parse_gitignore("*.py\n", base="src"))
+
+        assert rules.is_ignored("src/pkg/mod.py", False)
+        assert not rules.is_ignored("mod.py", False)
+
+
+class TestWalker:
+    """Tests for the git-aware walker"""
+
+    def test_walk_skips_ignored_paths(self, repo):
+        """Test ignored files and directories are not enumerated"""
+        paths = [rel for rel, _ in create_walker(repo, show_hidden=True).walk()]
+
+        assert paths == [".gitignore", "keep.tmp", "src/.gitignore", "src/app.py",
+                         "src/rooted.txt", "vendor/lib.py"]
+
+    def test_walk_without_gitignore(self, repo):
+        """Test respect_gitignore=False keeps the plain walk"""
+        paths = {rel for rel, _ in create_walker(repo, respect_gitignore=False).walk()}
+
+        assert "out/bundle.js" in paths
+        assert "scratch.tmp" in paths
+
+    @requires_git
+    def test_tracked_files_are_kept(self, repo):
+        """Test files recorded in the index are candidates even when ignored"""
+        shutil.rmtree(repo / ".git")
+        git(repo, "init", "-q")
+        git(repo, "add", "-f", "scratch.tmp", "out/bundle.js", "src/app.py")
+
+        paths = {rel for rel, _ in create_walker(repo).walk()}
+
+        assert {"scratch.tmp", "out/bundle.js", "src/app.py"} <= paths
+        assert "src/gen/code.py" not in paths
+
+    def test_search_and_listing_respect_gitignore(self, repo):
+        """Test search_adv and list_directory only report candidates"""
+        data = json.loads(_search_adv_impl("needle", search_path=str(repo), output_format="json"))
+        listing = {item["name"] for item in file_service.list_directory(str(repo),
+                                                                         respect_gitignore=True)}
+
+        assert {m["file"] for m in data["matches"]} == {"keep.tmp", "src/app.py", "src/rooted.txt",
+                                                        "vendor/lib.py"}
+        assert listing == {"keep.tmp", "src", "vendor"}
+
+
+@requires_git
+@pytest.mark.parametrize("version", [2, 3, 4])
+def test_read_git_index_versions(temp_dir, version):
+    """Test tracked paths are read from every supported index format"""
+    names = ["a.txt", "dir/b.txt", "dir/sub/c.txt", "dir/sub/d.txt", "z" * 40 + ".txt"]
+    git(temp_dir, "init", "-q")
+    for name in names:
+        (temp_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (temp_dir / name).write_text(name)
+    git(temp_dir, "add", ".")
+    if version == 3:
+        # Intent-to-add entries carry the extended flags that version 3 introduced
+        (temp_dir / "new.txt").write_text("new")
+        git(temp_dir, "add", "--intent-to-add", "new.txt")
+        names.append("new.txt")
+    git(temp_dir, "update-index", f"--index-version={version}")
+
+    assert read_git_index(temp_dir / ".git" / "index") == set(names)
+    assert find_repository(temp_dir / "dir" / "sub").tracked_dirs == {"dir", "dir/sub"}
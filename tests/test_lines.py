@@ -0,0 +1,60 @@
+"""
+Tests for line indexing and the offset-based line tools
+"""
+
+import pytest
+
+from mcp_local.core.lines import LineIndex
+from mcp_local.tools.file_editing import DeleteLinesTool, EditFileLinesTool, InsertLinesTool
+
+
+class TestLineIndex:
+    """Tests for LineIndex"""
+
+    @pytest.mark.parametrize("text", ["", "\n", "a", "a\n", "a\nb", "a\nb\n", "\n\nx\n\n", "x\r\ny"])
+    def test_matches_split_semantics(self, text):
+        """Test line counts and slices agree with str.split on '\\n'"""
+        index = LineIndex(text)
+        expected = text.split("\n")
+        if text.endswith("\n") or not text:
+            expected = expected[:-1]
+
+        assert len(index) == len(expected)
+        assert index.lines() == expected
+        assert [index.line(i) for i in range(len(index))] == expected
+        assert index.slice(0, len(index)) == text
+
+    def test_line_of_offsets(self):
+        """Test mapping character offsets back to line numbers"""
+        index = LineIndex("alpha\nbeta\ngamma")
+
+        assert index.line_of(0) == 0
+        assert index.line_of(5) == 0
+        assert index.line_of(6) == 1
+        assert index.line_of(len(index.text) - 1) == 2
+        assert index.span(1, 2) == (6, 11)
+
+
+class TestOffsetEditing:
+    """Tests for the line editing tools on top of LineIndex"""
+
+    def test_edit_insert_delete(self, sample_file, reset_services):
+        """Test splicing lines by offset keeps the rest of the file intact"""
+        EditFileLinesTool().execute(file_path=str(sample_file), start_line=2, end_line=3,
+                                    new_content="Two\nThree")
+        assert sample_file.read_text() == "Line 1\nTwo\nThree\nLine 4\nLine 5\n"
+
+        InsertLinesTool().execute(file_path=str(sample_file), line_number=1, content="Zero")
+        assert sample_file.read_text().startswith("Zero\nLine 1\n")
+
+        DeleteLinesTool().execute(file_path=str(sample_file), start_line=1, end_line=2)
+        assert sample_file.read_text() == "Two\nThree\nLine 4\nLine 5\n"
+
+    def test_insert_after_unterminated_last_line(self, temp_dir, reset_services):
+        """Test appending does not glue onto a last line without a newline"""
+        path = temp_dir / "tail.txt"
+        path.write_text("first\nlast")
+
+        InsertLinesTool().execute(file_path=str(path), line_number=99, content="appended")
+
+        assert path.read_text() == "first\nlast\nappended\n"
@@ -0,0 +1,129 @@
+"""
+Tests for per-path locking and concurrent edits
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_local.core.locks import PathLockManager
+from mcp_local.services.file_service import FileService
+from mcp_local.tools.file_editing import InsertLinesTool, ReplaceInFileTool
+
+
+class TestPathLockManager:
+    """Tests for PathLockManager"""
+
+    def test_same_path_writers_serialize_in_order(self, temp_dir):
+        """Test writers on one path run one at a time in arrival order"""
+        locks = PathLockManager(advisory=False)
+        path = temp_dir / "shared.txt"
+        order = []
+
+        with locks.write_lock(path):
+            threads = []
+            for i in range(5):
+                thread = threading.Thread(target=lambda i=i: _append_locked(locks, path, order, i))
+                thread.start()
+                threads.append(thread)
+                time.sleep(0.02)  # Make arrival order deterministic
+        for thread in threads:
+            thread.join()
+
+        assert order == [0, 1, 2, 3, 4]
+        assert locks.active_paths() == []
+
+    def test_different_paths_run_in_parallel(self, temp_dir):
+        """Test writers on different paths do not block each other"""
+        locks = PathLockManager(advisory=False)
+        barrier = threading.Barrier(2, timeout=2)
+
+        def hold(name):
+            with locks.write_lock(temp_dir / name):
+                barrier.wait()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(hold, ["a.txt", "b.txt"]))
+
+    def test_reentrant_and_advisory(self, sample_file):
+        """Test a writer can re-enter as reader and writer with flock enabled"""
+        locks = PathLockManager(advisory=True)
+
+        with locks.write_lock(sample_file):
+            with locks.read_lock(sample_file):
+                with locks.write_lock(sample_file):
+                    pass
+
+        assert locks.active_paths() == []
+
+    def test_lock_paths_in_opposite_roles_do_not_deadlock(self, temp_dir):
+        """Test reading a while writing b and reading b while writing a can run side by side"""
+        locks = PathLockManager(advisory=False)
+        a, b = temp_dir / "a.txt", temp_dir / "b.txt"
+
+        def hold(read, write):
+            for _ in range(200):
+                with locks.lock_paths(read=[read], write=[write]):
+                    time.sleep(0)
+
+        threads = [threading.Thread(target=hold, args=pair, daemon=True) for pair in ((a, b), (b, a))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert locks.active_paths() == []
+
+
+class TestCopyFile:
+    """Tests for FileService.copy_file under concurrency"""
+
+    def test_opposite_copies_finish(self, temp_dir):
+        """Test copying a to b and b to a at the same time does not deadlock"""
+        service = FileService()
+        a, b = temp_dir / "a.txt", temp_dir / "b.txt"
+        a.write_bytes(b"a" * 100_000)
+        b.write_bytes(b"b" * 100_000)
+
+        def copy(src, dst):
+            for _ in range(50):
+                service.copy_file(str(src), str(dst))
+
+        threads = [threading.Thread(target=copy, args=pair, daemon=True) for pair in ((a, b), (b, a))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=20)
+
+        assert not any(thread.is_alive() for thread in threads)
+
+
+def _append_locked(locks, path, order, value):
+    with locks.write_lock(path):
+        order.append(value)
+
+
+class TestConcurrentEdits:
+    """Tests for concurrent edit tools on one file"""
+
+    def test_no_lost_updates(self, temp_dir, reset_services):
+        """Test concurrent inserts and replaces on one file all land"""
+        path = temp_dir / "counter.txt"
+        path.write_text("")
+
+        def insert(i):
+            return InsertLinesTool().execute(file_path=str(path), line_number=1, content=f"line {i}")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(insert, range(20)))
+
+        assert all("Successfully" in result for result in results)
+        assert sorted(path.read_text().splitlines()) == sorted(f"line {i}" for i in range(20))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: ReplaceInFileTool().execute(
+                file_path=str(path), search_pattern=f"line {i}\n", replace_with=f"done {i}\n"
+            ), range(20)))
+
+        assert sorted(path.read_text().splitlines()) == sorted(f"done {i}" for i in range(20))
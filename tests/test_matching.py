@@ -0,0 +1,67 @@
+"""
+Tests for whole-buffer matching with line mapping
+"""
+
+import random
+import re
+
+import pytest
+
+from mcp_local.core.lines import LineIndex
+from mcp_local.core.matching import LineMatcher
+
+PATTERNS = [
+    r"a", r"\s+", r"\s*", r"^a", r"b$", r"a\s+b", r"[^x]+", r"\w+", r"", r"\Aa", r"b\Z",
+    r"$", r"^", r"a.*", r"\bab\b", r"x*", r"(?:ab|xa)\s", r"\s*ba", r"b\n?",
+]
+
+
+def per_line_matches(pattern, text):
+    """Reference result: finditer over every line separately"""
+    index = LineIndex(text)
+    return [
+        (line, index.line_start(line) + m.start(), index.line_start(line) + m.end())
+        for line, line_text in index.iter_lines()
+        for m in pattern.finditer(line_text)
+    ]
+
+
+@pytest.mark.parametrize("source", PATTERNS)
+def test_matches_per_line_semantics(source):
+    """Test buffer matching reports exactly what the per-line loop reports"""
+    rnd = random.Random(source)
+    for flags in (0, re.IGNORECASE):
+        pattern = re.compile(source, flags)
+        matcher = LineMatcher(pattern)
+        for _ in range(300):
+            text = "".join(rnd.choice("ab x\n") for _ in range(rnd.randint(0, 30)))
+            expected = per_line_matches(pattern, text)
+            found = [(m.line, m.start, m.end) for m in matcher.finditer(text)]
+            assert found == expected, (text, source)
+            # Resuming at any reported match continues the same sequence
+            if expected:
+                k = rnd.randrange(len(expected))
+                resumed = [(m.line, m.start, m.end) for m in matcher.finditer(text, expected[k][1])]
+                assert resumed == expected[k:], (text, source)
+
+
+def test_match_positions():
+    """Test matches expose their line, column and text"""
+    text = "first line\nsecond needle here\n"
+    [hit] = LineMatcher(re.compile("needle")).finditer(text)
+
+    assert (hit.line, hit.column, hit.text) == (1, 7, "needle")
+    assert hit.index.line(hit.line) == "second needle here"
+
+
+def test_no_match_builds_no_index(monkeypatch):
+    """Test files without a match are rejected without indexing lines"""
+    import mcp_local.core.matching as matching
+
+    def fail(text):
+        raise AssertionError("LineIndex built for a file without matches")
+
+    monkeypatch.setattr(matching, "LineIndex", fail)
+
+    assert list(LineMatcher(re.compile(r"\d{3}")).finditer("no digits\n" * 100)) == []
+    assert list(LineMatcher(re.compile(r"digit\d")).finditer("no digits\n" * 100)) == []
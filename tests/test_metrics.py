@@ -0,0 +1,100 @@
+"""
+Tests for tool metrics
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_local.core import executor as executor_module
+from mcp_local.core.executor import ToolExecutor
+from mcp_local.core.metrics import MetricsRegistry, metrics
+from mcp_local.server import create_server
+
+
+def call(server, name, arguments):
+    result = asyncio.run(server.call_tool(name, arguments))
+    return "".join(getattr(item, "text", "") for item in result)
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry"""
+
+    def test_records_latency_and_counters(self, monkeypatch):
+        """Test calls land in histogram buckets and counters go to the running tool"""
+        registry = MetricsRegistry(enabled=True, buckets=(0.01, 1.0), dump_path="")
+        monkeypatch.setattr(executor_module, "metrics", registry)
+        executor = ToolExecutor(max_workers=2, concurrency_limits={})
+
+        def work(size):
+            registry.add("bytes_read", size)
+            return size
+
+        def fail():
+            raise ValueError("boom")
+
+        async def main():
+            await executor.run("reader", work, 10)
+            await executor.run("reader", work, 5)
+            with pytest.raises(ValueError):
+                await executor.run("broken", fail)
+
+        try:
+            asyncio.run(main())
+        finally:
+            executor.shutdown()
+        registry.add("bytes_read", 1)
+        tools = registry.snapshot()["tools"]
+
+        assert tools["reader"]["calls"] == 2
+        assert tools["reader"]["counters"] == {"bytes_read": 15}
+        assert tools["reader"]["latency_ms"]["p50"] == 10.0
+        assert tools["broken"]["errors"] == 1
+        assert tools["(none)"]["counters"] == {"bytes_read": 1}
+
+    def test_disabled_records_nothing(self):
+        """Test a disabled registry ignores calls and counters"""
+        registry = MetricsRegistry(enabled=False)
+
+        registry.end("tool", registry.begin("tool"))
+        registry.add("bytes_read", 10)
+
+        assert registry.snapshot()["tools"] == {}
+
+    def test_prometheus_dump(self, temp_dir):
+        """Test the text exposition has cumulative buckets and is written atomically"""
+        registry = MetricsRegistry(enabled=True, buckets=(0.5, 1.0), dump_path=str(temp_dir / "metrics.prom"))
+        registry.end("read_file", registry.begin("read_file"))
+        registry.add("files_scanned", 3)
+
+        path = registry.dump()
+        text = (temp_dir / "metrics.prom").read_text()
+
+        assert path == str(temp_dir / "metrics.prom")
+        assert 'mcp_tool_calls_total{tool="read_file"} 1' in text
+        assert 'mcp_tool_duration_seconds_bucket{tool="read_file",le="0.5"} 1' in text
+        assert 'mcp_tool_duration_seconds_bucket{tool="read_file",le="+Inf"} 1' in text
+        assert 'mcp_files_scanned_total{tool=""} 3' in text
+        assert list(temp_dir.iterdir()) == [temp_dir / "metrics.prom"]
+
+
+class TestServerMetricsTool:
+    """Tests for the get_server_metrics tool"""
+
+    def test_reports_tool_work(self, sample_file, monkeypatch):
+        """Test reads and searches show up under the tools that did them"""
+        monkeypatch.setattr(metrics, "enabled", True)
+        metrics.reset()
+        server = create_server("test-server")
+
+        call(server, "read_file", {"file_path": str(sample_file)})
+        call(server, "search_adv", {"search_term": "Line", "search_path": str(sample_file.parent)})
+        data = json.loads(call(server, "get_server_metrics", {"output_format": "json"}))
+        text = call(server, "get_server_metrics", {})
+
+        assert data["tools"]["read_file"]["counters"]["bytes_read"] == sample_file.stat().st_size
+        assert data["tools"]["search_adv"]["counters"]["files_scanned"] == 1
+        assert data["tools"]["search_adv"]["calls"] == 1
+        assert "search_results" in data["caches"]
+        assert "**read_file**: 1 calls" in text
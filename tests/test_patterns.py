@@ -0,0 +1,54 @@
+"""
+Tests for the shared compiled-pattern cache
+"""
+
+import re
+
+import pytest
+
+from mcp_local.core.patterns import PatternCache
+
+
+class TestPatternCache:
+    """Tests for PatternCache"""
+
+    def test_hits_misses_and_eviction(self):
+        """Test entries are reused per (pattern, flags, whole_word) and evicted LRU-first"""
+        cache = PatternCache(maxsize=2)
+
+        first = cache.get("foo")
+        assert cache.get("foo") is first
+        assert cache.get("foo", re.IGNORECASE) is not first
+        assert cache.get("foo", whole_word=True) is not first
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+        assert cache.get("foo") is not first  # Evicted as least recently used
+
+    def test_literal_variants(self):
+        """Test plain literals carry their exact and case-folded forms"""
+        cache = PatternCache()
+
+        assert cache.get("a.b", is_regex=False).literal == "a.b"
+        folded = cache.get(r"Error\.", re.IGNORECASE)
+        assert (folded.literal, folded.folded_literal) == ("Error.", "error.")
+        assert cache.get(r"err\w+").literal is None
+        assert cache.get("word", whole_word=True).literal is None
+
+    def test_invalid_regex_not_cached(self):
+        """Test compile errors propagate and leave the cache empty"""
+        cache = PatternCache()
+
+        with pytest.raises(re.error):
+            cache.get("(")
+        assert cache.stats()["size"] == 0
+
+    def test_literal_fast_path_matches_regex(self):
+        """Test the str.find path agrees with the regex for literals in either case mode"""
+        text = "Alpha alpha\nALPHA beta alphaalpha\n\xe9alpha\n"
+        for flags in (0, re.IGNORECASE):
+            compiled = PatternCache().get("alpha", flags, is_regex=False)
+            found = [(m.line, m.start) for m in compiled.matcher.finditer(text)]
+            expected = [(text.count("\n", 0, m.start()), m.start())
+                        for m in compiled.regex.finditer(text)]
+            assert found == expected
@@ -0,0 +1,121 @@
+"""
+Tests for opt-in tool profiling
+"""
+
+import asyncio
+import json
+import pstats
+import time
+
+import pytest
+
+from mcp_local.core import executor as executor_module
+from mcp_local.core.executor import ToolExecutor
+from mcp_local.core.profiling import ToolProfiler, attach_report, run_profiled
+from mcp_local.server import create_server
+
+
+def busy(duration):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+
+class TestProfiler:
+    """Tests for profiling modes and reports"""
+
+    def test_cprofile_writes_pstats(self, temp_dir):
+        """Test cProfile mode saves a loadable pstats file and ranks by self time"""
+        result, report = run_profiled("tool", "cprofile", str(temp_dir), 5, 0.001, busy, 0.02)
+
+        assert result == "done"
+        assert report["mode"] == "cprofile"
+        assert pstats.Stats(report["artifact"]).total_calls > 0
+        assert any("busy" in entry["function"] for entry in report["top"])
+
+    def test_sampler_writes_folded_stacks(self, temp_dir):
+        """Test sample mode records collapsed stacks of the calling thread"""
+        result, report = run_profiled("tool", "sample", str(temp_dir), 5, 0.001, busy, 0.05)
+        folded = open(report["artifact"]).read().splitlines()
+
+        assert result == "done"
+        assert report["samples"] > 0
+        assert report["top"][0]["function"].startswith("busy (test_profiling.py")
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+
+    def test_artifacts_in_the_same_second_get_distinct_names(self, temp_dir):
+        """Test back-to-back calls from one thread do not overwrite each other's artifact"""
+        paths = {run_profiled("tool", mode, str(temp_dir), 5, 0.001, busy, 0)[1]["artifact"]
+                 for mode in ("sample", "sample", "cprofile", "cprofile")}
+
+        assert len(paths) == 4
+
+    def test_unwritable_directory_keeps_the_result(self, temp_dir):
+        """Test an artifact write failure is reported in the profile, not raised over the tool's outcome"""
+        blocker = temp_dir / "file.txt"
+        blocker.write_text("x")
+        for mode in ("cprofile", "sample"):
+            result, report = run_profiled("tool", mode, str(blocker), 5, 0.001, busy, 0)
+
+            assert result == "done"
+            assert report["artifact"] is None
+            assert "Could not save the profile" in report["artifact_error"]
+            assert "Could not save the profile" in attach_report("Found 1", report)
+
+        def fail():
+            raise ValueError("tool failed")
+
+        with pytest.raises(ValueError, match="tool failed"):
+            run_profiled("tool", "sample", str(blocker), 5, 0.001, fail)
+
+    def test_selection(self):
+        """Test calls are chosen by argument, tool name or wildcard"""
+        assert ToolProfiler(tools=frozenset()).should_profile("read_file", requested=True)
+        assert not ToolProfiler(tools=frozenset()).should_profile("read_file")
+        assert ToolProfiler(tools=frozenset({"search_adv"})).should_profile("search_adv")
+        assert not ToolProfiler(tools=frozenset({"search_adv"})).should_profile("read_file")
+        assert not ToolProfiler(tools=frozenset({"*"}), sample_rate=0.0).should_profile("read_file")
+
+    def test_attach_report(self):
+        """Test JSON responses get a profile key and text ones a footer"""
+        report = {"tool": "t", "mode": "sample", "elapsed_ms": 1.0, "artifact": "x.folded",
+                  "top": [{"function": "f (a.py:1)", "self_percent": 50.0, "total_percent": 100.0}]}
+
+        assert json.loads(attach_report('{"matches": []}', report))["profile"]["tool"] == "t"
+        assert attach_report("Found 1", report).startswith("Found 1\n\n⏱️ Profile of t (sample)")
+
+
+class TestProfiledTools:
+    """Tests for profiling through the executor and registered tools"""
+
+    def test_env_selected_tool(self, temp_dir, monkeypatch):
+        """Test tools named in the configuration are profiled without asking"""
+        monkeypatch.setattr(executor_module, "tool_profiler",
+                            ToolProfiler(tools=frozenset({"slow"}), directory=temp_dir))
+        executor = ToolExecutor(max_workers=2, concurrency_limits={})
+
+        async def main():
+            return await executor.run("slow", busy, 0.01), await executor.run("fast", busy, 0)
+
+        try:
+            slow, fast = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert "⏱️ Profile of slow (cprofile)" in slow
+        assert fast == "done"
+        assert len(list(temp_dir.glob("slow-*.pstats"))) == 1
+
+    def test_search_with_profile_argument(self, sample_file, temp_dir, monkeypatch):
+        """Test profile=True on search_adv attaches the report to JSON output"""
+        monkeypatch.setattr(executor_module, "tool_profiler", ToolProfiler(directory=temp_dir / "profiles"))
+        server = create_server("test-server")
+
+        result = asyncio.run(server.call_tool("search_adv", {
+            "search_term": "Line", "search_path": str(sample_file), "output_format": "json", "profile": True}))
+        data = json.loads("".join(getattr(item, "text", "") for item in result))
+
+        assert data["matches"]
+        assert data["profile"]["tool"] == "search_adv"
+        assert data["profile"]["artifact"].startswith(str(temp_dir / "profiles"))
@@ -0,0 +1,64 @@
+"""
+Tests for regex literal prefilters
+"""
+
+import re
+
+import pytest
+
+from mcp_local.core.lines import LineIndex
+from mcp_local.core.regex_plan import plan_regex
+
+
+@pytest.mark.parametrize("pattern, literals", [
+    (r"def \w+_handler\(", ("_handler(",)),
+    (r"import (os|sys)\b", ("import ",)),
+    (r"(?:error|warning): \d+", ("error", "warning")),
+    (r"x(abc)+y", ("abc",)),
+    (r"colou?r", ("colo",)),
+    (r"\d+\.\d+", (".",)),
+    (r"[ab]\d+", ()),
+    (r"a*", ()),
+    (r"(?:foo|\w+)bar", ("bar",)),
+])
+def test_required_literals(pattern, literals):
+    """Test the most selective required literal set is extracted"""
+    assert plan_regex(re.compile(pattern)).literals == literals
+
+
+def test_ignore_case_literals_are_folded():
+    """Test case-insensitive plans compare lowered text"""
+    plan = plan_regex(re.compile("TODO:", re.IGNORECASE))
+
+    assert plan.literals == ("todo:",)
+    assert plan.may_match("# ToDo: fix")
+    assert not plan.may_match("nothing here")
+    # Non-ASCII text can case-fold onto the literal (KELVIN SIGN matches "k")
+    assert plan_regex(re.compile("kb", re.IGNORECASE)).may_match("KB")
+
+
+def test_inline_flag_groups_are_not_trusted():
+    """Test scoped flag changes disable extraction for that group"""
+    assert plan_regex(re.compile(r"(?i:abc)")).literals == ()
+
+
+def test_candidate_lines_agree_with_brute_force():
+    """Test prefiltered line matching finds exactly what per-line regex finds"""
+    text = "alpha beta\nGamma delta\n\nerror: 12\nwarning: x\nerror 7\nbeta alpha\n"
+    index = LineIndex(text)
+    for source, flags in [(r"alpha|gamma", re.IGNORECASE), (r"(error|warning): \w+", 0),
+                          (r"be+ta\b", 0), (r"^\w+ a", 0)]:
+        pattern = re.compile(source, flags)
+        candidates, _ = plan_regex(pattern).candidate_lines(text)
+        lines = range(len(index)) if candidates is None else candidates
+        found = [i for i in lines if pattern.search(index.line(i))]
+        expected = [i for i in range(len(index)) if pattern.search(index.line(i))]
+        assert found == expected, source
+
+
+def test_file_without_literal_skips_indexing():
+    """Test rejected files never get a line index"""
+    candidates, index = plan_regex(re.compile(r"needle\d")).candidate_lines("hay\nstack\n")
+
+    assert candidates == []
+    assert index is None
@@ -0,0 +1,166 @@
+"""
+Tests for the search tools
+"""
+
+import json
+import os
+
+import pytest
+
+from mcp_local.core.search_cache import SearchResultCache
+from mcp_local.services import file_service
+from mcp_local.tools import search_tools
+from mcp_local.tools.search_tools import _search_adv_impl, _search_in_files_impl
+
+
+@pytest.fixture
+def search_tree(temp_dir):
+    """Create a small tree of files to search"""
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "app.py").write_text("import os\n\ndef handler():\n    return os.getcwd()\n")
+    (temp_dir / "src" / "util.py").write_text("def helper():\n    pass\n")
+    (temp_dir / "README.md").write_text("# Handler docs\nCall handler() to start.\n")
+    return temp_dir
+
+
+class TestSearchAdv:
+    """Tests for search_adv"""
+
+    def test_text_report(self, search_tree):
+        """Test the Markdown report lists files and context"""
+        result = _search_adv_impl("handler", search_path=str(search_tree))
+
+        assert "Found 3 matches in 2 files" in result
+        assert "app.py" in result
+        assert ">>    3: def handler():" in result
+
+    def test_json_results(self, search_tree):
+        """Test structured results carry SearchMatch fields"""
+        data = json.loads(_search_adv_impl("handler", search_path=str(search_tree),
+                                           case_sensitive=True, output_format="json"))
+
+        assert data["total_matches"] == 2
+        assert data["files_with_matches"] == 2
+        assert data["truncated"] is False
+        locations = {(m["file"], m["line_number"], m["column"]) for m in data["matches"]}
+        assert ("src/app.py", 3, 5) in locations
+
+    def test_json_errors_and_truncation(self, search_tree):
+        """Test errors and result limits are reported as JSON fields"""
+        error = json.loads(_search_adv_impl("(", search_path=str(search_tree), use_regex=True,
+                                            output_format="json"))
+        assert "Invalid regex" in error["error"]
+
+        limited = json.loads(_search_adv_impl("handler", search_path=str(search_tree),
+                                              max_results=1, output_format="json"))
+        assert limited["total_matches"] == 1
+        assert limited["truncated"] is True
+        assert limited["next_cursor"]
+
+    def test_cursor_pages_cover_every_match_once(self, temp_dir):
+        """Test following next_cursor visits each match exactly once, in walk order"""
+        for d in ("a", "b/c"):
+            (temp_dir / d).mkdir(parents=True)
+        for name in ("a/one.txt", "a/two.txt", "b/c/three.txt", "top.txt"):
+            (temp_dir / name).write_text("hit hit\nmiss\nhit\n")
+
+        full = json.loads(_search_adv_impl("hit", search_path=str(temp_dir), output_format="json"))
+        seen, cursor = [], None
+        while True:
+            page = json.loads(_search_adv_impl("hit", search_path=str(temp_dir), max_results=2,
+                                               output_format="json", cursor=cursor))
+            seen.extend((m["file"], m["line_number"], m["column"]) for m in page["matches"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        expected = [(m["file"], m["line_number"], m["column"]) for m in full["matches"]]
+        assert len(expected) == 12
+        assert seen == expected
+        assert expected[0][0] == "top.txt"
+
+    def test_cursor_rejected_for_other_query(self, search_tree):
+        """Test a cursor cannot be replayed against a different search"""
+        page = json.loads(_search_adv_impl("handler", search_path=str(search_tree),
+                                           max_results=1, output_format="json"))
+
+        other = _search_adv_impl("helper", search_path=str(search_tree), cursor=page["next_cursor"])
+        garbage = _search_adv_impl("handler", search_path=str(search_tree), cursor="!!")
+
+        assert "Cursor does not belong" in other
+        assert "Invalid cursor" in garbage
+
+
+def age_tree(root):
+    """Backdate every timestamp so results are not too recent to cache"""
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, ns=(0, 0))
+
+
+class TestSearchCache:
+    """Tests for the search result cache"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = SearchResultCache(maxsize=8)
+        monkeypatch.setattr(search_tools, "search_cache", cache)
+        return cache
+
+    def test_repeated_query_is_served_from_cache(self, search_tree, cache):
+        """Test an identical query on an unchanged tree does not walk it again"""
+        age_tree(search_tree)
+        first = _search_adv_impl("handler", search_path=str(search_tree))
+        second = _search_adv_impl("handler", search_path=str(search_tree))
+        _search_adv_impl("handler", search_path=str(search_tree), output_format="json")
+
+        assert second == first
+        assert cache.stats()["hits"] == 2
+
+    def test_own_writes_invalidate_only_affected_roots(self, search_tree, temp_dir, cache):
+        """Test a write under one root keeps cached searches of sibling roots"""
+        (search_tree / "docs").mkdir()
+        (search_tree / "docs" / "guide.md").write_text("handler guide\n")
+        age_tree(search_tree)
+        src, docs = str(search_tree / "src"), str(search_tree / "docs")
+        _search_adv_impl("handler", search_path=src)
+        _search_adv_impl("handler", search_path=docs)
+
+        # util.py had no match and the directory mtime is reset: only the generation reveals the edit
+        file_service.write_file(str(search_tree / "src" / "util.py"), "def handler():\n    pass\n")
+        os.utime(search_tree / "src", ns=(0, 0))
+        result = json.loads(_search_adv_impl("handler", search_path=src, output_format="json"))
+        _search_adv_impl("handler", search_path=docs)
+
+        assert result["total_matches"] == 2
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["invalidations"] == 1
+
+    def test_outside_changes_are_detected(self, search_tree, cache):
+        """Test new files and edited matching files invalidate the entry"""
+        age_tree(search_tree)
+        _search_adv_impl("handler", search_path=str(search_tree))
+        (search_tree / "src" / "new.py").write_text("handler = 1\n")
+        created = json.loads(_search_adv_impl("handler", search_path=str(search_tree), output_format="json"))
+
+        assert created["total_matches"] == 4
+        assert cache.stats()["hits"] == 0
+
+    def test_recent_results_are_not_cached(self, search_tree, cache):
+        """Test results from just-modified trees are recomputed"""
+        _search_adv_impl("handler", search_path=str(search_tree))
+        _search_adv_impl("handler", search_path=str(search_tree))
+
+        assert cache.stats()["size"] == 0
+
+
+class TestSearchInFiles:
+    """Tests for search_in_files"""
+
+    def test_literal_and_regex(self, search_tree):
+        """Test literal and regex searches report matching lines"""
+        literal = _search_in_files_impl("os.", directory=str(search_tree), file_pattern="*.py")
+        regex = _search_in_files_impl(r"def \w+\(\)", directory=str(search_tree), use_regex=True)
+
+        assert "Found 1 matches" in literal
+        assert "app.py:4" in literal
+        assert "Found 2 matches" in regex
@@ -0,0 +1,127 @@
+"""
+Tests for server startup cost
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import mcp_local
+
+# Our own share of startup: importing mcp_local and building the server, or reaching
+# the stdio loop, on top of the MCP SDK import every server pays anyway
+STARTUP_BUDGET = 0.1
+
+# Best of this many runs, so one slow process start does not fail the budget
+STARTUP_RUNS = 5
+
+# Wall-clock budgets mean little on slow or shared CI runners; set MCP_SKIP_TIMING_TESTS=1 there
+timing = pytest.mark.skipif(bool(os.environ.get("MCP_SKIP_TIMING_TESTS")),
+                            reason="MCP_SKIP_TIMING_TESTS is set")
+
+# Builds the server in a fresh interpreter and reports the time that took and which
+# heavy modules it loaded
+_PROBE = """
+import json, sys, time
+import mcp.server.fastmcp
+started = time.perf_counter()
+from mcp_local.server import create_server
+create_server()
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed,
+                  "loaded": [m for m in ("numpy", "difflib", "sqlite3") if m in sys.modules]}))
+"""
+
+_INITIALIZE = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+    "protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "probe", "version": "0"}}})
+
+
+def _env(home):
+    return dict(os.environ, HOME=str(home),
+                PYTHONPATH=os.pathsep.join(filter(None, [str(Path(mcp_local.__file__).parents[1]),
+                                                         os.environ.get("PYTHONPATH")])))
+
+
+def probe(home):
+    output = subprocess.run([sys.executable, "-c", _PROBE], env=_env(home), capture_output=True,
+                            text=True, check=True, timeout=60).stdout
+    return json.loads(output)
+
+
+def time_to_ready(home):
+    """Seconds from spawning the stdio server to its answer to initialize"""
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "mcp_local.main"], env=_env(home), text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        server.stdin.write(_INITIALIZE + "\n")
+        server.stdin.flush()
+        response = json.loads(server.stdout.readline())
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stdin.close()
+        server.wait(timeout=10)
+    assert response["id"] == 1 and "result" in response
+    return elapsed
+
+
+def time_to_import_sdk(home):
+    """Seconds for a fresh interpreter to import the MCP SDK and exit"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import mcp.server.fastmcp"], env=_env(home), check=True, timeout=60)
+    return time.perf_counter() - started
+
+
+class TestStartup:
+    """Tests for lazy imports and service initialization"""
+
+    def test_create_server_is_cheap(self, temp_dir):
+        """Test startup needs no heavy imports or disk writes"""
+        run = probe(temp_dir)
+
+        assert run["loaded"] == []
+        assert not (temp_dir / ".mcp_local_backups").exists()
+        assert not (temp_dir / ".mcp_backups").exists()
+
+    @timing
+    def test_create_server_within_budget(self, temp_dir):
+        """Test importing mcp_local and building the server stays within budget"""
+        assert min(probe(temp_dir)["elapsed"] for _ in range(STARTUP_RUNS)) < STARTUP_BUDGET
+
+    @timing
+    def test_stdio_loop_ready_within_budget(self, temp_dir):
+        """Test mcp-local answers initialize on stdio within budget of a bare MCP SDK import"""
+        ready = min(time_to_ready(temp_dir) for _ in range(STARTUP_RUNS))
+        baseline = min(time_to_import_sdk(temp_dir) for _ in range(STARTUP_RUNS))
+
+        assert ready - baseline < STARTUP_BUDGET
+
+    def test_backup_directory_created_on_first_backup(self, temp_dir, monkeypatch):
+        """Test the backup service creates its directory when first needed"""
+        from mcp_local.services import BackupService
+
+        service = BackupService()
+        monkeypatch.setattr(service, "backup_dir", temp_dir / "backups")
+        source = temp_dir / "file.txt"
+        source.write_text("data")
+
+        backup = service.create_backup(str(source))
+
+        assert Path(backup).read_text() == "data"
+        assert Path(backup).parent == temp_dir / "backups"
+
+    def test_backup_directory_created_after_change(self, temp_dir, monkeypatch):
+        """Test pointing the service at another directory creates that one on its first backup"""
+        from mcp_local.services import BackupService
+
+        service = BackupService()
+        source = temp_dir / "file.txt"
+        source.write_text("data")
+        for name in ("first", "second"):
+            monkeypatch.setattr(service, "backup_dir", temp_dir / name)
+            assert Path(service.create_backup(str(source))).parent == temp_dir / name
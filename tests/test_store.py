@@ -0,0 +1,146 @@
+"""
+Tests for the SQLite store shared between server processes
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_local.core.events import ChangeNotifier, change_notifier
+from mcp_local.core.executor import ToolExecutor
+from mcp_local.core.store import SharedStore
+from mcp_local.services.backup_service import BackupService
+from mcp_local.services.history_service import HistoryService
+from mcp_local.services.symbol_index_service import SymbolIndex
+
+# The services package exports instances under the module names
+backup_module = sys.modules["mcp_local.services.backup_service"]
+symbol_module = sys.modules["mcp_local.services.symbol_index_service"]
+
+
+@pytest.fixture
+def db_path(temp_dir):
+    return temp_dir / "state.db"
+
+
+def _in_child(func):
+    """Run func in a forked process, which has its own pid and connections"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            func()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+
+class TestSharedHistory:
+    """Tests for the edit history kept in the shared store"""
+
+    def test_history_is_shared_and_trimmed(self, db_path):
+        """Test entries logged by one service are seen by another and trimmed to max_entries"""
+        first = HistoryService(SharedStore(db_path))
+        second = HistoryService(SharedStore(db_path))
+        first.max_entries = second.max_entries = 3
+
+        for i in range(4):
+            (first if i % 2 else second).log_edit("edit_lines", f"/f{i}", {"line": i})
+        _in_child(lambda: SharedStore(db_path).append_history(
+            {"timestamp": "2024-01-01T00:00:00", "action": "insert_lines", "file": "/f0", "details": {}}, 3))
+
+        entries = first.get_history()
+        assert [entry["file"] for entry in entries] == ["/f2", "/f3", "/f0"]
+        assert entries[0]["details"] == {"line": 2}
+        assert [entry["action"] for entry in second.get_file_history("/f0")] == ["insert_lines"]
+        assert second.get_recent_files() == ["/f0", "/f3", "/f2"]
+
+        second.clear_history()
+        assert first.get_stats() == {"total_edits": 0}
+
+    def test_in_memory_without_a_store(self):
+        """Test the history stays in memory when no database is configured"""
+        service = HistoryService(SharedStore(""))
+        service.log_edit("write_file", "/a", {})
+        assert [entry["file"] for entry in service.get_history()] == ["/a"]
+
+
+class TestChangeFeed:
+    """Tests for relaying change notifications between processes"""
+
+    def test_changes_from_other_processes_are_delivered(self, db_path, temp_dir):
+        """Test sync() replays other processes' changes once and skips this process's own"""
+        notifier = ChangeNotifier()
+        notifier.relay = SharedStore(db_path)
+        seen = []
+        notifier.subscribe(seen.append)
+        notifier.sync()  # Sets the starting point
+
+        _in_child(lambda: SharedStore(db_path).publish_changes([temp_dir / "a.txt", temp_dir / "b.txt"]))
+        notifier.notify(temp_dir / "own.txt")
+        assert seen == [temp_dir / "own.txt"]
+
+        notifier.sync()
+        notifier.sync()
+        assert seen == [temp_dir / "own.txt", temp_dir / "a.txt", temp_dir / "b.txt"]
+
+    def test_tool_calls_sync_on_a_worker(self, db_path, monkeypatch):
+        """Test the executor replays the feed on the worker thread, not on the event loop"""
+        relay = SharedStore(db_path)
+        threads = []
+        monkeypatch.setattr(relay, "pending_changes", lambda: threads.append(threading.get_ident()) or [])
+        monkeypatch.setattr(change_notifier, "relay", relay)
+
+        worker = asyncio.run(ToolExecutor(max_workers=1).run("probe", threading.get_ident))
+
+        assert threads == [worker]
+        assert worker != threading.get_ident()
+
+
+class TestSharedSymbols:
+    """Tests for symbol definitions shared through the store"""
+
+    def test_unchanged_files_are_not_extracted_again(self, db_path, temp_dir, monkeypatch):
+        """Test a second index takes stored definitions and re-extracts only changed files"""
+        (temp_dir / "a.py").write_text("def alpha():\n    pass\n")
+        (temp_dir / "b.py").write_text("class Beta:\n    pass\n")
+        root = temp_dir.resolve()
+
+        def build():
+            index = SymbolIndex(root, lambda: ["a.py", "b.py"], lambda: None, SharedStore(db_path))
+            index.refresh()
+            assert index.wait(10)
+            return index
+
+        build()
+        (temp_dir / "b.py").write_text("class Gamma:\n    pass\n")
+        extracted = []
+        original = symbol_module.extract_file_symbols
+        monkeypatch.setattr(symbol_module, "extract_file_symbols",
+                            lambda path, rel_path: extracted.append(rel_path) or original(path, rel_path))
+
+        index = build()
+        assert extracted == ["b.py"]
+        assert sorted(s.qualified_name for s in index.lookup("")) == ["Gamma", "alpha"]
+
+
+class TestBackupNames:
+    """Tests for backup names claimed across processes"""
+
+    def test_same_timestamp_gets_distinct_names(self, temp_dir, monkeypatch):
+        """Test names claimed at the same instant, here and in another process, never collide"""
+        moment = datetime.datetime(2024, 1, 2, 3, 4, 5, 6)
+        frozen = SimpleNamespace(now=lambda: moment)
+        monkeypatch.setattr(backup_module, "datetime", SimpleNamespace(datetime=frozen))
+        service = BackupService()
+        service.backup_dir = temp_dir
+
+        _in_child(lambda: service._reserve_backup_path("x.txt"))
+        names = {service._reserve_backup_path("x.txt") for _ in range(5)}
+
+        assert len(names) == 5
+        assert len(list(temp_dir.glob("x.txt_*.backup"))) == 6
@@ -0,0 +1,137 @@
+"""
+Tests for symbol extraction and the find_symbol index
+"""
+
+import json
+import os
+
+import pytest
+
+from mcp_local.core.symbols import extract_symbols
+from mcp_local.services import file_service
+from mcp_local.services.symbol_index_service import SymbolIndexService
+from mcp_local.tools import navigation_tools
+from mcp_local.tools.navigation_tools import _find_symbol_impl
+
+
+def definitions(text, file_path):
+    return [(s.kind, s.qualified_name, s.line_number) for s in extract_symbols(text, file_path)]
+
+
+class TestExtraction:
+    """Tests for per-language definition extraction"""
+
+    def test_python_uses_ast(self):
+        """Test nesting, methods and conditional definitions are found"""
+        source = ("class Shape(Base):\n"
+                  "    def area(self):\n"
+                  "        def helper(): pass\n"
+                  "    async def load(self): pass\n"
+                  "if TYPE_CHECKING:\n"
+                  "    def typed(): pass\n"
+                  "@cache\n"
+                  "def build(): pass\n")
+
+        assert definitions(source, "shapes.py") == [
+            ("class", "Shape", 1), ("method", "Shape.area", 2), ("function", "Shape.area.helper", 3),
+            ("method", "Shape.load", 4), ("function", "typed", 6), ("function", "build", 8),
+        ]
+        assert extract_symbols(source, "shapes.py")[1].column == 8
+
+    def test_python_syntax_errors_fall_back(self):
+        """Test half-edited Python still yields its definitions"""
+        assert definitions("def ok():\n    pass\ndef broken(:\n", "x.py") == [
+            ("function", "ok", 1), ("function", "broken", 3)]
+
+    @pytest.mark.parametrize("file_path, source, expected", [
+        ("app.js", "export async function load(url) {\n}\nclass Widget {\n  render(props) {\n"
+                   "    if (props) {\n    }\n  }\n}\nconst add = (a, b) => a + b;\n",
+         [("function", "load", 1), ("class", "Widget", 3), ("method", "render", 4), ("function", "add", 9)]),
+        ("types.ts", "export interface Props {}\ntype Id = string;\nexport class Store<T> {\n"
+                     "  public async add(item: T): Promise<void> {\n  }\n}\n",
+         [("interface", "Props", 1), ("type", "Id", 2), ("class", "Store", 3), ("method", "add", 4)]),
+        ("Main.java", "public class Main {\n    public static void main(String[] args) {\n"
+                      "        if (ok) { run(); }\n    }\n}\n",
+         [("class", "Main", 1), ("method", "main", 2)]),
+        ("util.c", "#define MAX 10\nstruct point {\n};\nstatic int add(int a, int b)\n{\n}\nint decl(int);\n",
+         [("macro", "MAX", 1), ("struct", "point", 2), ("function", "add", 4)]),
+        ("w.cpp", "namespace app {\nclass Widget {\n};\nvoid Widget::draw() const {\n}\n}\n",
+         [("namespace", "app", 1), ("class", "Widget", 2), ("function", "Widget::draw", 4)]),
+        ("site.css", ".btn, a {\n}\n#main:hover {\n}\n", [("selector", ".btn", 1), ("selector", "#main", 3)]),
+        ("index.html", '<div id="app"></div>', [("id", "app", 1)]),
+        ("data.json", '{"key": 1}', []),
+    ])
+    def test_grammars(self, file_path, source, expected):
+        """Test the regex grammars recognise common definition forms"""
+        assert definitions(source, file_path) == expected
+
+
+@pytest.fixture
+def code_tree(temp_dir):
+    """A small multi-language source tree"""
+    (temp_dir / "pkg").mkdir()
+    (temp_dir / "pkg" / "server.py").write_text("class Server:\n    def start(self):\n        pass\n")
+    (temp_dir / "pkg" / "client.js").write_text("function startClient() {\n}\n")
+    (temp_dir / "notes.txt").write_text("def start(): not code\n")
+    return temp_dir.resolve()
+
+
+class TestSymbolIndex:
+    """Tests for the background symbol index"""
+
+    @pytest.mark.parametrize("workers", [0, 1])
+    def test_lookup(self, code_tree, workers):
+        """Test lookups rank exact names first, with or without worker processes"""
+        service = SymbolIndexService(workers=workers)
+        try:
+            index = service.get_index(code_tree)
+            assert index.wait(30)
+
+            assert [(s.qualified_name, s.file_path) for s in index.lookup("start")] == [
+                ("Server.start", "pkg/server.py"), ("startClient", "pkg/client.js")]
+            assert [s.name for s in index.lookup("start", exact=True)] == ["start"]
+            assert [s.name for s in index.lookup("server.sta")] == ["start"]
+            assert [s.name for s in index.lookup("s", kind="class")] == ["Server"]
+        finally:
+            service.cleanup()
+
+    def test_changes_are_reindexed(self, code_tree):
+        """Test edits through the file service and outside edits both update the index"""
+        service = SymbolIndexService(workers=0)
+        index = service.get_index(code_tree)
+        index.wait()
+
+        file_service.write_file(str(code_tree / "pkg" / "server.py"), "def serve_forever():\n    pass\n")
+        index = service.get_index(code_tree)
+        index.wait()
+        assert [s.name for s in index.lookup("serve")] == ["serve_forever"]
+        assert index.lookup("Server") == []
+
+        os.remove(code_tree / "pkg" / "client.js")
+        (code_tree / "pkg" / "extra.py").write_text("class Extra:\n    pass\n")
+        os.utime(code_tree / "pkg", ns=(0, 0))
+        service.get_index(code_tree).refresh(poll_interval=0)
+        index.wait()
+        path_names = [(s.name, s.file_path) for s in index.lookup("")]
+        assert sorted(path_names) == [("Extra", "pkg/extra.py"), ("serve_forever", "pkg/server.py")]
+
+
+class TestFindSymbolTool:
+    """Tests for the find_symbol tool"""
+
+    def test_text_and_json(self, code_tree, monkeypatch):
+        """Test both output formats report file, line and signature"""
+        monkeypatch.setattr(navigation_tools, "symbol_index_service", SymbolIndexService(workers=0))
+
+        text = _find_symbol_impl("start", root=str(code_tree))
+        data = json.loads(_find_symbol_impl("Server", root=str(code_tree), kind="class", output_format="json"))
+
+        assert "method **Server.start** — pkg/server.py:2" in text
+        assert "def start(self):" in text
+        assert data["complete"] is True
+        assert [(s["name"], s["line_number"]) for s in data["symbols"]] == [("Server", 1)]
+
+    def test_errors(self, temp_dir):
+        """Test bad roots and empty queries are reported"""
+        assert "does not exist" in _find_symbol_impl("x", root=str(temp_dir / "missing"))
+        assert "must not be empty" in _find_symbol_impl(" ", root=str(temp_dir))
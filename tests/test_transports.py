@@ -0,0 +1,226 @@
+"""
+Tests for the HTTP transports, per-client limits and graceful drain
+"""
+
+import asyncio
+import contextvars
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import uvicorn
+
+from mcp_local.core.exceptions import ServerDrainingError
+from mcp_local.core.executor import ToolExecutor
+from mcp_local.server import create_server
+from mcp_local.transports import DrainingServer, create_app
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+_client: contextvars.ContextVar = contextvars.ContextVar("test_client", default=None)
+
+
+class _Client:
+    """Stands in for a client session"""
+
+
+class TestClientLimits:
+    """Tests for per-client concurrency limits"""
+
+    def test_each_client_is_limited_separately(self):
+        """Test a limit of one serializes each client's calls but not calls of different clients"""
+        executor = ToolExecutor(max_workers=4, concurrency_limits={}, client_limit=1, client_key=_client.get)
+        clients = [_Client(), _Client()]
+        active = {id(client): 0 for client in clients}
+        peak = {id(client): 0 for client in clients}
+        overall = []
+
+        def work(key):
+            active[key] += 1
+            peak[key] = max(peak[key], active[key])
+            overall.append(sum(active.values()))
+            time.sleep(0.03)
+            active[key] -= 1
+
+        async def calls(client):
+            _client.set(client)
+            await asyncio.gather(*[executor.run("tool", work, id(client)) for _ in range(3)])
+
+        async def main():
+            await asyncio.gather(*[calls(client) for client in clients])
+
+        try:
+            asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert max(peak.values()) == 1
+        assert max(overall) == 2
+
+    def test_calls_outside_a_client_are_not_limited(self):
+        """Test calls without a client session only see the per-tool limits"""
+        executor = ToolExecutor(max_workers=4, concurrency_limits={}, client_limit=1, client_key=lambda: None)
+
+        async def main():
+            started = time.perf_counter()
+            await asyncio.gather(*[executor.run("tool", time.sleep, 0.05) for _ in range(4)])
+            return time.perf_counter() - started
+
+        try:
+            elapsed = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert elapsed < 0.15
+
+
+class TestDrain:
+    """Tests for draining the executor at shutdown"""
+
+    def test_drain_waits_for_running_calls_and_refuses_new_ones(self):
+        """Test drain lets a running call finish and rejects calls made afterwards"""
+        executor = ToolExecutor(max_workers=2, concurrency_limits={})
+
+        async def main():
+            running = asyncio.ensure_future(executor.run("slow", lambda: (time.sleep(0.1), "done")[1]))
+            await asyncio.sleep(0.02)
+            drained = asyncio.ensure_future(executor.drain(timeout=2))
+            await asyncio.sleep(0)
+            with pytest.raises(ServerDrainingError):
+                await executor.run("slow", lambda: "late")
+            return await running, await drained
+
+        try:
+            result, drained = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        assert result == "done"
+        assert drained is True
+        assert executor.in_flight == 0
+
+    def test_drain_gives_up_after_timeout(self):
+        """Test drain returns False when calls outlast the timeout"""
+        executor = ToolExecutor(max_workers=1, concurrency_limits={})
+
+        async def main():
+            running = asyncio.ensure_future(executor.run("slow", time.sleep, 0.3))
+            await asyncio.sleep(0.02)
+            drained = await executor.drain(timeout=0.05)
+            await running
+            return drained
+
+        try:
+            assert asyncio.run(main()) is False
+        finally:
+            executor.shutdown()
+
+
+class TestDrainingServer:
+    """Tests for the uvicorn server's shutdown handling"""
+
+    def test_first_signal_drains_and_second_forces_exit(self):
+        """Test the first signal only starts a drain and a second one forces the exit"""
+        executor = ToolExecutor(max_workers=1, concurrency_limits={})
+        server = DrainingServer(uvicorn.Config(create_app(create_server("t"), "sse")), executor, 5)
+
+        server.handle_exit(signal.SIGTERM, None)
+        assert executor.draining and not server.should_exit
+
+        executor.in_flight = 1
+        assert asyncio.run(server.on_tick(1)) is False
+        executor.in_flight = 0
+        assert asyncio.run(server.on_tick(2)) is True
+
+        server.handle_exit(signal.SIGTERM, None)
+        assert server.should_exit and server.force_exit
+
+    def test_unknown_transport(self):
+        """Test create_app rejects transports that are not HTTP"""
+        with pytest.raises(ValueError):
+            create_app(create_server("t"), "stdio")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(tmp_path, *extra):
+    """Start the server over streamable HTTP in a subprocess; returns it and a tool caller"""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=str(SRC), HOME=str(tmp_path))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mcp_local.main", "--transport", "streamable-http",
+         "--port", str(port), "--drain-timeout", "5", *extra],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    async def call(tool, arguments):
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        async with streamablehttp_client(f"http://127.0.0.1:{port}/mcp/") as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                result = await session.call_tool(tool, arguments)
+                return result.content[0].text
+
+    return process, call
+
+
+def _stop(process) -> int:
+    try:
+        process.send_signal(signal.SIGTERM)
+        return process.wait(timeout=10)
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+class TestStreamableHttp:
+    """End-to-end tests of the streamable HTTP transport"""
+
+    def test_concurrent_clients_then_clean_shutdown(self, tmp_path):
+        """Test several clients are served at once and SIGTERM exits cleanly"""
+        process, call = _serve(tmp_path)
+
+        async def main():
+            return await asyncio.gather(*[call("get_local_data", {"query": str(i)}) for i in range(3)])
+
+        try:
+            texts = asyncio.run(main())
+        finally:
+            returncode = _stop(process)
+
+        assert texts == [f"Local data for query: '{i}'" for i in range(3)]
+        assert returncode == 0
+
+    def test_workers_share_the_edit_history(self, tmp_path):
+        """Test edits served by different workers all show up in the shared history"""
+        process, call = _serve(tmp_path, "--workers", "2")
+
+        async def main():
+            await asyncio.gather(*[call("write_file", {"file_path": str(tmp_path / f"f{i}.txt"), "content": "x"})
+                                   for i in range(6)])
+            return [await call("get_edit_history", {"limit": 20}) for _ in range(3)]
+
+        try:
+            histories = asyncio.run(main())
+        finally:
+            returncode = _stop(process)
+
+        assert [history.count("write_file") for history in histories] == [6, 6, 6]
+        assert (tmp_path / ".mcp_local_state.db").exists()
+        assert returncode == 0
@@ -0,0 +1,161 @@
+"""
+Tests for staged recursive deletes, undo and background purging
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from mcp_local.core.exceptions import FileAccessError, FileNotFoundError
+from mcp_local.services.trash_service import STAGING_NAME, TrashService, purge_tree
+from mcp_local.tools import file_operations
+from mcp_local.tools.file_operations import DeletePathsTool, RestoreDeletedTool
+
+
+@pytest.fixture
+def tree(temp_dir):
+    root = temp_dir / "build"
+    for i in range(3):
+        (root / f"pkg{i}" / "deep" / "deeper").mkdir(parents=True)
+        for j in range(5):
+            (root / f"pkg{i}" / "deep" / "deeper" / f"f{j}.o").write_text("x")
+        (root / f"pkg{i}" / "index.txt").write_text("index")
+    os.symlink(temp_dir, root / "loop")
+    return root
+
+
+@pytest.fixture
+def trash(temp_dir, monkeypatch):
+    service = TrashService(trash_dir=temp_dir / "trash", undo_seconds=60)
+    monkeypatch.setattr(service, "_schedule", lambda: None)  # Purges run when a test asks
+    monkeypatch.setattr(file_operations, "trash_service", service)
+    return service
+
+
+class TestPurgeTree:
+    """Tests for removing a tree relative to directory descriptors"""
+
+    def test_removes_tree_without_following_links(self, tree, temp_dir):
+        """Test every entry is removed and a link to a directory is unlinked, not followed"""
+        outside = temp_dir / "keep.txt"
+        outside.write_text("keep")
+        (tree / "pkg0" / "readonly").mkdir()
+        (tree / "pkg0" / "readonly" / "file").write_text("x")
+        (tree / "pkg0" / "readonly").chmod(0o500)
+
+        removed = purge_tree(tree)
+
+        assert not tree.exists()
+        assert outside.read_text() == "keep"
+        assert removed == 3 * (5 + 4) + 1 + 2 + 1  # pkg trees, link, readonly dir and file, root
+
+
+class TestTrashService:
+    """Tests for staging, restoring and purging deletes"""
+
+    def test_delete_is_a_rename_into_the_trash(self, tree, trash, temp_dir):
+        """Test a delete moves the tree into the staging directory in one step"""
+        inode = tree.stat().st_ino
+        entry = trash.delete(str(tree), recursive=True)
+
+        assert not tree.exists()
+        assert entry.staged_path.parent == temp_dir / "trash"
+        assert entry.staged_path.stat().st_ino == inode
+        assert [pending.deletion_id for pending in trash.pending()] == [entry.deletion_id]
+
+    def test_restore_within_the_undo_window(self, tree, trash):
+        """Test a restore puts the tree back unchanged and removes the entry"""
+        entry = trash.delete(str(tree), recursive=True)
+        trash.restore(entry.deletion_id)
+
+        assert (tree / "pkg1" / "deep" / "deeper" / "f4.o").read_text() == "x"
+        assert trash.pending() == []
+        with pytest.raises(FileNotFoundError):
+            trash.restore(entry.deletion_id)
+
+    def test_restore_refuses_to_replace_a_new_file(self, tree, trash):
+        """Test restoring does not overwrite something created at the old path since"""
+        entry = trash.delete(str(tree / "pkg0" / "index.txt"))
+        (tree / "pkg0" / "index.txt").write_text("new")
+        with pytest.raises(FileAccessError):
+            trash.restore(entry.deletion_id)
+        assert (tree / "pkg0" / "index.txt").read_text() == "new"
+
+    def test_non_empty_directory_needs_recursive(self, tree, trash):
+        """Test a non-empty directory is only deleted with recursive set"""
+        with pytest.raises(FileAccessError):
+            trash.delete(str(tree))
+        assert tree.exists()
+
+    def test_symlink_is_deleted_not_its_target(self, tree, trash, temp_dir):
+        """Test deleting a link to a directory removes only the link"""
+        trash.delete(str(tree / "loop"))
+        assert not (tree / "loop").is_symlink()
+        assert tree.exists()
+
+    def test_trash_and_its_parents_are_protected(self, trash, temp_dir):
+        """Test the staging directory and the directories holding it cannot be deleted"""
+        (temp_dir / "file.txt").write_text("x")
+        trash.delete(str(temp_dir / "file.txt"))
+        for protected in (temp_dir / "trash", temp_dir):
+            with pytest.raises(FileAccessError):
+                trash.delete(str(protected), recursive=True)
+
+    def test_purge_after_the_undo_window(self, tree, trash):
+        """Test due entries are purged, including ones left by another process"""
+        entry = trash.delete(str(tree), recursive=True)
+        orphan = trash.trash_dir / "1000-1-1"
+        (orphan / "sub").mkdir(parents=True)
+        (trash.trash_dir / "1000-1-1.path").write_text("/gone")
+
+        assert trash.purge_due(now=entry.purge_at - 1) == 1
+        assert entry.staged_path.exists()
+        assert trash.purge_due(now=entry.purge_at + 1) == 1
+        assert os.listdir(trash.trash_dir) == []
+
+    def test_background_purge(self, tree, temp_dir):
+        """Test the purge thread removes entries once their window passes"""
+        trash = TrashService(trash_dir=temp_dir / "trash", undo_seconds=0.05)
+        entry = trash.delete(str(tree), recursive=True)
+        deadline = time.monotonic() + 5
+        while trash.stats()["purged"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert trash.stats() == {"pending": 0, "purged": 1}
+        assert not entry.staged_path.exists()
+
+    def test_staging_next_to_target_on_another_filesystem(self, tree, trash, monkeypatch):
+        """Test a target on another device is staged beside itself and the staging removed once empty"""
+        real_stat = os.stat
+
+        def other_device(path, *args, **kwargs):
+            result = real_stat(path, *args, **kwargs)
+            if str(path) == str(trash.trash_dir):
+                return os.stat_result((*result[:2], result.st_dev + 1, *result[3:]))
+            return result
+
+        monkeypatch.setattr(os, "stat", other_device)
+        entry = trash.delete(str(tree / "pkg0"), recursive=True)
+        monkeypatch.setattr(os, "stat", real_stat)
+
+        assert entry.staged_path.parent == tree / STAGING_NAME
+        assert trash.purge_due(now=entry.purge_at + 1) == 1
+        assert not (tree / STAGING_NAME).exists()
+
+
+class TestDeleteTools:
+    """Tests for the delete_paths and restore_deleted tools"""
+
+    def test_delete_list_and_restore(self, tree, trash):
+        """Test the tools report ids, list pending deletes and restore them"""
+        result = json.loads(DeletePathsTool().execute([str(tree), str(tree / "missing")], recursive=True,
+                                                      output_format="json"))
+        assert len(result["deleted"]) == 1 and "does not exist" in result["errors"][0]["error"]
+        deletion_id = result["deleted"][0]["deletion_id"]
+
+        listing = RestoreDeletedTool().execute()
+        assert deletion_id in listing and str(tree) in listing
+
+        assert "Restored 1 of 1" in RestoreDeletedTool().execute([deletion_id])
+        assert (tree / "pkg2" / "index.txt").exists()
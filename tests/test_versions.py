@@ -0,0 +1,67 @@
+"""
+Tests for optimistic concurrency on the edit tools
+"""
+
+import re
+
+from mcp_local.services import file_service
+from mcp_local.tools.file_editing import EditFileLinesTool, ReplaceInFileTool
+from mcp_local.tools.file_operations import GetFileLinesTool, ReadFileTool, WriteFileTool
+
+
+def _version(result):
+    match = re.search(r"Version: hash=(\w+) mtime=(\d+)", result)
+    assert match, result
+    return match.group(1), int(match.group(2))
+
+
+class TestVersionTokens:
+    """Tests for version tokens returned by reads and writes"""
+
+    def test_read_tools_report_version(self, sample_file):
+        """Test read_file and get_file_lines report the same token"""
+        _, version = file_service.read_file_versioned(str(sample_file))
+
+        assert _version(ReadFileTool().execute(file_path=str(sample_file))) == \
+            (version.content_hash, version.mtime_ns)
+        assert _version(GetFileLinesTool().execute(file_path=str(sample_file), start_line=2)) == \
+            (version.content_hash, version.mtime_ns)
+
+    def test_chained_edits_with_returned_token(self, sample_file, reset_services):
+        """Test the token returned by an edit is accepted by the next edit"""
+        content_hash, _ = _version(ReadFileTool().execute(file_path=str(sample_file)))
+
+        first = EditFileLinesTool().execute(file_path=str(sample_file), start_line=1,
+                                            new_content="First", expected_hash=content_hash)
+        next_hash, next_mtime = _version(first)
+        second = ReplaceInFileTool().execute(file_path=str(sample_file), search_pattern="First",
+                                             replace_with="Once", expected_hash=next_hash,
+                                             expected_mtime=next_mtime)
+
+        assert "Successfully" in second
+        assert sample_file.read_text().startswith("Once\nLine 2\n")
+
+
+class TestStaleEdits:
+    """Tests for rejecting edits based on a stale view"""
+
+    def test_stale_hash_rejected(self, sample_file, reset_services):
+        """Test an edit with an outdated hash leaves the file untouched"""
+        content_hash, _ = _version(ReadFileTool().execute(file_path=str(sample_file)))
+        sample_file.write_text("changed underneath\n")
+
+        result = EditFileLinesTool().execute(file_path=str(sample_file), start_line=1,
+                                             new_content="mine", expected_hash=content_hash)
+
+        assert "changed since hash" in result
+        assert sample_file.read_text() == "changed underneath\n"
+
+    def test_stale_mtime_rejected_for_write(self, sample_file, reset_services):
+        """Test write_file refuses to clobber a file modified since the expected mtime"""
+        _, mtime = _version(ReadFileTool().execute(file_path=str(sample_file)))
+
+        result = WriteFileTool().execute(file_path=str(sample_file), content="new",
+                                         expected_mtime=mtime - 1)
+
+        assert "modified since mtime" in result
+        assert sample_file.read_text().startswith("Line 1")